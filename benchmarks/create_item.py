@@ -0,0 +1,165 @@
+"""Measures create_item latency, throughput and peak memory per fixture product type.
+
+Each granule is run with and without skip_nc. Results can be written as JSON
+and compared with the results of another commit:
+
+    python -m benchmarks.create_item --repeat 20 --output before.json
+    git checkout other-branch
+    python -m benchmarks.create_item --repeat 20 --output after.json --compare before.json
+
+Comparing exits with status 1 if any median latency grew by more than
+--threshold.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from stactools.sentinel3 import __version__
+from stactools.sentinel3.instrumentation import StageStats
+from stactools.sentinel3.stac import create_item
+
+DATA_FILES = Path(__file__).parents[1] / "tests" / "data-files"
+
+SCHEMA_VERSION = 1
+
+
+def product_type(granule: Path) -> str:
+    return granule.name[4:12]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(granule: Path, skip_nc: bool, repeat: int) -> Dict[str, Any]:
+    """Benchmarks one granule, returning the result as a dictionary."""
+    try:
+        create_item(str(granule), skip_nc=skip_nc)  # warm up caches and imports
+    except Exception as e:
+        return {"error": repr(e)}
+
+    seconds = []
+    stats = StageStats()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        create_item(str(granule), skip_nc=skip_nc, instrumentation=stats)
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        create_item(str(granule), skip_nc=skip_nc)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p90 = np.percentile(seconds, [50, 90])
+    return {
+        "repeat": repeat,
+        "min": min(seconds),
+        "p50": float(p50),
+        "p90": float(p90),
+        "mean": float(np.mean(seconds)),
+        "items_per_second": repeat / sum(seconds),
+        "peak_bytes": peak,
+        "stages": {stage: s.p50 for stage, s in stats.summary().items()},
+    }
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float
+) -> List[str]:
+    """Returns a message for every case whose median latency grew by more
+    than ``threshold``, e.g. 0.2 for 20%."""
+    before = {(r["product_type"], r["skip_nc"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        reference = before.get((result["product_type"], result["skip_nc"]))
+        if reference is None or "error" in result or "error" in reference:
+            continue
+        ratio = result["p50"] / reference["p50"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{result['product_type']} skip_nc={result['skip_nc']}: "
+                f"{reference['p50'] * 1e3:.1f} ms -> {result['p50'] * 1e3:.1f} ms "
+                f"({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--pattern", default="*.SEN3")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare with results of another run")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'product':<9} {'skip_nc':<7} {'p50 ms':>8} {'p90 ms':>8} "
+        f"{'items/s':>8} {'peak KiB':>9}"
+    )
+    for granule in sorted(DATA_FILES.glob(args.pattern)):
+        for skip_nc in (True, False):
+            result = {
+                "product_type": product_type(granule),
+                "granule": granule.name,
+                "skip_nc": skip_nc,
+                **run(granule, skip_nc, args.repeat),
+            }
+            results.append(result)
+            if "error" in result:
+                print(f"{result['product_type']:<9} {skip_nc!s:<7} {result['error']}")
+                continue
+            print(
+                f"{result['product_type']:<9} {skip_nc!s:<7} "
+                f"{result['p50'] * 1e3:>8.2f} {result['p90'] * 1e3:>8.2f} "
+                f"{result['items_per_second']:>8.1f} "
+                f"{result['peak_bytes'] / 1024:>9.0f}"
+            )
+
+    if args.output:
+        document = {
+            "schema_version": SCHEMA_VERSION,
+            "package_version": __version__,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(document, indent=2))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(results, baseline["results"], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compares NetCDF header reads of the fixture granules over a local HTTP server.
+
+Run from the repository root:
+
+    python -m benchmarks.read_planner --latency 0.02
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from stactools.sentinel3.metadata_links import MetadataLinks
+from stactools.sentinel3.read_planner import prefetch_headers
+from tests.http_server import serve_directory
+
+DATA_FILES = Path(__file__).parents[1] / "tests" / "data-files"
+
+STRATEGIES: Dict[str, Dict[str, Any]] = {
+    # one file after the other, head and tail in separate requests
+    "serial": dict(max_workers=1, max_gap=0),
+    "planned": dict(),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--pattern", default="*.SEN3")
+    args = parser.parse_args()
+
+    print(
+        f"{'granule':<16} {'strategy':<8} {'requests':>8} {'bytes':>10} {'seconds':>8}"
+    )
+    with serve_directory(DATA_FILES, latency=args.latency) as (url, stats):
+        for granule in sorted(DATA_FILES.glob(args.pattern)):
+            if not (granule / "xfdumanifest.xml").exists():
+                continue
+            sizes = MetadataLinks(str(granule)).netcdf_sizes()
+            remote_sizes = {
+                href.replace(str(DATA_FILES), url): size for href, size in sizes.items()
+            }
+            for name, kwargs in STRATEGIES.items():
+                stats.reset()
+                start = time.perf_counter()
+                prefetch_headers(remote_sizes, **kwargs)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{granule.name[:16]:<16} {name:<8} {stats.requests:>8} "
+                    f"{stats.bytes_sent:>10} {elapsed:>8.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
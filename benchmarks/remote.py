@@ -0,0 +1,73 @@
+"""Measures create_item over a local stand-in for an object store serving the
+fixture granules, with per-request latency, a bandwidth cap and injected
+errors.
+
+Run from the repository root:
+
+    python -m benchmarks.remote --latency 0.02 --bandwidth 10e6 --pattern "*OL_1*"
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+from stactools.sentinel3.stac import create_item
+from tests.http_server import serve_directory
+
+DATA_FILES = Path(__file__).parents[1] / "tests" / "data-files"
+
+# NetCDF files can only be read over HTTP through prefetched headers
+MODES: Dict[str, Dict[str, Any]] = {
+    "skip_nc": dict(skip_nc=True),
+    "prefetch": dict(prefetch_headers=True),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pattern", default="*.SEN3")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--bandwidth", type=float, help="Bytes per second")
+    parser.add_argument("--error_rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'product':<9} {'mode':<9} {'requests':>8} {'bytes':>10} {'errors':>6} "
+        f"{'failed':>6} {'p50 s':>7}"
+    )
+    with serve_directory(
+        DATA_FILES,
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    ) as (url, stats):
+        for granule in sorted(DATA_FILES.glob(args.pattern)):
+            if not (granule / "xfdumanifest.xml").exists():
+                continue
+            for name, kwargs in MODES.items():
+                stats.reset()
+                seconds = []
+                failed = 0
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    try:
+                        create_item(f"{url}/{granule.name}", **kwargs)
+                    except Exception:
+                        failed += 1
+                    seconds.append(time.perf_counter() - start)
+                print(
+                    f"{granule.name[4:12]:<9} {name:<9} "
+                    f"{stats.requests // args.repeat:>8} "
+                    f"{stats.bytes_sent // args.repeat:>10} {stats.errors:>6} "
+                    f"{failed:>6} {np.median(seconds):>7.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
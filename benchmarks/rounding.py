@@ -0,0 +1,65 @@
+"""Compares recursive and array-based rounding of the fixed fixture footprints.
+
+Run from the repository root:
+
+    python -m benchmarks.rounding --repeat 500
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import shapely
+
+from stactools.sentinel3.geometry import (
+    fix_footprint,
+    recursive_round,
+    rounded_bounds,
+    rounded_mapping,
+)
+from tests.synthetic import manifest_footprint
+
+DATA_FILES = Path(__file__).parents[1] / "tests" / "data-files"
+
+
+def recursive(geometry):
+    bbox = recursive_round(list(geometry.bounds), precision=4)
+    geometry_dict = shapely.geometry.mapping(geometry)
+    geometry_dict["coordinates"] = recursive_round(
+        list(geometry_dict["coordinates"]), precision=4
+    )
+    return bbox, geometry_dict
+
+
+def vectorized(geometry):
+    return rounded_bounds(geometry, 4), rounded_mapping(geometry, 4)
+
+
+STRATEGIES = {"recursive": recursive, "vectorized": vectorized}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--pattern", default="*.SEN3")
+    args = parser.parse_args()
+
+    print(f"{'product':<9} {'type':<12} {'points':>6} {'strategy':<10} {'us/call':>8}")
+    for granule in sorted(DATA_FILES.glob(args.pattern)):
+        if not (granule / "xfdumanifest.xml").exists():
+            continue
+        geometry, _ = fix_footprint(manifest_footprint(granule))
+        points = shapely.get_num_coordinates(geometry)
+        for name, function in STRATEGIES.items():
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                function(geometry)
+            seconds = (time.perf_counter() - start) / args.repeat
+            print(
+                f"{granule.name[4:12]:<9} {geometry.geom_type:<12} {points:>6} "
+                f"{name:<10} {seconds * 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Measures how create_item scales with the size of its inputs, on synthetic
+granules generated from a fixture granule: the number of dataObjects in the
+manifest, the number of footprint vertices and the number of variables in the
+NetCDF headers.
+
+Run from the repository root:
+
+    python -m benchmarks.scaling --repeat 5 --product_type SL_1_RBT
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from stactools.sentinel3 import instrumentation
+from stactools.sentinel3.instrumentation import StageStats
+from stactools.sentinel3.stac import create_item
+from tests.synthetic import make_granule, templates
+
+# The parameter of each sweep, its values, the arguments of create_item to
+# compare and the stages to report
+SWEEPS: List[Tuple[str, List[int], Dict[str, Dict[str, Any]], List[str]]] = [
+    (
+        "data_objects",
+        [0, 1000, 10000],
+        {"skip_nc": {"skip_nc": True}},
+        [instrumentation.PARSE_MANIFEST, instrumentation.BAND_ASSETS],
+    ),
+    (
+        "footprint_points",
+        [100, 1000, 10000],
+        {"skip_nc": {"skip_nc": True}},
+        [instrumentation.PRODUCT_METADATA, instrumentation.NORMALIZE_FOOTPRINT],
+    ),
+    (
+        "variables",
+        [1, 10, 100, 300],
+        {"direct": {}, "prefetch": {"prefetch_headers": True}},
+        [instrumentation.PREFETCH_HEADERS, instrumentation.BAND_ASSETS],
+    ),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--product_type", default="OL_1_EFR")
+    args = parser.parse_args()
+    template = templates()[args.product_type]
+
+    print(f"{'parameter':<17} {'value':>6} {'mode':<9} {'p50 ms':>8}  stage p50s (ms)")
+    for parameter, values, modes, stages in SWEEPS:
+        for value in values:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                sweep: Dict[str, Any] = {parameter: value}
+                granule = make_granule(
+                    template,
+                    Path(tmp_dir),
+                    rewrite_netcdf=parameter == "variables",
+                    variable_attributes=10,
+                    **sweep,
+                )
+                for mode, kwargs in modes.items():
+                    create_item(str(granule), **kwargs)
+                    stats = StageStats()
+                    seconds = []
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        create_item(str(granule), instrumentation=stats, **kwargs)
+                        seconds.append(time.perf_counter() - start)
+                    summary = stats.summary()
+                    stage_times = " ".join(
+                        f"{stage}={summary[stage].p50 * 1e3:.2f}"
+                        for stage in stages
+                        if stage in summary
+                    )
+                    print(
+                        f"{parameter:<17} {value:>6} {mode:<9} "
+                        f"{np.median(seconds) * 1e3:>8.2f}  {stage_times}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compares the cost of serializing the fixture items, per product type.
+
+Run from the repository root:
+
+    python -m benchmarks.serialization --repeat 200
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Callable
+
+import pystac
+
+from stactools.sentinel3 import serialization
+from stactools.sentinel3.stac import create_item
+
+DATA_FILES = Path(__file__).parents[1] / "tests" / "data-files"
+
+
+def save_object_text(item: pystac.Item) -> bytes:
+    # what Item.save_object does, without the write
+    return (
+        pystac.StacIO.default()
+        .json_dumps(item.to_dict(include_self_link=True))
+        .encode("utf-8")
+    )
+
+
+def stdlib_text(item: pystac.Item) -> bytes:
+    return json.dumps(item.to_dict(), indent=2).encode("utf-8")
+
+
+STRATEGIES = {
+    "stdlib": stdlib_text,
+    "save_object": save_object_text,
+    "fast": serialization.item_to_json,
+}
+
+
+def per_item(function: Callable[[pystac.Item], bytes], item: pystac.Item, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        data = function(item)
+    return (time.perf_counter() - start) / repeat, len(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--pattern", default="*.SEN3")
+    args = parser.parse_args()
+
+    print(f"{'product':<9} {'strategy':<12} {'bytes':>8} {'us/item':>9}")
+    for granule in sorted(DATA_FILES.glob(args.pattern)):
+        try:
+            item = create_item(str(granule))
+        except Exception as e:
+            print(f"{granule.name[4:12]:<9} skipped: {e!r}")
+            continue
+        item.set_self_href(f"/tmp/{item.id}.json")
+        for name, function in STRATEGIES.items():
+            seconds, size = per_item(function, item, args.repeat)
+            print(f"{granule.name[4:12]:<9} {name:<12} {size:>8} {seconds * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compares the reference and vectorized winding order heuristics on the
+footprints of the fixture granules.
+
+Run from the repository root:
+
+    python -m benchmarks.winding --repeat 2000
+"""
+
+import argparse
+import copy
+import time
+from pathlib import Path
+
+from stactools.sentinel3.metadata_links import MetadataLinks
+from stactools.sentinel3.product_metadata import ProductMetadata
+from stactools.sentinel3.winding import get_winding, get_winding_vectorized
+
+DATA_FILES = Path(__file__).parents[1] / "tests" / "data-files"
+
+STRATEGIES = {"reference": get_winding, "vectorized": get_winding_vectorized}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--pattern", default="*.SEN3")
+    args = parser.parse_args()
+
+    print(
+        f"{'product':<9} {'points':>6} {'strategy':<10} {'winding':<7} {'us/call':>8}"
+    )
+    for granule in sorted(DATA_FILES.glob(args.pattern)):
+        if not (granule / "xfdumanifest.xml").exists():
+            continue
+        manifest = MetadataLinks(str(granule)).manifest
+        coords = ProductMetadata(str(granule), manifest).geometry["coordinates"][0]
+        coords = [list(c) for c in coords]
+        for name, function in STRATEGIES.items():
+            # the reference implementation modifies its input
+            copies = [copy.deepcopy(coords) for _ in range(args.repeat)]
+            start = time.perf_counter()
+            for c in copies:
+                winding = function(c, 120)
+            seconds = (time.perf_counter() - start) / args.repeat
+            print(
+                f"{granule.name[4:12]:<9} {len(coords):>6} {name:<10} "
+                f"{winding:<7} {seconds * 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
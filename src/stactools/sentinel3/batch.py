@@ -0,0 +1,344 @@
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import pystac
+from stactools.core.io import ReadHrefModifier
+
+from stactools.sentinel3.geometry import normalize_footprints
+from stactools.sentinel3.instrumentation import NORMALIZE_FOOTPRINT, Instrumentation
+from stactools.sentinel3.item_cache import ItemCache, item_options
+from stactools.sentinel3.stac import apply_footprint, create_item, prepare_item
+from stactools.sentinel3.trace_events import TraceRecorder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    """The outcome of creating the item for a single granule."""
+
+    granule_href: str
+    item: Optional[pystac.Item] = None
+    error: Optional[Exception] = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _create(granule_href: str, kwargs: Dict[str, Any]) -> Tuple[Any, ...]:
+    try:
+        return granule_href, create_item(granule_href, **kwargs), None
+    except Exception as e:
+        return granule_href, None, e
+
+
+def _prepare(granule_href: str, kwargs: Dict[str, Any]) -> Tuple[Any, ...]:
+    try:
+        return granule_href, prepare_item(granule_href, **kwargs), None
+    except Exception as e:
+        return granule_href, None, e
+
+
+@dataclass
+class _Cached:
+    # an item reused from the cache, which is already complete
+    item: pystac.Item
+
+
+def _lookup(
+    granule_href: str,
+    kwargs: Dict[str, Any],
+    function: Callable[[str, Dict[str, Any]], Tuple[Any, ...]],
+    item_cache: ItemCache,
+    options: str,
+) -> Tuple[Any, ...]:
+    try:
+        item = item_cache.lookup(granule_href, options, kwargs["read_href_modifier"])
+    except Exception as e:
+        # e.g. no manifest, which creating the item reports
+        logger.debug(f"Could not look up '{granule_href}' in the item cache: {e}")
+        item = None
+    if item is not None:
+        return granule_href, _Cached(item), None
+    return function(granule_href, kwargs)
+
+
+def _traced(
+    granule_href: str,
+    kwargs: Dict[str, Any],
+    function: Callable[[str, Dict[str, Any]], Tuple[Any, ...]],
+    origin: float,
+) -> Tuple[Tuple[Any, ...], List[Dict[str, Any]]]:
+    # Records the stages of an item in a worker process, and returns the trace
+    # events with the outcome
+    recorder = TraceRecorder(f"worker {os.getpid()}", origin=origin)
+    outcome = function(granule_href, dict(kwargs, instrumentation=recorder))
+    return outcome, recorder.events()
+
+
+def create_items(
+    granule_hrefs: Iterable[str],
+    skip_nc: bool = False,
+    read_href_modifier: Optional[ReadHrefModifier] = None,
+    prefetch_headers: bool = False,
+    simplify_tolerance: Optional[float] = None,
+    simplify_units: str = "degrees",
+    tie_point_footprint: bool = False,
+    track_footprint: bool = False,
+    quadkey_zoom: Optional[int] = None,
+    instrumentation: Optional[Instrumentation] = None,
+    max_workers: int = 4,
+    use_processes: bool = False,
+    batch_geometry: bool = False,
+    item_cache: Optional[ItemCache] = None,
+    skip_cached: bool = False,
+) -> Iterator[BatchResult]:
+    """Creates STAC Items for many Sentinel-3 granules concurrently.
+
+    Granule hrefs are consumed lazily, with at most ``2 * max_workers``
+    granules in flight, so this can be fed straight from
+    :func:`stactools.sentinel3.discovery.find_granules`. Results are yielded
+    in input order. A granule that fails doesn't stop the batch; its error is
+    returned in the result instead.
+
+    Args:
+        granule_hrefs (Iterable[str]): HREFs of the granules.
+        skip_nc (bool): Skip parsing NetCDF data files. Defaults to False.
+        read_href_modifier: A function that takes an HREF and returns a modified HREF.
+            Must be picklable when ``use_processes`` is set.
+        prefetch_headers (bool): Fetch NetCDF headers with planned, concurrent
+            range requests. Defaults to False.
+        simplify_tolerance (Optional[float]): Simplify footprints with this
+            tolerance. Defaults to None, which keeps them as they are.
+        simplify_units (str): Units of ``simplify_tolerance``, "degrees" or
+            "meters".
+        tie_point_footprint (bool): Derive footprints from tie-point grids.
+            See :func:`stactools.sentinel3.stac.create_item`.
+        track_footprint (bool): Derive SRAL footprints from their track.
+            See :func:`stactools.sentinel3.stac.create_item`.
+        quadkey_zoom (Optional[int]): Add the quadkeys covered by each item
+            at this zoom level. See :func:`stactools.sentinel3.stac.create_item`.
+        instrumentation (Optional[Instrumentation]): Receives the stages of
+            every item, from the worker threads; with ``batch_geometry``, the
+            time spent normalizing a group is shared between its items. Only
+            a :class:`stactools.sentinel3.trace_events.TraceRecorder` is
+            supported with ``use_processes``, merging the events recorded in
+            each worker process. Not supported with more than one worker
+            unless it is ``concurrent``.
+        max_workers (int): Number of granules processed concurrently.
+        use_processes (bool): Use a process pool instead of a thread pool.
+        batch_geometry (bool): Normalize the footprints of up to
+            ``max_workers`` granules at once in this process, with
+            :func:`stactools.sentinel3.geometry.normalize_footprints`, instead
+            of one by one in the workers.
+        item_cache (Optional[ItemCache]): Reuse the items of granules whose
+            manifest hasn't changed since they were cached, reading only the
+            manifest, and cache the items created. The manifest of a granule
+            that isn't cached is read twice. Not supported with
+            ``use_processes``.
+        skip_cached (bool): Don't yield the results of granules whose item
+            was reused from ``item_cache``.
+
+    Returns:
+        Iterator[BatchResult]: One result per granule.
+    """
+    kwargs: Dict[str, Any] = dict(
+        skip_nc=skip_nc,
+        read_href_modifier=read_href_modifier,
+        prefetch_headers=prefetch_headers,
+        tie_point_footprint=tie_point_footprint,
+        track_footprint=track_footprint,
+        instrumentation=instrumentation,
+    )
+    geometry_kwargs: Dict[str, Any] = dict(
+        simplify_tolerance=simplify_tolerance, simplify_units=simplify_units
+    )
+    normalize: Optional[Callable[[List[Tuple[Any, ...]]], List[Tuple[Any, ...]]]]
+    if batch_geometry:
+        function = _prepare
+        group_size = max_workers
+        normalize = partial(
+            _normalize,
+            geometry_kwargs=geometry_kwargs,
+            quadkey_zoom=quadkey_zoom,
+            instrumentation=instrumentation,
+        )
+    else:
+        function = _create
+        group_size = 1
+        normalize = None
+        kwargs.update(geometry_kwargs, quadkey_zoom=quadkey_zoom)
+
+    recorder = None
+    if use_processes and instrumentation is not None:
+        if not isinstance(instrumentation, TraceRecorder):
+            raise ValueError(
+                "Only a TraceRecorder is supported as instrumentation with "
+                "use_processes"
+            )
+        recorder = instrumentation
+        kwargs["instrumentation"] = None
+        function = partial(_traced, function=function, origin=recorder.origin)
+    if max_workers > 1 and instrumentation is not None:
+        if not instrumentation.concurrent:
+            raise ValueError("The instrumentation needs max_workers=1")
+    if use_processes and item_cache is not None:
+        raise ValueError("The item cache isn't supported with use_processes")
+    options = ""
+    if item_cache is not None:
+        options = item_options(
+            skip_nc=skip_nc,
+            tie_point_footprint=tie_point_footprint,
+            track_footprint=track_footprint,
+            quadkey_zoom=quadkey_zoom,
+            **geometry_kwargs,
+        )
+        function = partial(
+            _lookup, function=function, item_cache=item_cache, options=options
+        )
+
+    executor: Executor
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    with executor:
+        in_flight: Deque[Future] = deque()
+        for granule_href in granule_hrefs:
+            if instrumentation is not None:
+                instrumentation.item_submitted(granule_href)
+            in_flight.append(executor.submit(function, granule_href, kwargs))
+            if len(in_flight) >= 2 * max_workers:
+                group = [in_flight.popleft() for _ in range(group_size)]
+                yield from _finish(
+                    _results(group, normalize, recorder),
+                    item_cache,
+                    options,
+                    skip_cached,
+                    instrumentation,
+                )
+        while in_flight:
+            group = [in_flight.popleft() for _ in range(group_size) if in_flight]
+            yield from _finish(
+                _results(group, normalize, recorder),
+                item_cache,
+                options,
+                skip_cached,
+                instrumentation,
+            )
+
+
+def _normalize(
+    prepared: List[Tuple[Any, ...]],
+    geometry_kwargs: Dict[str, Any],
+    quadkey_zoom: Optional[int],
+    instrumentation: Optional[Instrumentation],
+    start: Optional[float] = None,
+) -> List[Tuple[Any, ...]]:
+    # Normalizes the footprints of the prepared items of a group, and applies
+    # them; falls back to one footprint at a time if any of them fails. The
+    # stage is started once, by the group, which passes its start on
+    if start is None:
+        if instrumentation is not None:
+            for granule_href, _, _ in prepared:
+                instrumentation.stage_started(granule_href, NORMALIZE_FOOTPRINT)
+        start = time.perf_counter()
+    footprints = [item_footprint[1] for _, item_footprint, _ in prepared]
+    try:
+        normalized = normalize_footprints(footprints, **geometry_kwargs)
+        for (_, (item, _), _), footprint in zip(prepared, normalized):
+            apply_footprint(item, footprint, quadkey_zoom)
+    except Exception as e:
+        if len(prepared) == 1:
+            return [(prepared[0][0], None, e)]
+        return [
+            outcome
+            for single in prepared
+            for outcome in _normalize(
+                [single], geometry_kwargs, quadkey_zoom, instrumentation, start
+            )
+        ]
+    if instrumentation is not None:
+        seconds = (time.perf_counter() - start) / len(prepared)
+        for granule_href, _, _ in prepared:
+            instrumentation.stage_finished(
+                granule_href, NORMALIZE_FOOTPRINT, seconds, 0
+            )
+    return [(granule_href, item, None) for granule_href, (item, _), _ in prepared]
+
+
+def _results(
+    group: List[Future],
+    normalize: Optional[Callable[[List[Tuple[Any, ...]]], List[Tuple[Any, ...]]]],
+    recorder: Optional[TraceRecorder] = None,
+) -> List[BatchResult]:
+    outcomes = [future.result() for future in group]
+    if recorder is not None:
+        # the outcomes of worker processes come with their trace events
+        for outcome, events in outcomes:
+            recorder.merge(outcome[0], events)
+        outcomes = [outcome for outcome, _ in outcomes]
+    if normalize is not None:
+        prepared = [
+            outcome
+            for outcome in outcomes
+            if outcome[2] is None and not isinstance(outcome[1], _Cached)
+        ]
+        normalized = iter(normalize(prepared) if prepared else [])
+        outcomes = [
+            (
+                next(normalized)
+                if outcome[2] is None and not isinstance(outcome[1], _Cached)
+                else outcome
+            )
+            for outcome in outcomes
+        ]
+
+    results = []
+    for granule_href, item, error in outcomes:
+        if error is not None:
+            logger.warning(f"Failed to create item for '{granule_href}': {error}")
+        if isinstance(item, _Cached):
+            results.append(BatchResult(granule_href, item.item, cached=True))
+        else:
+            results.append(BatchResult(granule_href, item, error))
+    return results
+
+
+def _finish(
+    results: List[BatchResult],
+    item_cache: Optional[ItemCache],
+    options: str,
+    skip_cached: bool,
+    instrumentation: Optional[Instrumentation],
+) -> Iterator[BatchResult]:
+    # Caches the items created, before they are handed out and modified, and
+    # reports every granule as finished, including those not handed out
+    for result in results:
+        if item_cache is not None and result.item is not None and not result.cached:
+            item_cache.put(result.granule_href, result.item, options)
+        if instrumentation is not None:
+            instrumentation.item_finished(
+                result.granule_href, result.error, result.cached
+            )
+        if not (skip_cached and result.cached):
+            yield result
@@ -3,7 +3,30 @@ import os
 
 import click
 
+from stactools.sentinel3.batch import create_items
+from stactools.sentinel3.discovery import GranuleFilter, find_granules
+from stactools.sentinel3.instrumentation import (
+    SERIALIZE,
+    IOReport,
+    MultiInstrumentation,
+    StageStats,
+    StageTimer,
+)
+from stactools.sentinel3.item_cache import ItemCache
+from stactools.sentinel3.memory_profile import MemoryProfile
+from stactools.sentinel3.metrics import BatchMetrics
+from stactools.sentinel3.orbit_index import OrbitIndex
+from stactools.sentinel3.serialization import (
+    item_to_json,
+    read_index_items,
+    relative_items_href,
+    save_item,
+    save_items_ndjson,
+)
 from stactools.sentinel3.stac import create_item
+from stactools.sentinel3.tiles import TileIndex
+from stactools.sentinel3.time_index import TimeIndex
+from stactools.sentinel3.trace_events import TraceRecorder
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +50,64 @@ def create_sentinel3_command(cli):
     @click.option(
         "--skip_nc", default=False, help="Insert <True> to skip reading nc files"
     )
-    def create_item_command(src, dst, skip_nc):
+    @click.option(
+        "--prefetch_headers",
+        default=False,
+        help="Insert <True> to fetch NetCDF headers with concurrent range requests",
+    )
+    @click.option(
+        "--simplify_tolerance",
+        type=float,
+        help="Simplify footprints with this tolerance, keeping them covered",
+    )
+    @click.option(
+        "--simplify_units",
+        type=click.Choice(["degrees", "meters"]),
+        default="degrees",
+        help="Units of --simplify_tolerance",
+    )
+    @click.option(
+        "--tie_point_footprint",
+        default=False,
+        help="Insert <True> to derive footprints from the tie-point geolocation grid",
+    )
+    @click.option(
+        "--track_footprint",
+        default=False,
+        help="Insert <True> to derive SRAL footprints from the 1 Hz track",
+    )
+    @click.option(
+        "--quadkey_zoom",
+        type=int,
+        help="Add the quadkeys of the tiles at this zoom level the footprint covers",
+    )
+    @click.option(
+        "--io_report",
+        default=False,
+        help="Insert <True> to print the files read, with opens, bytes and ranges",
+    )
+    @click.option(
+        "--memory_profile",
+        help="Profile memory with tracemalloc, printing the peaks per product type "
+        "and stage and writing them to this JSON file",
+    )
+    @click.option(
+        "--fast_json", default=False, help="Insert <True> to write compact JSON"
+    )
+    def create_item_command(
+        src,
+        dst,
+        skip_nc,
+        prefetch_headers,
+        simplify_tolerance,
+        simplify_units,
+        tie_point_footprint,
+        track_footprint,
+        quadkey_zoom,
+        io_report,
+        memory_profile,
+        fast_json,
+    ):
         """Creates a STAC Collection
 
         Args:
@@ -36,12 +116,428 @@ def create_sentinel3_command(cli):
             skip_nc (bool): Skip parsing NetCDF data files. Since these are large, this saves
                 bandwidth when working over network, at the cost of metadata we can obtain
                 from them. Defaults to False.
+            prefetch_headers (bool): Fetch the headers of all NetCDF files with planned,
+                concurrent range requests. Defaults to False.
+            simplify_tolerance (float): Simplify the footprint with this tolerance.
+            simplify_units (str): Units of simplify_tolerance, degrees or meters.
+            tie_point_footprint (bool): Derive the footprint from the tie-point
+                geolocation grid. Defaults to False.
+            track_footprint (bool): Derive the footprint of SRAL granules from
+                their 1 Hz track. Defaults to False.
+            quadkey_zoom (int): Add the quadkeys covered by the footprint at
+                this zoom level as the s3:quadkeys property.
+            io_report (bool): Print the files read, with the number of opens,
+                bytes, distinct ranges and time blocked. Defaults to False.
+            memory_profile (str): Profile memory with tracemalloc and write the
+                peaks and top allocation sites to this JSON file.
+            fast_json (bool): Write compact JSON with a faster serializer.
+                Defaults to False.
         """
-        item = create_item(src, skip_nc)
+        report = IOReport() if io_report else None
+        profile = MemoryProfile() if memory_profile else None
+        instrumentations = [i for i in (report, profile) if i is not None]
+        if profile is not None:
+            profile.start()
+        item = create_item(
+            src,
+            skip_nc,
+            prefetch_headers=prefetch_headers,
+            simplify_tolerance=simplify_tolerance,
+            simplify_units=simplify_units,
+            tie_point_footprint=tie_point_footprint,
+            track_footprint=track_footprint,
+            quadkey_zoom=quadkey_zoom,
+            instrumentation=(
+                MultiInstrumentation(instrumentations) if instrumentations else None
+            ),
+        )
+        if profile is not None:
+            profile.stop()
 
         item_path = os.path.join(dst, "{}.json".format(item.id))
-        item.set_self_href(item_path)
+        if fast_json:
+            save_item(item, item_path)
+        else:
+            item.set_self_href(item_path)
+            item.save_object()
 
-        item.save_object()
+        if report is not None:
+            click.echo(report.format())
+        if profile is not None:
+            profile.save(memory_profile)
+            click.echo(profile.format())
+
+    @sentinel3.command(
+        "create-items",
+        short_help="Convert all Sentinel3 scenes below a directory into STAC items",
+    )
+    @click.argument("src")
+    @click.argument("dst")
+    @click.option(
+        "--skip_nc", default=False, help="Insert <True> to skip reading nc files"
+    )
+    @click.option(
+        "--prefetch_headers",
+        default=False,
+        help="Insert <True> to fetch NetCDF headers with concurrent range requests",
+    )
+    @click.option("--mission", multiple=True, help="Only include a mission, e.g. S3A")
+    @click.option(
+        "--data_source", multiple=True, help="Only include a data source, e.g. OL"
+    )
+    @click.option(
+        "--level", type=int, multiple=True, help="Only include a processing level"
+    )
+    @click.option(
+        "--data_type", multiple=True, help="Only include a data type, e.g. EFR"
+    )
+    @click.option(
+        "--start", help="Earliest sensing start time, e.g. 20211021 or 20211021T0738"
+    )
+    @click.option("--end", help="Latest sensing start time, in the same format")
+    @click.option("--workers", default=4, help="Number of granules processed at once")
+    @click.option(
+        "--discovery_workers", default=8, help="Number of directories scanned at once"
+    )
+    @click.option(
+        "--simplify_tolerance",
+        type=float,
+        help="Simplify footprints with this tolerance, keeping them covered",
+    )
+    @click.option(
+        "--simplify_units",
+        type=click.Choice(["degrees", "meters"]),
+        default="degrees",
+        help="Units of --simplify_tolerance",
+    )
+    @click.option(
+        "--tie_point_footprint",
+        default=False,
+        help="Insert <True> to derive footprints from the tie-point geolocation grid",
+    )
+    @click.option(
+        "--track_footprint",
+        default=False,
+        help="Insert <True> to derive SRAL footprints from the 1 Hz track",
+    )
+    @click.option(
+        "--quadkey_zoom",
+        type=int,
+        help="Add the quadkeys of the tiles at this zoom level the footprint covers",
+    )
+    @click.option(
+        "--fast_json", default=False, help="Insert <True> to write compact JSON"
+    )
+    @click.option(
+        "--ndjson",
+        help="Write all items to this newline-delimited JSON file inside DST",
+    )
+    @click.option(
+        "--tile_index",
+        help="Write an index from quadkeys to item IDs to this JSON file inside DST; "
+        "requires --quadkey_zoom",
+    )
+    @click.option(
+        "--orbit_index",
+        help="Write an index of the items by orbit to this JSON file inside DST",
+    )
+    @click.option(
+        "--time_index",
+        help="Write an index of the items by time to this JSON file inside DST",
+    )
+    @click.option(
+        "--stage_timings",
+        default=False,
+        help="Insert <True> to print per-stage timing percentiles at the end",
+    )
+    @click.option(
+        "--io_report",
+        default=False,
+        help="Insert <True> to print the files read, with opens, bytes and ranges",
+    )
+    @click.option(
+        "--memory_profile",
+        help="Profile memory with tracemalloc, printing the peaks per product type "
+        "and stage and writing them to this JSON file",
+    )
+    @click.option(
+        "--trace",
+        help="Record the stages of every item, per worker, to this Chrome "
+        "trace-event JSON file, viewable in Perfetto",
+    )
+    @click.option(
+        "--metrics_textfile",
+        help="Keep Prometheus metrics of the run in this file, for the textfile "
+        "collector of the node exporter",
+    )
+    @click.option(
+        "--metrics_interval",
+        type=float,
+        default=15.0,
+        help="Seconds between writes of --metrics_textfile",
+    )
+    @click.option(
+        "--item_cache",
+        help="Reuse the items of granules whose manifest hasn't changed from this "
+        "cache file, and save the items created to it",
+    )
+    @click.option(
+        "--skip_cached",
+        default=False,
+        help="Insert <True> to not rewrite the JSON files of the items reused from "
+        "--item_cache; they are still written to --ndjson and the indexes",
+    )
+    @click.option(
+        "--batch_geometry",
+        default=False,
+        help="Insert <True> to normalize the footprints of several granules at once",
+    )
+    def create_items_command(
+        src,
+        dst,
+        skip_nc,
+        prefetch_headers,
+        mission,
+        data_source,
+        level,
+        data_type,
+        start,
+        end,
+        workers,
+        discovery_workers,
+        simplify_tolerance,
+        simplify_units,
+        tie_point_footprint,
+        track_footprint,
+        quadkey_zoom,
+        fast_json,
+        ndjson,
+        tile_index,
+        orbit_index,
+        time_index,
+        stage_timings,
+        io_report,
+        memory_profile,
+        trace,
+        metrics_textfile,
+        metrics_interval,
+        item_cache,
+        skip_cached,
+        batch_geometry,
+    ):
+        """Creates a STAC Item for every matching SEN3 granule below a directory
+
+        Args:
+            src (str): directory tree to search for granules
+            dst (str): directory in which the STAC Item JSON files will be created
+        """
+        if tile_index and quadkey_zoom is None:
+            raise click.UsageError("--tile_index requires --quadkey_zoom")
+        if skip_cached and not item_cache:
+            raise click.UsageError("--skip_cached requires --item_cache")
+        if memory_profile and workers > 1:
+            raise click.UsageError("--memory_profile requires --workers 1")
+
+        granule_filter = GranuleFilter(
+            missions=mission or None,
+            data_sources=data_source or None,
+            processing_levels=level or None,
+            data_types=data_type or None,
+            start=start,
+            end=end,
+        )
+        granule_hrefs = find_granules(src, granule_filter, discovery_workers)
+        stats = StageStats() if stage_timings else None
+        report = IOReport() if io_report else None
+        profile = MemoryProfile() if memory_profile else None
+        recorder = TraceRecorder() if trace else None
+        metrics = (
+            BatchMetrics(metrics_textfile, metrics_interval)
+            if metrics_textfile
+            else None
+        )
+        instrumentations = [
+            i for i in (stats, report, profile, recorder, metrics) if i is not None
+        ]
+        instrumentation = (
+            MultiInstrumentation(instrumentations) if instrumentations else None
+        )
+        if profile is not None:
+            profile.start()
+        if metrics is not None:
+            metrics.start()
+        cache = None
+        if item_cache:
+            cache = (
+                ItemCache.load(item_cache)
+                if os.path.exists(item_cache)
+                else ItemCache()
+            )
+
+        results = create_items(
+            granule_hrefs,
+            skip_nc,
+            prefetch_headers=prefetch_headers,
+            simplify_tolerance=simplify_tolerance,
+            simplify_units=simplify_units,
+            tie_point_footprint=tie_point_footprint,
+            track_footprint=track_footprint,
+            quadkey_zoom=quadkey_zoom,
+            instrumentation=instrumentation,
+            max_workers=workers,
+            batch_geometry=batch_geometry,
+            item_cache=cache,
+        )
+
+        failed = 0
+
+        def created_results():
+            nonlocal failed
+            for result in results:
+                if result.item is None:
+                    failed += 1
+                else:
+                    # the item is written while the generator is suspended
+                    timer = StageTimer(instrumentation, result.granule_href)
+                    timer.begin(SERIALIZE)
+                    yield result
+                    timer.end()
+
+        tiles = TileIndex() if tile_index else None
+
+        def items_href(index_name):
+            # the NDJSON file is found relative to the index
+            if not ndjson:
+                return None
+            return relative_items_href(
+                os.path.join(dst, index_name), os.path.join(dst, ndjson)
+            )
+
+        orbits = OrbitIndex(items_href=items_href(orbit_index)) if orbit_index else None
+        times = TimeIndex(items_href=items_href(time_index)) if time_index else None
+
+        def index_item(item, offset=-1):
+            if tiles is not None:
+                tiles.add_item(item)
+            for index in (orbits, times):
+                if index is not None:
+                    index.add_item(item, offset)
+
+        if ndjson:
+            # the file is rewritten, so it has the items reused too
+            save_items_ndjson(
+                (result.item for result in created_results()),
+                os.path.join(dst, ndjson),
+                on_write=index_item,
+            )
+        else:
+            for result in created_results():
+                item = result.item
+                index_item(item)
+                if skip_cached and result.cached:
+                    continue
+                item_path = os.path.join(dst, "{}.json".format(item.id))
+                if fast_json:
+                    save_item(item, item_path)
+                else:
+                    item.set_self_href(item_path)
+                    item.save_object()
+
+        if profile is not None:
+            profile.stop()
+        if metrics is not None:
+            metrics.stop()
+        if cache is not None:
+            cache.save(item_cache)
+            logger.info(f"Reused {cache.hits} item(s) from {item_cache}")
+
+        for index, name in (
+            (tiles, tile_index),
+            (orbits, orbit_index),
+            (times, time_index),
+        ):
+            if index is not None:
+                index.save(os.path.join(dst, name))
+
+        if failed:
+            logger.warning(f"Could not create items for {failed} granule(s)")
+        if stats is not None:
+            click.echo(stats.format())
+        if report is not None:
+            click.echo(report.format())
+        if profile is not None:
+            profile.save(memory_profile)
+            click.echo(profile.format())
+        if recorder is not None:
+            recorder.save(trace)
+
+    @sentinel3.command(
+        "query-orbits",
+        short_help="Find items by orbit in an index written by create-items",
+    )
+    @click.argument("index")
+    @click.option("--relative_orbit", type=int, help="The relative orbit")
+    @click.option("--cycle", type=int, help="Only items of this cycle")
+    @click.option("--absolute_orbit", type=int, help="The absolute orbit")
+    @click.option(
+        "--items",
+        default=False,
+        help="Insert <True> to print the items from the NDJSON file, not their IDs",
+    )
+    def query_orbits_command(index, relative_orbit, cycle, absolute_orbit, items):
+        """Prints the IDs of the items of an orbit, one per line
+
+        Args:
+            index (str): orbit index written by create-items --orbit_index
+        """
+        if (relative_orbit is None) == (absolute_orbit is None):
+            raise click.UsageError(
+                "Give exactly one of --relative_orbit and --absolute_orbit"
+            )
+        orbits = OrbitIndex.load(index)
+        if relative_orbit is not None:
+            entries = orbits.find(relative_orbit, cycle)
+        else:
+            entries = orbits.find_absolute(absolute_orbit)
+        if items:
+            offsets = (entry.offset for entry in entries)
+            for item in read_index_items(index, orbits.items_href, offsets):
+                click.echo(item_to_json(item).decode("utf-8"))
+        else:
+            for entry in entries:
+                click.echo(entry.item_id)
+
+    @sentinel3.command(
+        "query-times",
+        short_help="Find items by time in an index written by create-items",
+    )
+    @click.argument("index")
+    @click.argument("product_type")
+    @click.argument("start")
+    @click.argument("end")
+    @click.option(
+        "--items",
+        default=False,
+        help="Insert <True> to print the items from the NDJSON file, not their IDs",
+    )
+    def query_times_command(index, product_type, start, end, items):
+        """Prints the IDs of the items of a product type overlapping a time
+        window, one per line
+
+        Args:
+            index (str): time index written by create-items --time_index
+            product_type (str): product type, e.g. OL_1_EFR
+            start (str): start of the window, e.g. 2021-10-21T07:00:00Z
+            end (str): end of the window, in the same format
+        """
+        times = TimeIndex.load(index)
+        entries = times.find(product_type, start, end)
+        if items:
+            offsets = (entry.offset for entry in entries)
+            for item in read_index_items(index, times.items_href, offsets):
+                click.echo(item_to_json(item).decode("utf-8"))
+        else:
+            for entry in entries:
+                click.echo(entry.item_id)
 
         return sentinel3
@@ -0,0 +1,122 @@
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Collection, Iterator, List, Optional, Set, Tuple
+
+from stactools.sentinel3.file_name import FileName
+
+logger = logging.getLogger(__name__)
+
+SEN3_SUFFIX = ".SEN3"
+
+
+@dataclass
+class GranuleFilter:
+    """Selects granules by the fields of their SEN3 name.
+
+    Fields left as None match everything. ``start`` and ``end`` are compared
+    against the sensing start time, formatted like the file name
+    (e.g. ``20211021T073827``); prefixes such as ``20211021`` work too.
+    """
+
+    missions: Optional[Collection[str]] = None
+    data_sources: Optional[Collection[str]] = None
+    processing_levels: Optional[Collection[int]] = None
+    data_types: Optional[Collection[str]] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+    def matches(self, name: str) -> bool:
+        try:
+            file_name = FileName.from_str(name)
+        except ValueError:
+            return False
+        if self.missions is not None and file_name.mission_id not in self.missions:
+            return False
+        if (
+            self.data_sources is not None
+            and file_name.data_source not in self.data_sources
+        ):
+            return False
+        if (
+            self.processing_levels is not None
+            and file_name.processing_level not in self.processing_levels
+        ):
+            return False
+        if (
+            self.data_types is not None
+            and file_name.data_type_id not in self.data_types
+        ):
+            return False
+        sensing_start = file_name.sensing_start_time
+        if self.start is not None and sensing_start[: len(self.start)] < self.start:
+            return False
+        if self.end is not None and sensing_start[: len(self.end)] > self.end:
+            return False
+        return True
+
+
+def _scan(directory: str, granule_filter: GranuleFilter) -> Tuple[List[str], List[str]]:
+    granules = []
+    subdirectories = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if not is_dir:
+                    continue
+                if entry.name.endswith(SEN3_SUFFIX):
+                    # granules are never nested, so their content isn't scanned
+                    if granule_filter.matches(entry.name):
+                        granules.append(entry.path)
+                else:
+                    subdirectories.append(entry.path)
+    except OSError as e:
+        logger.warning(f"Could not scan '{directory}': {e}")
+    return granules, subdirectories
+
+
+def find_granules(
+    root: str,
+    granule_filter: Optional[GranuleFilter] = None,
+    max_workers: int = 8,
+) -> Iterator[str]:
+    """Finds SEN3 granules below a directory.
+
+    Directories are scanned with ``os.scandir`` by a pool of workers, and
+    granules are yielded as soon as they are found, so the full list is never
+    held in memory. Granules whose name doesn't follow the SEN3 naming
+    convention or doesn't pass ``granule_filter`` are skipped without looking
+    inside them.
+
+    Args:
+        root (str): The directory to search. May itself be a granule.
+        granule_filter (Optional[GranuleFilter]): Selects the granules to yield.
+        max_workers (int): Number of directories scanned concurrently.
+
+    Returns:
+        Iterator[str]: Paths to the granules, in no particular order.
+    """
+    if granule_filter is None:
+        granule_filter = GranuleFilter()
+    root = os.path.normpath(root)
+    if root.endswith(SEN3_SUFFIX):
+        if granule_filter.matches(os.path.basename(root)):
+            yield root
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending: Set[Future] = {pool.submit(_scan, root, granule_filter)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                granules, subdirectories = future.result()
+                for subdirectory in subdirectories:
+                    pending.add(pool.submit(_scan, subdirectory, granule_filter))
+                yield from granules
@@ -0,0 +1,595 @@
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import antimeridian
+import numpy as np
+import shapely  # type: ignore
+import shapely.affinity  # type: ignore
+import shapely.geometry  # type: ignore
+from shapely.geometry import Polygon  # type: ignore
+from shapely.geometry.base import BaseGeometry  # type: ignore
+
+from .winding import winding_order, wrap_longitudes
+
+logger = logging.getLogger(__name__)
+
+# Footprints with all longitudes at least this many degrees away from ±180,
+# spanning less than 180 degrees, can't cross the antimeridian
+ANTIMERIDIAN_MARGIN = 1.0
+
+# Footprints fixed with the north pole forced (slstr-lst strips) only skip the
+# antimeridian fix when they stay below this latitude
+POLAR_LATITUDE = 80.0
+
+# Consecutive points closer than this are merged by antimeridian.fix_polygon
+_DUPLICATE_TOLERANCE = 1e-8
+
+FAST_PATH = "fast"
+ANTIMERIDIAN_PATH = "antimeridian"
+POLAR_PATH = "polar"
+# Footprints that were already split at the antimeridian, e.g. altimetry tracks
+TRACK_PATH = "track"
+
+_path_counts: Counter = Counter()
+_path_counts_lock = threading.Lock()
+
+
+def recursive_round(coordinates: List[Any], precision: int) -> List[Any]:
+    """Rounds a list of numbers. The list can contain additional nested lists
+    or tuples of numbers.
+
+    Any tuples encountered will be converted to lists.
+
+    Args:
+        coordinates (List[Any]): A list of numbers, possibly containing nested
+            lists or tuples of numbers.
+        precision (int): Number of decimal places to use for rounding.
+
+    Returns:
+        List[Any]: The list of numbers rounded to the given precision.
+    """
+    rounded: List[Any] = []
+    for value in coordinates:
+        if isinstance(value, (int, float)):
+            rounded.append(round(value, precision))
+        else:
+            rounded.append(recursive_round(list(value), precision))
+    return rounded
+
+
+def geometry_path_counts() -> Dict[str, int]:
+    """Returns how often each path of :func:`fix_footprint` was taken in this
+    process, by path name, with footprints built from a track as
+    :data:`TRACK_PATH`."""
+    with _path_counts_lock:
+        return dict(_path_counts)
+
+
+def reset_geometry_path_counts() -> None:
+    with _path_counts_lock:
+        _path_counts.clear()
+
+
+def _count(path: str) -> None:
+    _count_many(path, 1)
+
+
+def _count_many(path: str, count: int) -> None:
+    if not count:
+        return
+    with _path_counts_lock:
+        _path_counts[path] += count
+
+
+def classify_footprint(coords: np.ndarray, force_north_pole: bool = False) -> str:
+    """Decides whether a footprint needs the antimeridian fix.
+
+    Args:
+        coords (np.ndarray): (n, 2) array of the footprint's exterior, with
+            longitudes in the range [-180, 180).
+        force_north_pole (bool): Whether the footprint would be fixed with the
+            north pole forced.
+
+    Returns:
+        str: :data:`FAST_PATH` if the footprint can't cross the antimeridian,
+        :data:`POLAR_PATH` if it comes close to the north pole with the pole
+        forced, :data:`ANTIMERIDIAN_PATH` otherwise.
+    """
+    lons = coords[:, 0]
+    lats = coords[:, 1]
+    if force_north_pole and lats.max() >= POLAR_LATITUDE:
+        return POLAR_PATH
+    min_lon = lons.min()
+    max_lon = lons.max()
+    if (
+        min_lon <= -180 + ANTIMERIDIAN_MARGIN
+        or max_lon >= 180 - ANTIMERIDIAN_MARGIN
+        or max_lon - min_lon >= 180
+    ):
+        return ANTIMERIDIAN_PATH
+    return FAST_PATH
+
+
+def _fast_polygon(coords: np.ndarray) -> Optional[Polygon]:
+    # near-duplicate points and clockwise rings are rare, and are left to
+    # antimeridian.fix_polygon so that they are handled exactly as before
+    steps = np.abs(np.diff(coords, axis=0))
+    if np.any(np.all(steps <= _DUPLICATE_TOLERANCE, axis=1)):
+        return None
+    polygon = Polygon(coords)
+    if not shapely.is_ccw(polygon.exterior):
+        return None
+    return polygon
+
+
+def fix_footprint(
+    polygon: Polygon, force_north_pole: bool = False
+) -> Tuple[BaseGeometry, str]:
+    """Fixes a footprint that may cross the antimeridian.
+
+    Gives the same geometry as ``antimeridian.fix_polygon``, but footprints
+    that are far from the antimeridian (and, with ``force_north_pole``, from
+    the north pole) skip it and only have their longitudes wrapped.
+
+    Args:
+        polygon (Polygon): The footprint.
+        force_north_pole (bool): Passed on to ``antimeridian.fix_polygon``.
+
+    Returns:
+        Tuple[BaseGeometry, str]: The fixed footprint, and the path taken.
+    """
+    path = ANTIMERIDIAN_PATH
+    if not polygon.interiors:
+        coords = wrap_longitudes(shapely.get_coordinates(polygon.exterior))
+        path = classify_footprint(coords, force_north_pole)
+        if path == FAST_PATH:
+            fixed = _fast_polygon(coords)
+            if fixed is not None:
+                _count(path)
+                return fixed, path
+            path = ANTIMERIDIAN_PATH
+
+    geometry = antimeridian.fix_polygon(polygon, force_north_pole=force_north_pole)
+    _count(path)
+    return geometry, path
+
+
+# Scaled values this close to a rounding boundary are rounded with round(),
+# well beyond the error of the scaling for coordinates and bounds
+_HALF_WINDOW = 1e-7
+_MAX_SCALED = 2.0**40
+
+
+def round_array(values: np.ndarray, precision: int) -> np.ndarray:
+    """Rounds floats to a number of decimal places, giving exactly the values
+    of Python's ``round``.
+
+    The values are scaled, rounded half to even and scaled back. That only
+    differs from ``round`` when scaling moves a value across a rounding
+    boundary, so the few values close to one are rounded with ``round``.
+
+    Args:
+        values (np.ndarray): The values to round.
+        precision (int): Number of decimal places to use for rounding.
+
+    Returns:
+        np.ndarray: The rounded values, as a new float array.
+    """
+    values = np.asarray(values, dtype=float)
+    factor = 10.0**precision
+    scaled = values * factor
+    rounded = np.rint(scaled) / factor
+    fraction = scaled - np.floor(scaled)
+    unsure = (np.abs(fraction - 0.5) < _HALF_WINDOW) | ~(np.abs(scaled) < _MAX_SCALED)
+    if np.any(unsure):
+        for index in zip(*np.nonzero(unsure)):
+            rounded[index] = round(float(values[index]), precision)
+    return rounded
+
+
+def _rounded_polygon(
+    polygon: Polygon, coords: np.ndarray, offset: int
+) -> Tuple[List[Any], int]:
+    rings = []
+    for ring in (polygon.exterior, *polygon.interiors):
+        end = offset + len(ring.coords)
+        rings.append(coords[offset:end].tolist())
+        offset = end
+    return rings, offset
+
+
+def rounded_mapping(geometry: BaseGeometry, precision: int) -> Dict[str, Any]:
+    """Returns the GeoJSON-like mapping of a geometry with its coordinates
+    rounded, as ``recursive_round`` would, but rounding all of them at once.
+
+    Args:
+        geometry (BaseGeometry): A Polygon or MultiPolygon. Other geometries
+            are rounded with ``recursive_round``.
+        precision (int): Number of decimal places to use for rounding.
+
+    Returns:
+        Dict[str, Any]: The mapping, with lists instead of tuples.
+    """
+    if geometry.has_z or geometry.geom_type not in ("Polygon", "MultiPolygon"):
+        geometry_dict = dict(shapely.geometry.mapping(geometry))
+        geometry_dict["coordinates"] = recursive_round(
+            list(geometry_dict["coordinates"]), precision
+        )
+        return geometry_dict
+
+    coords = round_array(shapely.get_coordinates(geometry), precision)
+    if geometry.geom_type == "Polygon":
+        coordinates, _ = _rounded_polygon(geometry, coords, 0)
+    else:
+        coordinates = []
+        offset = 0
+        for polygon in geometry.geoms:
+            rings, offset = _rounded_polygon(polygon, coords, offset)
+            coordinates.append(rings)
+    return {"type": geometry.geom_type, "coordinates": coordinates}
+
+
+def rounded_bounds(geometry: BaseGeometry, precision: int) -> List[float]:
+    """Returns the bounds of a geometry, rounded as ``recursive_round`` would."""
+    return round_array(np.array(geometry.bounds), precision).tolist()
+
+
+# Meters per degree of latitude. A tolerance in meters is converted with it,
+# which is conservative for longitude, whose degrees are shorter.
+METERS_PER_DEGREE = 111_320.0
+
+# Extra distance the simplified footprint keeps from the original, so that
+# rounding its coordinates to 4 decimal places can't uncover the original
+COVERAGE_MARGIN = 1e-4
+
+_WORLD = shapely.geometry.box(-180, -90, 180, 90)
+
+
+@dataclass
+class SimplifiedFootprint:
+    """The result of :func:`simplify_footprint`.
+
+    Attributes:
+        geometry (BaseGeometry): The simplified footprint, or the original one
+            if it could not be simplified.
+        vertices_before (int): Number of vertices of the original footprint.
+        vertices_after (int): Number of vertices of ``geometry``.
+        simplified (bool): Whether ``geometry`` is simplified.
+    """
+
+    geometry: BaseGeometry
+    vertices_before: int
+    vertices_after: int
+    simplified: bool
+
+
+def _orient(geometry: BaseGeometry) -> BaseGeometry:
+    if geometry.geom_type == "Polygon":
+        return shapely.geometry.polygon.orient(geometry)
+    return shapely.geometry.MultiPolygon(
+        [shapely.geometry.polygon.orient(polygon) for polygon in geometry.geoms]
+    )
+
+
+def simplify_footprint(
+    geometry: BaseGeometry, tolerance: float, units: str = "degrees"
+) -> SimplifiedFootprint:
+    """Simplifies a fixed footprint, without uncovering any of it.
+
+    The footprint is grown by the tolerance and then simplified with it, so
+    the simplified footprint stays outside the original and within about
+    twice the tolerance of it. Coverage is checked, with a margin for
+    rounding; if the check fails, the original footprint is returned.
+
+    Args:
+        geometry (BaseGeometry): A Polygon or MultiPolygon, already split at
+            the antimeridian.
+        tolerance (float): The allowed distance between the simplified and the
+            original footprint.
+        units (str): Units of ``tolerance``, "degrees" or "meters".
+
+    Returns:
+        SimplifiedFootprint: The footprint and its vertex counts.
+    """
+    if units == "meters":
+        degrees = tolerance / METERS_PER_DEGREE
+    elif units == "degrees":
+        degrees = tolerance
+    else:
+        raise ValueError(f"Unknown tolerance units: {units}")
+
+    vertices_before = shapely.get_num_coordinates(geometry)
+    unchanged = SimplifiedFootprint(geometry, vertices_before, vertices_before, False)
+    if degrees <= 0 or geometry.geom_type not in ("Polygon", "MultiPolygon"):
+        return unchanged
+
+    grown = geometry.buffer(
+        degrees + COVERAGE_MARGIN, join_style="mitre", mitre_limit=2.0
+    )
+    simplified = grown.simplify(degrees, preserve_topology=True).intersection(_WORLD)
+    if simplified.geom_type not in ("Polygon", "MultiPolygon"):
+        return unchanged
+    simplified = _orient(simplified)
+    required = geometry.buffer(COVERAGE_MARGIN).intersection(_WORLD)
+    vertices_after = shapely.get_num_coordinates(simplified)
+    if vertices_after >= vertices_before or not simplified.covers(required):
+        return unchanged
+    return SimplifiedFootprint(simplified, vertices_before, vertices_after, True)
+
+
+@dataclass
+class Footprint:
+    """A footprint as given by the manifest, before it is fixed.
+
+    Attributes:
+        coordinates (List[List[float]]): The exterior ring.
+        max_delta_lon (float): See :func:`winding.get_winding`.
+        force_north_pole (bool): Passed on to ``antimeridian.fix_polygon``.
+        name (str): Used in messages, e.g. the item ID.
+        geometry (Optional[BaseGeometry]): A footprint that is already split
+            at the antimeridian, e.g. from :func:`track_footprint`. If set,
+            it is used instead of ``coordinates``, without fixing it.
+    """
+
+    coordinates: List[List[float]]
+    max_delta_lon: float = 120
+    force_north_pole: bool = False
+    name: str = ""
+    geometry: Optional[BaseGeometry] = None
+
+
+@dataclass
+class NormalizedFootprint:
+    """A footprint ready for an item.
+
+    Attributes:
+        geometry (Dict[str, Any]): GeoJSON-like mapping, with rounded
+            coordinates.
+        bbox (List[float]): The rounded bounds.
+        path (str): The path taken by the antimeridian fix, see
+            :func:`fix_footprint`.
+        vertices_before (int): Number of vertices before simplification.
+        vertices_after (int): Number of vertices after simplification.
+    """
+
+    geometry: Dict[str, Any]
+    bbox: List[float]
+    path: str
+    vertices_before: int
+    vertices_after: int
+
+
+def _wound(footprint: Footprint) -> np.ndarray:
+    winding = winding_order(footprint.coordinates, footprint.max_delta_lon)
+    if winding == "CW":
+        return wrap_longitudes(footprint.coordinates)[::-1]
+    elif winding is None:
+        logger.warning(
+            f"Could not determine winding order of polygon in Item: '{footprint.name}'"
+        )
+    return np.array(footprint.coordinates, dtype=float)[:, :2]
+
+
+def _fix_footprints(footprints: Sequence[Footprint]) -> Tuple[np.ndarray, List[str]]:
+    # Does what fix_footprint does, for all footprints at once; footprints
+    # with a geometry are passed through
+    geometries = np.empty(len(footprints), dtype=object)
+    paths = [TRACK_PATH] * len(footprints)
+    rings = [i for i, footprint in enumerate(footprints) if footprint.geometry is None]
+    for i, footprint in enumerate(footprints):
+        if footprint.geometry is not None:
+            geometries[i] = footprint.geometry
+    _count_many(TRACK_PATH, len(footprints) - len(rings))
+    if rings:
+        ring_geometries, ring_paths = _fix_rings([footprints[i] for i in rings])
+        geometries[rings] = ring_geometries
+        for i, path in zip(rings, ring_paths):
+            paths[i] = path
+    return geometries, paths
+
+
+def _fix_rings(footprints: Sequence[Footprint]) -> Tuple[np.ndarray, List[str]]:
+    wound = [_wound(footprint) for footprint in footprints]
+    counts = np.array([len(coords) for coords in wound])
+    rings = shapely.linearrings(
+        np.concatenate(wound), indices=np.repeat(np.arange(len(wound)), counts)
+    )
+    coords = shapely.get_coordinates(rings)
+    coords[:, 0] = ((coords[:, 0] + 180) % 360) - 180
+    counts = shapely.get_num_coordinates(rings)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    lons = coords[:, 0]
+    force_north_pole = np.array([f.force_north_pole for f in footprints])
+    min_lon = np.minimum.reduceat(lons, starts)
+    max_lon = np.maximum.reduceat(lons, starts)
+    max_lat = np.maximum.reduceat(coords[:, 1], starts)
+    polar = force_north_pole & (max_lat >= POLAR_LATITUDE)
+    fast = ~polar & ~(
+        (min_lon <= -180 + ANTIMERIDIAN_MARGIN)
+        | (max_lon >= 180 - ANTIMERIDIAN_MARGIN)
+        | (max_lon - min_lon >= 180)
+    )
+
+    # near-duplicate points, within each footprint
+    duplicate = np.zeros(len(coords), dtype=bool)
+    duplicate[1:] = np.all(
+        np.abs(np.diff(coords, axis=0)) <= _DUPLICATE_TOLERANCE, axis=1
+    )
+    duplicate[starts] = False
+    fast &= ~np.logical_or.reduceat(duplicate, starts)
+
+    geometries = np.empty(len(footprints), dtype=object)
+    indices = np.flatnonzero(fast)
+    if len(indices):
+        in_fast = np.repeat(fast, counts)
+        fast_rings = shapely.linearrings(
+            coords[in_fast], indices=np.repeat(np.arange(len(indices)), counts[fast])
+        )
+        ccw = shapely.is_ccw(fast_rings)
+        geometries[indices[ccw]] = shapely.polygons(fast_rings[ccw])
+        fast[indices[~ccw]] = False
+    _count_many(FAST_PATH, int(fast.sum()))
+
+    paths = [FAST_PATH] * len(footprints)
+    for i in np.flatnonzero(~fast):
+        polygon = shapely.polygons(rings[i])
+        geometries[i], paths[i] = fix_footprint(
+            polygon, force_north_pole=footprints[int(i)].force_north_pole
+        )
+    return geometries, paths
+
+
+def _rounded_mappings(geometries: np.ndarray, precision: int) -> List[Dict[str, Any]]:
+    # Does what rounded_mapping does, rounding the coordinates of all
+    # geometries at once
+    coords = round_array(shapely.get_coordinates(geometries), precision)
+    counts = shapely.get_num_coordinates(geometries)
+    mappings = []
+    offset = 0
+    for geometry, count in zip(geometries, counts):
+        if geometry.has_z or geometry.geom_type not in ("Polygon", "MultiPolygon"):
+            mappings.append(rounded_mapping(geometry, precision))
+        elif geometry.geom_type == "Polygon":
+            rings, _ = _rounded_polygon(geometry, coords, offset)
+            mappings.append({"type": "Polygon", "coordinates": rings})
+        else:
+            polygons = []
+            polygon_offset = offset
+            for polygon in geometry.geoms:
+                rings, polygon_offset = _rounded_polygon(
+                    polygon, coords, polygon_offset
+                )
+                polygons.append(rings)
+            mappings.append({"type": "MultiPolygon", "coordinates": polygons})
+        offset += count
+    return mappings
+
+
+def normalize_footprints(
+    footprints: Sequence[Footprint],
+    simplify_tolerance: Optional[float] = None,
+    simplify_units: str = "degrees",
+    precision: int = 4,
+) -> List[NormalizedFootprint]:
+    """Fixes, repairs, optionally simplifies, and rounds footprints.
+
+    The winding order of each footprint is corrected, it is split at the
+    antimeridian if needed (see :func:`fix_footprint`), repaired with
+    ``buffer(0)`` if invalid, and its bounds and coordinates are rounded.
+    Except for winding and the antimeridian fix of footprints that need it,
+    all steps use shapely's array functions on all footprints at once.
+
+    Args:
+        footprints (Sequence[Footprint]): The footprints.
+        simplify_tolerance (Optional[float]): See :func:`simplify_footprint`.
+            Defaults to None, which doesn't simplify.
+        simplify_units (str): Units of ``simplify_tolerance``.
+        precision (int): Number of decimal places to round to.
+
+    Returns:
+        List[NormalizedFootprint]: One per footprint, in order.
+    """
+    if not footprints:
+        return []
+    geometries, paths = _fix_footprints(footprints)
+
+    invalid = ~shapely.is_valid(geometries)
+    if np.any(invalid):
+        geometries[invalid] = shapely.buffer(geometries[invalid], 0)
+
+    vertices_before = shapely.get_num_coordinates(geometries)
+    vertices_after = vertices_before.copy()
+    if simplify_tolerance is not None:
+        for i, geometry in enumerate(geometries):
+            simplified = simplify_footprint(
+                geometry, simplify_tolerance, simplify_units
+            )
+            geometries[i] = simplified.geometry
+            vertices_after[i] = simplified.vertices_after
+            logger.debug(
+                "Simplified footprint of %s from %d to %d vertices",
+                footprints[i].name,
+                simplified.vertices_before,
+                simplified.vertices_after,
+            )
+
+    bboxes = round_array(shapely.bounds(geometries), precision).tolist()
+    mappings = _rounded_mappings(geometries, precision)
+    return [
+        NormalizedFootprint(
+            geometry=mapping,
+            bbox=bbox,
+            path=path,
+            vertices_before=int(before),
+            vertices_after=int(after),
+        )
+        for mapping, bbox, path, before, after in zip(
+            mappings, bboxes, paths, vertices_before, vertices_after
+        )
+    ]
+
+
+def split_at_antimeridian(geometry: BaseGeometry) -> BaseGeometry:
+    """Splits a polygonal geometry with unwrapped longitudes at the antimeridian.
+
+    Longitudes may go beyond ±180, as after ``numpy.unwrap``; the parts
+    beyond it are moved back by multiples of 360 degrees. Latitudes are
+    clipped to ±90.
+
+    Args:
+        geometry (BaseGeometry): A Polygon or MultiPolygon.
+
+    Returns:
+        BaseGeometry: A Polygon, or a MultiPolygon if it was split, with
+        counterclockwise exterior rings.
+    """
+    min_lon, _, max_lon, _ = geometry.bounds
+    parts = []
+    for turn in range(
+        int(np.floor((min_lon + 180) / 360)), int(np.floor((max_lon + 180) / 360)) + 1
+    ):
+        offset = turn * 360
+        part = geometry.intersection(
+            shapely.geometry.box(offset - 180, -90, offset + 180, 90)
+        )
+        if not part.is_empty:
+            parts.append(shapely.affinity.translate(part, xoff=-offset))
+    polygons = [
+        polygon
+        for polygon in shapely.get_parts(shapely.union_all(parts))
+        if polygon.geom_type == "Polygon" and not polygon.is_empty
+    ]
+    if not polygons:
+        raise ValueError("The geometry has no area within ±90° latitude")
+    if len(polygons) == 1:
+        return _orient(polygons[0])
+    return _orient(shapely.geometry.MultiPolygon(polygons))
+
+
+def track_footprint(track: np.ndarray, buffer: float, tolerance: float) -> BaseGeometry:
+    """Builds the footprint of a nadir track, e.g. of an altimeter.
+
+    The track is buffered, simplified, and split at the antimeridian.
+
+    Args:
+        track (np.ndarray): (longitude, latitude) points along the track, with
+            unwrapped longitudes, e.g. from
+            :func:`stactools.sentinel3.track.read_track`.
+        buffer (float): Distance around the track, in degrees.
+        tolerance (float): Tolerance of the simplification, in degrees.
+
+    Returns:
+        BaseGeometry: A Polygon or MultiPolygon.
+    """
+    if len(track) == 0:
+        raise ValueError("The track has no points")
+    if len(track) == 1:
+        line = shapely.geometry.Point(track[0])
+    else:
+        line = shapely.geometry.LineString(track)
+    area = line.buffer(buffer, quad_segs=2).simplify(tolerance)
+    return split_at_antimeridian(area)
@@ -0,0 +1,398 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import (
+    Any,
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+
+# Stages of creating an item, in order
+READ_MANIFEST = "read_manifest"
+PARSE_MANIFEST = "parse_manifest"
+PREFETCH_HEADERS = "prefetch_headers"
+PRODUCT_METADATA = "product_metadata"
+MANIFEST_ASSET = "manifest_asset"
+BAND_ASSETS = "band_assets"
+FILE_PROPERTIES = "file_properties"
+FOOTPRINT = "footprint"
+NORMALIZE_FOOTPRINT = "normalize_footprint"
+# Stage of writing an item, timed by the command line utility
+SERIALIZE = "serialize"
+
+
+class Instrumentation:
+    """Receives the start and end of each stage of creating an item.
+
+    The methods do nothing; subclass this and override them to record the
+    stages, as :class:`StageStats` does. They are called from the thread
+    creating the item, so implementations used with
+    :func:`stactools.sentinel3.batch.create_items` must be thread-safe.
+
+    Attributes:
+        concurrent (bool): Whether it can record items created concurrently;
+            if not, ``create_items`` refuses more than one worker.
+    """
+
+    concurrent = True
+
+    def item_submitted(self, granule_href: str) -> None:
+        """Called when :func:`stactools.sentinel3.batch.create_items` queues a
+        granule for a worker, before its first stage.
+
+        Args:
+            granule_href (str): The granule the item is created for.
+        """
+
+    def item_finished(
+        self, granule_href: str, error: Optional[Exception], cached: bool
+    ) -> None:
+        """Called when :func:`stactools.sentinel3.batch.create_items` is done
+        with a granule, including granules whose item failed or was reused
+        from the item cache, whether or not its result is yielded.
+
+        Args:
+            granule_href (str): The granule the item is created for.
+            error (Optional[Exception]): Why the item couldn't be created.
+            cached (bool): Whether the item was reused from the item cache,
+                without any stages.
+        """
+
+    def stage_started(self, granule_href: str, stage: str) -> None:
+        """Called when a stage starts.
+
+        Args:
+            granule_href (str): The granule the item is created for.
+            stage (str): The stage, e.g. ``read_manifest``.
+        """
+
+    def stage_finished(
+        self, granule_href: str, stage: str, seconds: float, nbytes: int
+    ) -> None:
+        """Called when a stage ends.
+
+        Args:
+            granule_href (str): The granule the item is created for.
+            stage (str): The stage, e.g. ``read_manifest``.
+            seconds (float): How long the stage took.
+            nbytes (int): Bytes read during the stage, where known; 0 otherwise.
+        """
+
+    def io_finished(
+        self,
+        granule_href: str,
+        stage: str,
+        href: str,
+        ranges: Sequence[Tuple[int, int]],
+        seconds: float,
+    ) -> None:
+        """Called after opening a file of the granule and reading from it.
+
+        Args:
+            granule_href (str): The granule the item is created for.
+            stage (str): The stage the file was read in.
+            href (str): The file.
+            ranges (Sequence[Tuple[int, int]]): The half-open byte ranges
+                read. Empty for files read directly by the netCDF-C library,
+                whose reads can't be observed.
+            seconds (float): How long the open and the reads blocked.
+        """
+
+
+class MultiInstrumentation(Instrumentation):
+    """Passes the stages on to several instrumentations.
+
+    Args:
+        instrumentations (Iterable[Instrumentation]): The instrumentations.
+    """
+
+    def __init__(self, instrumentations: Iterable[Instrumentation]) -> None:
+        self.instrumentations = list(instrumentations)
+        self.concurrent = all(i.concurrent for i in self.instrumentations)
+
+    def item_submitted(self, granule_href: str) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation.item_submitted(granule_href)
+
+    def item_finished(
+        self, granule_href: str, error: Optional[Exception], cached: bool
+    ) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation.item_finished(granule_href, error, cached)
+
+    def stage_started(self, granule_href: str, stage: str) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation.stage_started(granule_href, stage)
+
+    def stage_finished(
+        self, granule_href: str, stage: str, seconds: float, nbytes: int
+    ) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation.stage_finished(granule_href, stage, seconds, nbytes)
+
+    def io_finished(
+        self,
+        granule_href: str,
+        stage: str,
+        href: str,
+        ranges: Sequence[Tuple[int, int]],
+        seconds: float,
+    ) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation.io_finished(granule_href, stage, href, ranges, seconds)
+
+
+class StageTimer:
+    """Times consecutive stages of creating an item and reports them.
+
+    Starting a stage ends the current one. Without instrumentation, every
+    method returns straight away.
+
+    Args:
+        instrumentation (Optional[Instrumentation]): Receives the stages.
+        granule_href (str): The granule the item is created for.
+    """
+
+    def __init__(
+        self, instrumentation: Optional[Instrumentation], granule_href: str
+    ) -> None:
+        self.instrumentation = instrumentation
+        self.granule_href = granule_href
+        self._stage: Optional[str] = None
+        self._start = 0.0
+        self._bytes = 0
+
+    def begin(self, stage: str) -> None:
+        """Ends the current stage, if any, and starts another."""
+        if self.instrumentation is None:
+            return
+        self.end()
+        self._stage = stage
+        self._bytes = 0
+        self.instrumentation.stage_started(self.granule_href, stage)
+        self._start = time.perf_counter()
+
+    def add_bytes(self, nbytes: int) -> None:
+        """Counts bytes read during the current stage."""
+        self._bytes += nbytes
+
+    def record_io(
+        self, href: str, seconds: float, ranges: Sequence[Tuple[int, int]] = ()
+    ) -> None:
+        """Reports a file opened and read during the current stage, see
+        :meth:`Instrumentation.io_finished`."""
+        if self.instrumentation is None:
+            return
+        self.instrumentation.io_finished(
+            self.granule_href, self._stage or "", href, ranges, seconds
+        )
+
+    def end(self) -> None:
+        """Ends the current stage, if any."""
+        if self.instrumentation is None or self._stage is None:
+            return
+        seconds = time.perf_counter() - self._start
+        stage, self._stage = self._stage, None
+        self.instrumentation.stage_finished(
+            self.granule_href, stage, seconds, self._bytes
+        )
+
+
+@dataclass
+class StageSummary:
+    """Statistics of a stage over many items. Durations are in seconds."""
+
+    count: int
+    total: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+    bytes: int
+
+
+class StageStats(Instrumentation):
+    """Collects the durations of stages over a batch, for per-stage
+    percentiles."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._seconds: DefaultDict[str, List[float]] = defaultdict(list)
+        self._bytes: DefaultDict[str, int] = defaultdict(int)
+
+    def stage_finished(
+        self, granule_href: str, stage: str, seconds: float, nbytes: int
+    ) -> None:
+        with self._lock:
+            self._seconds[stage].append(seconds)
+            self._bytes[stage] += nbytes
+
+    def summary(self) -> Dict[str, StageSummary]:
+        """Returns the statistics of each stage, in the order first seen."""
+        with self._lock:
+            seconds = {stage: list(values) for stage, values in self._seconds.items()}
+            nbytes = dict(self._bytes)
+        summary = {}
+        for stage, values in seconds.items():
+            p50, p90, p99 = np.percentile(values, [50, 90, 99])
+            summary[stage] = StageSummary(
+                count=len(values),
+                total=float(np.sum(values)),
+                p50=float(p50),
+                p90=float(p90),
+                p99=float(p99),
+                max=float(np.max(values)),
+                bytes=nbytes[stage],
+            )
+        return summary
+
+    def format(self) -> str:
+        """Returns the statistics as a table, with durations in milliseconds."""
+        lines = [
+            f"{'stage':<20} {'count':>6} {'total':>10} {'p50':>9} {'p90':>9} "
+            f"{'p99':>9} {'max':>9} {'bytes':>12}"
+        ]
+        for stage, s in self.summary().items():
+            lines.append(
+                f"{stage:<20} {s.count:>6} {s.total * 1e3:>10.1f} {s.p50 * 1e3:>9.2f} "
+                f"{s.p90 * 1e3:>9.2f} {s.p99 * 1e3:>9.2f} {s.max * 1e3:>9.2f} "
+                f"{s.bytes:>12}"
+            )
+        return "\n".join(lines)
+
+
+@dataclass
+class IOStats:
+    """I/O of a file or a granule.
+
+    Attributes:
+        opens (int): Times files were opened, counting every range request.
+        bytes_read (int): Bytes read, counting ranges read more than once.
+        ranges (int): Distinct byte ranges read.
+        seconds (float): Time blocked on opening and reading, summed over
+            concurrent requests.
+        direct_opens (int): Opens by the netCDF-C library, whose bytes and
+            ranges aren't counted and whose reads after the open aren't timed.
+            Prefetch the NetCDF headers to count them.
+    """
+
+    opens: int = 0
+    bytes_read: int = 0
+    ranges: int = 0
+    seconds: float = 0.0
+    direct_opens: int = 0
+
+    def add(self, other: "IOStats") -> None:
+        self.opens += other.opens
+        self.bytes_read += other.bytes_read
+        self.ranges += other.ranges
+        self.seconds += other.seconds
+        self.direct_opens += other.direct_opens
+
+
+@dataclass
+class _FileIO:
+    stats: IOStats = field(default_factory=IOStats)
+    ranges: Set[Tuple[int, int]] = field(default_factory=set)
+
+
+class IOReport(Instrumentation):
+    """Accounts the files each item is created from: opens, bytes read,
+    distinct byte ranges and time blocked, per granule and per file."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._files: DefaultDict[str, DefaultDict[str, _FileIO]] = defaultdict(
+            lambda: defaultdict(_FileIO)
+        )
+
+    def io_finished(
+        self,
+        granule_href: str,
+        stage: str,
+        href: str,
+        ranges: Sequence[Tuple[int, int]],
+        seconds: float,
+    ) -> None:
+        with self._lock:
+            file_io = self._files[granule_href][href]
+            file_io.stats.seconds += seconds
+            if not ranges:
+                file_io.stats.opens += 1
+                file_io.stats.direct_opens += 1
+            for byte_range in ranges:
+                file_io.stats.opens += 1
+                file_io.stats.bytes_read += byte_range[1] - byte_range[0]
+                if byte_range not in file_io.ranges:
+                    file_io.ranges.add(byte_range)
+                    file_io.stats.ranges += 1
+
+    @property
+    def granules(self) -> List[str]:
+        """The granules, in the order first seen."""
+        with self._lock:
+            return list(self._files)
+
+    def files(self, granule_href: str) -> Dict[str, IOStats]:
+        """Returns the I/O of each file of a granule, in the order first read."""
+        with self._lock:
+            return {
+                href: IOStats(**asdict(file_io.stats))
+                for href, file_io in self._files.get(granule_href, {}).items()
+            }
+
+    def total(self, granule_href: Optional[str] = None) -> IOStats:
+        """Returns the I/O of a granule, or of all granules."""
+        granule_hrefs = self.granules if granule_href is None else [granule_href]
+        total = IOStats()
+        for href in granule_hrefs:
+            for stats in self.files(href).values():
+                total.add(stats)
+        return total
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the report, with the totals and files of each granule."""
+        return {
+            granule_href: {
+                "total": asdict(self.total(granule_href)),
+                "files": {
+                    href: asdict(stats)
+                    for href, stats in self.files(granule_href).items()
+                },
+            }
+            for granule_href in self.granules
+        }
+
+    def format(self) -> str:
+        """Returns the report as a table, with a line per granule followed by
+        a line per file, and times in milliseconds."""
+        lines = [
+            f"{'file':<48} {'opens':>6} {'bytes':>12} {'ranges':>7} "
+            f"{'blocked':>9} {'direct':>7}"
+        ]
+
+        def line(name: str, s: IOStats) -> str:
+            return (
+                f"{name:<48} {s.opens:>6} {s.bytes_read:>12} {s.ranges:>7} "
+                f"{s.seconds * 1e3:>9.2f} {s.direct_opens:>7}"
+            )
+
+        for granule_href in self.granules:
+            lines.append(
+                line(
+                    os.path.basename(granule_href.rstrip("/")), self.total(granule_href)
+                )
+            )
+            for href, stats in self.files(granule_href).items():
+                lines.append(line("  " + os.path.basename(href), stats))
+        return "\n".join(lines)
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import fsspec  # type: ignore
+import pystac
+from stactools.core.io import ReadHrefModifier, read_text
+
+from stactools.sentinel3 import __version__
+
+from .constants import MANIFEST_FILENAME, SAFE_MANIFEST_ASSET_KEY
+from .properties import manifest_checksum
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+
+def item_options(**kwargs: Any) -> str:
+    """Returns a key for the arguments of
+    :func:`stactools.sentinel3.stac.create_item` that change the item, e.g.
+    ``skip_nc``; items are only reused for the same key."""
+    return json.dumps(kwargs, sort_keys=True)
+
+
+@dataclass
+class CacheEntry:
+    """An item created before.
+
+    Attributes:
+        checksum (str): MD5 of the manifest the item was created from.
+        version (str): Version of this package that created it.
+        options (str): Key of the options it was created with, see
+            :func:`item_options`.
+        item (bytes): The item, as compact JSON.
+    """
+
+    checksum: str
+    version: str
+    options: str
+    item: bytes
+
+
+class ItemCache:
+    """Items created before, by granule HREF, reused as long as the manifest,
+    the version of this package and the options are the same.
+
+    Checking whether a granule changed only takes reading its manifest, so
+    the NetCDF files and the footprint aren't processed again. Items are kept
+    in memory as compact JSON; the cache is saved as newline-delimited JSON,
+    one granule per line after a header.
+
+    Args:
+        version (str): The version of this package; entries created by
+            another version are never reused.
+    """
+
+    def __init__(self, version: str = __version__) -> None:
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CacheEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, granule_href: str, checksum: str, options: str
+    ) -> Optional[pystac.Item]:
+        """Returns the cached item of a granule, if it was created from the
+        manifest with this checksum, by this version and with these options.
+        """
+        with self._lock:
+            entry = self._entries.get(granule_href)
+            if (
+                entry is None
+                or entry.checksum != checksum
+                or entry.version != self.version
+                or entry.options != options
+            ):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pystac.Item.from_dict(
+            json.loads(entry.item), migrate=False, preserve_dict=False
+        )
+
+    def lookup(
+        self,
+        granule_href: str,
+        options: str,
+        read_href_modifier: Optional[ReadHrefModifier] = None,
+    ) -> Optional[pystac.Item]:
+        """Reads the manifest of a granule and returns its cached item, if the
+        manifest hasn't changed, see :meth:`get`."""
+        manifest_text = read_text(
+            os.path.join(granule_href, MANIFEST_FILENAME), read_href_modifier
+        )
+        return self.get(granule_href, manifest_checksum(manifest_text), options)
+
+    def put(self, granule_href: str, item: pystac.Item, options: str) -> None:
+        """Caches the item of a granule, keyed by the checksum of the manifest
+        asset of the item."""
+        manifest = item.assets.get(SAFE_MANIFEST_ASSET_KEY)
+        checksum = manifest.extra_fields.get("file:checksum") if manifest else None
+        if checksum is None:
+            logger.warning(f"Not caching item '{item.id}', it has no manifest checksum")
+            return
+        entry = CacheEntry(checksum, self.version, options, dumps(item.to_dict()))
+        with self._lock:
+            self._entries[granule_href] = entry
+
+    def save(self, dest_href: str) -> None:
+        """Saves the cache as newline-delimited JSON."""
+        with self._lock:
+            entries = dict(self._entries)
+        with fsspec.open(dest_href, "wb") as f:
+            f.write(dumps({"cache_version": CACHE_VERSION}) + b"\n")
+            for granule_href, entry in entries.items():
+                line = {
+                    "granule": granule_href,
+                    "checksum": entry.checksum,
+                    "version": entry.version,
+                    "options": entry.options,
+                    "item": json.loads(entry.item),
+                }
+                f.write(dumps(line) + b"\n")
+
+    @classmethod
+    def load(cls, href: str, version: str = __version__) -> "ItemCache":
+        """Loads a cache saved with :meth:`save`.
+
+        Args:
+            href (str): The cache file.
+            version (str): The version of this package.
+        """
+        cache = cls(version)
+        with fsspec.open(href, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("cache_version") != CACHE_VERSION:
+                raise ValueError(
+                    f"Unsupported item cache version: {header.get('cache_version')}"
+                )
+            for line in f:
+                d = json.loads(line)
+                cache._entries[d["granule"]] = CacheEntry(
+                    d["checksum"], d["version"], d["options"], dumps(d["item"])
+                )
+        return cache
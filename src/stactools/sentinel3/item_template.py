@@ -0,0 +1,121 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from pystac.extensions.eo import EOExtension
+from pystac.extensions.sat import SatExtension
+
+from .constants import SPECIAL_ASSET_KEYS
+from .file_extension_updated import FileExtensionUpdated
+
+# Altimetry products aren't optical, so they don't get the eo extension
+NON_EO_DATA_TYPES = ("WAT", "LAN")
+
+SOURCE_TO_NAME = {"OL": "olci", "SL": "slstr", "SR": "sral", "SY": "synergy"}
+
+
+def sen3_to_kebab(asset_key: str) -> str:
+    """Converts asset_key to a clean kebab case"""
+    if asset_key in SPECIAL_ASSET_KEYS:
+        return SPECIAL_ASSET_KEYS[asset_key]
+
+    # purge Data suffix
+    asset_key = asset_key.replace("_Data", "").replace("Data", "", 1)
+
+    new_asset_key = ""
+    for first, second in zip(asset_key, asset_key[1:]):
+        new_asset_key += first.lower()
+        if first.islower() and second.isupper():
+            new_asset_key += "-"
+    new_asset_key += asset_key[-1].lower()
+    new_asset_key = new_asset_key.replace("_", "-")
+    return new_asset_key
+
+
+def sen3_to_snake(key: str) -> str:
+    new_key = "".join("_" + char.lower() if char.isupper() else char for char in key)
+    # strip "_pixels_percentages" to match eo:cloud_cover pattern
+    if new_key.endswith("_pixels_percentage"):
+        new_key = new_key.replace("_pixels_percentage", "")
+    elif new_key.endswith("_pixelss_percentage"):
+        new_key = new_key.replace("_pixelss_percentage", "")
+    elif new_key.endswith("_percentage"):
+        new_key = new_key.replace("_percentage", "")
+    return new_key
+
+
+def product_name(source: str, datatype: str) -> str:
+    """Returns the user-friendly name of a product type, e.g. ``olci-efr``."""
+    return f"{SOURCE_TO_NAME[source]}-{datatype.strip('_').lower()}"
+
+
+@dataclass
+class ItemTemplate:
+    """The parts of an Item that are the same for every granule of a product
+    type and processing baseline.
+
+    Asset keys and property names are converted once, on first use, and
+    looked up for every item after that.
+
+    Attributes:
+        product_type (str): The product type, e.g. ``OL_1_EFR``.
+        baseline (str): The processing baseline, e.g. ``002``.
+        product_name (str): The user-friendly product name, e.g. ``olci-efr``.
+        stac_extensions (Tuple[str, ...]): Schema URIs of the extensions used
+            by the Item, in order.
+    """
+
+    product_type: str
+    baseline: str
+    product_name: str
+    stac_extensions: Tuple[str, ...]
+    _asset_keys: Dict[str, str] = field(default_factory=dict, repr=False)
+    _property_keys: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    @property
+    def is_eo(self) -> bool:
+        return EOExtension.get_schema_uri() in self.stac_extensions
+
+    def asset_key(self, identifier: str) -> str:
+        """Returns the kebab-case asset key of a manifest dataObject ID."""
+        key = self._asset_keys.get(identifier)
+        if key is None:
+            key = self._asset_keys[identifier] = sen3_to_kebab(identifier)
+        return key
+
+    def property_key(self, key: str) -> str:
+        """Returns the snake-case name of an ``s3:`` property."""
+        new_key = self._property_keys.get(key)
+        if new_key is None:
+            new_key = self._property_keys[key] = sen3_to_snake(key)
+        return new_key
+
+
+@lru_cache(maxsize=None)
+def get_item_template(product_type: str, baseline: str) -> ItemTemplate:
+    """Returns the template for a product type and processing baseline.
+
+    Templates are cached, so all granules of the same product type and
+    baseline share one.
+
+    Args:
+        product_type (str): The product type, e.g. ``OL_1_EFR``.
+        baseline (str): The processing baseline, e.g. ``002``.
+
+    Returns:
+        ItemTemplate: The template.
+    """
+    source = product_type[:2]
+    data_type = product_type[5:8]
+    stac_extensions = [
+        FileExtensionUpdated.get_schema_uri(),
+        SatExtension.get_schema_uri(),
+    ]
+    if data_type not in NON_EO_DATA_TYPES:
+        stac_extensions.append(EOExtension.get_schema_uri())
+    return ItemTemplate(
+        product_type=product_type,
+        baseline=baseline,
+        product_name=product_name(source, data_type),
+        stac_extensions=tuple(stac_extensions),
+    )
@@ -0,0 +1,231 @@
+import copy
+import json
+import logging
+import os
+import re
+import threading
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from tracemalloc import Snapshot
+from typing import Any, Dict, List, Optional, Tuple
+
+import fsspec  # type: ignore
+
+from .instrumentation import NORMALIZE_FOOTPRINT, READ_MANIFEST, Instrumentation
+
+logger = logging.getLogger(__name__)
+
+PROFILE_VERSION = 1
+
+
+def _product_type(granule_href: str) -> str:
+    return os.path.basename(granule_href.rstrip("/"))[4:12]
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    # paths relative to the installed packages, so that profiles taken in
+    # different environments can be compared
+    filename = frame.filename.replace(os.sep, "/")
+    for marker in ("/site-packages/", "/src/"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    else:
+        filename = re.sub(r"^.*/lib/python[\d.]+/", "", filename)
+    return f"{filename}:{frame.lineno}"
+
+
+@dataclass
+class AllocationSite:
+    """Memory allocated at a line of code and still held.
+
+    Attributes:
+        site (str): The file and line number.
+        size (int): Bytes held.
+        count (int): Blocks held.
+    """
+
+    site: str
+    size: int
+    count: int
+
+
+@dataclass
+class ProductMemory:
+    """Memory used to create the items of a product type.
+
+    Attributes:
+        items (int): Items profiled.
+        peak (int): Largest peak of an item, in bytes allocated above what
+            was allocated when the item was started.
+        stages (Dict[str, int]): Largest peak of each stage, above what was
+            allocated when the stage was started.
+        top (List[AllocationSite]): The largest allocation sites of the
+            item that held the most memory, at the end of the stage in which
+            it held the most.
+    """
+
+    items: int = 0
+    peak: int = 0
+    stages: Dict[str, int] = field(default_factory=dict)
+    top: List[AllocationSite] = field(default_factory=list)
+
+
+class MemoryProfile(Instrumentation):
+    """Profiles the memory allocated by each stage of creating an item with
+    tracemalloc, per product type.
+
+    Use it as a context manager, which starts and stops tracing; stages are
+    only profiled while tracing. Tracing slows item creation down several
+    times. Peaks are measured for the whole process, resetting the peak when
+    each stage starts, so items must be created one at a time: with
+    :func:`stactools.sentinel3.batch.create_items`, use ``max_workers=1``.
+    Stages outside of creating an item, like writing it, are ignored, but what
+    the caller allocates meanwhile still counts towards the peaks.
+
+    Args:
+        top (int): Allocation sites to keep per product type.
+        frames (int): Frames of the traceback to record per allocation; only
+            the innermost is reported.
+    """
+
+    concurrent = False
+
+    def __init__(self, top: int = 10, frames: int = 1) -> None:
+        self.top = top
+        self.frames = frames
+        self._lock = threading.Lock()
+        self._products: Dict[str, ProductMemory] = {}
+        self._held: Dict[str, int] = {}
+        # the snapshots of the items holding the most memory, and of when
+        # they were started; compared only when reported
+        self._snapshots: Dict[str, Tuple[Snapshot, Snapshot]] = {}
+        self._item_start: Dict[str, Tuple[int, Snapshot]] = {}
+        self._item_peak: Dict[str, int] = {}
+        self._stage_start: Dict[Tuple[str, str], int] = {}
+        self._started = False
+
+    def start(self) -> None:
+        """Starts tracing, unless it already is."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+
+    def stop(self) -> None:
+        """Stops tracing, if :meth:`start` started it."""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def __enter__(self) -> "MemoryProfile":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def item_finished(
+        self, granule_href: str, error: Optional[Exception], cached: bool
+    ) -> None:
+        with self._lock:
+            # items that failed never finish normalizing their footprint
+            self._item_start.pop(granule_href, None)
+            self._item_peak.pop(granule_href, None)
+
+    def stage_started(self, granule_href: str, stage: str) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        with self._lock:
+            # stages outside of creating the item, like writing it, may run
+            # while the next item is created, so they must not reset the peak
+            if stage != READ_MANIFEST and granule_href not in self._item_start:
+                return
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            if stage == READ_MANIFEST:
+                self._item_start[granule_href] = (current, tracemalloc.take_snapshot())
+            self._stage_start[granule_href, stage] = current
+
+    def stage_finished(
+        self, granule_href: str, stage: str, seconds: float, nbytes: int
+    ) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            start = self._stage_start.pop((granule_href, stage), current)
+            if granule_href not in self._item_start:
+                return
+            item_start, item_snapshot = self._item_start[granule_href]
+            product_type = _product_type(granule_href)
+            product = self._products.setdefault(product_type, ProductMemory())
+            product.stages[stage] = max(product.stages.get(stage, 0), peak - start)
+            self._item_peak[granule_href] = max(
+                self._item_peak.get(granule_href, 0), peak - item_start
+            )
+            if current - item_start > self._held.get(product_type, 0):
+                self._held[product_type] = current - item_start
+                self._snapshots[product_type] = (
+                    tracemalloc.take_snapshot(),
+                    item_snapshot,
+                )
+            if stage == NORMALIZE_FOOTPRINT:
+                del self._item_start[granule_href]
+                product.items += 1
+                product.peak = max(product.peak, self._item_peak.pop(granule_href))
+
+    def _top_sites(
+        self, snapshot: Snapshot, baseline: Snapshot
+    ) -> List[AllocationSite]:
+        differences = [
+            s
+            for s in snapshot.compare_to(baseline, "lineno")
+            if s.size_diff > 0 and s.traceback[0].filename != tracemalloc.__file__
+        ]
+        differences.sort(key=lambda s: s.size_diff, reverse=True)
+        return [
+            AllocationSite(_site(s.traceback[0]), s.size_diff, s.count_diff)
+            for s in differences[: self.top]
+        ]
+
+    def summary(self) -> Dict[str, ProductMemory]:
+        """Returns the memory used per product type, sorted by product type."""
+        with self._lock:
+            for product_type, snapshots in self._snapshots.items():
+                self._products[product_type].top = self._top_sites(*snapshots)
+            self._snapshots.clear()
+            return {
+                product_type: copy.deepcopy(self._products[product_type])
+                for product_type in sorted(self._products)
+            }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": PROFILE_VERSION,
+            "product_types": {
+                product_type: asdict(product)
+                for product_type, product in self.summary().items()
+            },
+        }
+
+    def save(self, dest_href: str) -> None:
+        """Saves the profile as indented JSON with sorted keys, for diffs
+        between versions."""
+        with fsspec.open(dest_href, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    def format(self) -> str:
+        """Returns the peaks per product type and stage, in KiB, each followed
+        by the largest allocation sites."""
+        lines = [f"{'product':<10} {'stage':<20} {'items':>6} {'peak KiB':>10}"]
+        for product_type, product in self.summary().items():
+            lines.append(
+                f"{product_type:<10} {'(item)':<20} {product.items:>6} "
+                f"{product.peak / 1024:>10.1f}"
+            )
+            for stage, peak in product.stages.items():
+                lines.append(f"{'':<10} {stage:<20} {'':>6} {peak / 1024:>10.1f}")
+            for site in product.top:
+                lines.append(f"{'':<10}   {site.size / 1024:>8.1f} KiB  {site.site}")
+        return "\n".join(lines)
@@ -1,5 +1,8 @@
+import logging
 import os
-from typing import List, Optional, Tuple
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
 
 import netCDF4 as nc  # type: ignore
 import pystac
@@ -8,6 +11,17 @@ from stactools.core.io import ReadHrefModifier, read_text
 from stactools.core.io.xml import XmlElement
 
 from . import constants, xml
+from .instrumentation import PARSE_MANIFEST, READ_MANIFEST, StageTimer
+from .product_specs import AssetSpec, ProductSpec, get_product_spec
+from .read_planner import HeaderBuffer, PrefetchResult, normalize_href, prefetch_headers
+
+logger = logging.getLogger(__name__)
+
+NETCDF_MEDIA_TYPE = "application/x-netcdf"
+
+# The netCDF-C library isn't thread-safe, so datasets are opened and read by one
+# thread at a time. Batches still overlap manifest parsing and remote fetches.
+_NETCDF_LOCK = threading.Lock()
 
 
 class ManifestError(Exception):
@@ -16,14 +30,28 @@ class ManifestError(Exception):
 
 class MetadataLinks:
     def __init__(
-        self, granule_href: str, read_href_modifier: Optional[ReadHrefModifier] = None
+        self,
+        granule_href: str,
+        read_href_modifier: Optional[ReadHrefModifier] = None,
+        timer: Optional[StageTimer] = None,
     ):
         self.granule_href = granule_href
         self.href = os.path.join(granule_href, constants.MANIFEST_FILENAME)
+        self.read_href_modifier = read_href_modifier
+        self._header_buffers: Dict[str, HeaderBuffer] = {}
 
-        self.manifest, self.manifest_text = self.parse_xml_from_href(
-            self.href, read_href_modifier
-        )
+        if timer is None:
+            timer = StageTimer(None, granule_href)
+        self.timer = timer
+        timer.begin(READ_MANIFEST)
+        start = time.perf_counter()
+        self.manifest_text = read_text(self.href, read_href_modifier)
+        seconds = time.perf_counter() - start
+        data = bytes(self.manifest_text, encoding="utf-8")
+        timer.add_bytes(len(data))
+        timer.record_io(self.href, seconds, [(0, len(data))])
+        timer.begin(PARSE_MANIFEST)
+        self.manifest = XmlElement(etree.fromstring(data))
         data_object_section = self.manifest.find("dataObjectSection")
         if data_object_section is None:
             raise ManifestError(
@@ -35,13 +63,6 @@ class MetadataLinks:
             granule_href, constants.MANIFEST_FILENAME
         )
 
-    @classmethod
-    def parse_xml_from_href(
-        cls, href: str, read_href_modifier: Optional[ReadHrefModifier] = None
-    ) -> Tuple["XmlElement", str]:
-        text = read_text(href, read_href_modifier)
-        return XmlElement(etree.fromstring(bytes(text, encoding="utf-8"))), text
-
     def _find_href(self, xpaths: List[str]) -> Optional[str]:
         file_path = None
         for xpath in xpaths:
@@ -75,10 +96,95 @@ class MetadataLinks:
         )
         return constants.SAFE_MANIFEST_ASSET_KEY, asset
 
-    def _get_resolution(self, asset_href: str, skip_nc: bool) -> List[int]:
-        if skip_nc:
-            return []
-        ds = nc.Dataset(asset_href)
+    def netcdf_sizes(self, asset_keys: Optional[Set[str]] = None) -> Dict[str, int]:
+        """Returns the manifest-reported size of the NetCDF files in the granule,
+        by href.
+
+        Args:
+            asset_keys (Optional[Set[str]]): Only include the files of these
+                dataObjects. Defaults to all NetCDF files.
+        """
+        sizes = {}
+        for data_object in self._data_object_section.findall("dataObject"):
+            if asset_keys is not None and data_object.get_attr("ID") not in asset_keys:
+                continue
+            byte_stream = data_object.find("byteStream")
+            if byte_stream is None:
+                continue
+            if byte_stream.get_attr("mimeType") != NETCDF_MEDIA_TYPE:
+                continue
+            location = byte_stream.find_attr("href", "fileLocation")
+            size = byte_stream.get_attr("size")
+            if location is None or size is None:
+                continue
+            href = os.path.join(self.granule_href, location)
+            sizes[normalize_href(href)] = int(size)
+        return sizes
+
+    def prefetch_headers(self, **kwargs: Any) -> PrefetchResult:
+        """Fetches the headers of the NetCDF files read for the data assets of
+        the granule with planned, concurrent range requests. Subsequent reads of
+        these files are served from memory.
+
+        Args:
+            **kwargs: Passed on to :func:`read_planner.prefetch_headers`.
+
+        Returns:
+            PrefetchResult: The fetched buffers and request statistics.
+        """
+        spec = get_product_spec(
+            xml.find_text(self.manifest, ".//sentinel3:productType")
+        )
+        if not spec.reads_netcdf:
+            return PrefetchResult()
+        asset_keys = {asset.key for asset in spec.select_assets(self.manifest)}
+        result = prefetch_headers(
+            self.netcdf_sizes(asset_keys), self.read_href_modifier, **kwargs
+        )
+        self._header_buffers.update(result.buffers)
+        for byte_range, nbytes, seconds in result.fetches:
+            self.timer.record_io(
+                byte_range.href,
+                seconds,
+                [(byte_range.start, byte_range.start + nbytes)],
+            )
+        return result
+
+    def open_dataset(self, href: str) -> nc.Dataset:
+        """Opens a NetCDF file of the granule with the netCDF-C library,
+        reporting the open to the timer. Must be called with the netCDF lock
+        held."""
+        start = time.perf_counter()
+        ds = nc.Dataset(href)
+        self.timer.record_io(href, time.perf_counter() - start)
+        return ds
+
+    def _open_dataset(self, asset_href: str) -> nc.Dataset:
+        buffer = self._header_buffers.get(normalize_href(asset_href))
+        # metadata missing from a buffer without checksums reads as garbage
+        # instead of failing, so such files are only read from complete buffers
+        if buffer is not None and (buffer.complete or buffer.checksummed):
+            ds = None
+            try:
+                # The file name is only used for messages; a URL here would make
+                # netCDF attempt an OPeNDAP connection.
+                ds = nc.Dataset(os.path.basename(asset_href), memory=buffer.getbuffer())
+                if not buffer.complete:
+                    # force the metadata to be read while we can still fall back
+                    ds.ncattrs()
+                return ds
+            except (OSError, RuntimeError) as e:
+                if ds is not None:
+                    ds.close()
+                logger.debug(
+                    "Prefetched header of %s is incomplete, reading it directly: %s",
+                    asset_href,
+                    e,
+                )
+        return self.open_dataset(asset_href)
+
+    @staticmethod
+    def _get_resolution(ds: nc.Dataset, asset_href: str) -> List[int]:
         if hasattr(ds, "resolution"):
             asset_resolution_str = ds.resolution.strip("[] ")
             asset_resolution = [
@@ -99,747 +205,73 @@ class MetadataLinks:
                 )
         else:
             raise ValueError("Don't know how to pull resolution from " + asset_href)
-        ds.close()
         return asset_resolution
 
-    def create_band_asset(self, manifest: XmlElement, skip_nc=False):
-        def strip_prefix(prefix: str, content: str) -> str:
-            if content.startswith(prefix):
-                return content[len(prefix) :]
-            return content
+    @staticmethod
+    def _get_shape(ds: nc.Dataset) -> List[Dict[str, int]]:
+        return [{key: int(dim.size)} for key, dim in ds.dimensions.items()]
 
-        asset_identifier_list = []
-        asset_list = []
+    def _create_asset(
+        self,
+        manifest: XmlElement,
+        spec: ProductSpec,
+        asset_spec: AssetSpec,
+        skip_nc: bool,
+    ) -> pystac.Asset:
+        data_object = f".//dataObject[@ID='{asset_spec.key}']"
+        asset_location = self.read_href(f"{data_object}//fileLocation")
+        if asset_location.startswith("./"):
+            asset_location = asset_location[2:]
+        asset_href = os.path.join(self.granule_href, asset_location)
+        media_type = manifest.find_attr("mimeType", f"{data_object}//byteStream")
+        asset_description = asset_spec.description or manifest.find_attr(
+            "textInfo", f"{data_object}//fileLocation"
+        )
 
-        product_type = xml.find_text(manifest, ".//sentinel3:productType")
-        product_type_category = product_type.split("_")[0]
+        extra_fields: Dict[str, Any] = {}
+        if spec.reads_netcdf:
+            asset_shape: List[Dict[str, int]] = []
+            asset_resolution: List[int] = []
+            if not skip_nc:
+                with _NETCDF_LOCK:
+                    ds = self._open_dataset(asset_href)
+                    try:
+                        if spec.spatial_resolution:
+                            asset_resolution = self._get_resolution(ds, asset_href)
+                        if spec.shape_field is not None:
+                            asset_shape = self._get_shape(ds)
+                    finally:
+                        ds.close()
+            if spec.shape_field is not None:
+                extra_fields[spec.shape_field] = asset_shape
+            if spec.spatial_resolution:
+                extra_fields["s3:spatial_resolution"] = asset_resolution
+        bands = spec.bands(asset_spec)
+        if bands:
+            extra_fields[spec.band_field] = bands
 
-        if product_type_category == "OL":
-            instrument_bands = constants.SENTINEL_OLCI_BANDS
-        elif product_type_category == "SL":
-            instrument_bands = constants.SENTINEL_SLSTR_BANDS
-        elif product_type_category == "SR":
-            instrument_bands = constants.SENTINEL_SRAL_BANDS
-        elif product_type_category == "SY":
-            instrument_bands = constants.SENTINEL_SYNERGY_BANDS
-        else:
-            raise RuntimeError(
-                f"Unknown product type encountered: {product_type_category}"
-            )
+        return pystac.Asset(
+            href=asset_href,
+            media_type=media_type,
+            description=asset_description,
+            roles=["data"],
+            extra_fields=extra_fields,
+        )
 
-        asset_key_list = None
-        if instrument_bands == constants.SENTINEL_SRAL_BANDS:
-            asset_key_list = constants.SRAL_L2_LAN_WAT_KEYS
-            for asset_key in asset_key_list:
-                band_dict_list = []
-                for band in instrument_bands:
-                    band_dict = {
-                        "name": instrument_bands[band].name,
-                        "description": instrument_bands[band].description,
-                        "central_frequency": instrument_bands[band].center_wavelength,
-                        "band_width_in_Hz": instrument_bands[band].full_width_half_max,
-                    }
-                    band_dict_list.append(band_dict)
-                if "reduced" in asset_key:
-                    band_dict_list = [band_dict_list[1]]
-                else:
-                    pass
-                asset_location = self.read_href(
-                    f".//dataObject[@ID='{asset_key}']//fileLocation"
-                )
-                asset_href = os.path.join(self.granule_href, asset_location)
-                media_type = manifest.find_attr(
-                    "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                )
-                asset_description = manifest.find_attr(
-                    "textInfo", f".//dataObject[@ID='{asset_key}']//fileLocation"
-                )
-                if skip_nc:
-                    asset_shape_list: List[dict] = []
-                else:
-                    asset_shape_list = []
-                    ds = nc.Dataset(asset_href)
-                    for key in ds.dimensions.keys():
-                        asset_shape_dict = {key: int(ds.dimensions[key].size)}
-                        asset_shape_list.append(asset_shape_dict)
-                    ds.close()
-                asset_obj = pystac.Asset(
-                    href=asset_href,
-                    media_type=media_type,
-                    description=asset_description,
-                    roles=["data"],
-                    extra_fields={
-                        "shape": asset_shape_list,
-                        "sral:bands": band_dict_list,
-                    },
-                )
-                asset_identifier_list.append(asset_key)
-                asset_list.append(asset_obj)
-        elif instrument_bands == constants.SENTINEL_SYNERGY_BANDS:
-            if "_AOD_" in product_type:
-                band_key_list = list(constants.SENTINEL_SYNERGY_BANDS.keys())[26:32]
-                asset_key_list = ["NTC_AOD_Data"]
-                band_dict_list = []
-                for asset_key in asset_key_list:
-                    for band in band_key_list:
-                        band_dict = {
-                            "name": instrument_bands[band].name,
-                            "description": instrument_bands[band].description,
-                            "center_wavelength": instrument_bands[
-                                band
-                            ].center_wavelength,
-                            "band_width": instrument_bands[band].full_width_half_max,
-                        }
-                        band_dict_list.append(band_dict)
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(self.granule_href, asset_location)
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_description = "Global aerosol parameters"
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    asset_obj = pystac.Asset(
-                        href=asset_href,
-                        media_type=media_type,
-                        description=asset_description,
-                        roles=["data"],
-                        extra_fields={
-                            "s3:spatial_resolution": asset_resolution,
-                            "eo:bands": band_dict_list,
-                        },
-                    )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-            elif "_SYN_" in product_type:
-                asset_key_list = constants.SYNERGY_SYN_ASSET_KEYS
-                for ind, asset_key in enumerate(asset_key_list):
-                    if ind < 26:
-                        band_key = list(constants.SENTINEL_SYNERGY_BANDS.keys())[ind]
-                        band_dict_list = []
-                        band_dict = {
-                            "name": instrument_bands[band_key].name,
-                            "description": instrument_bands[band_key].description,
-                            "center_wavelength": instrument_bands[
-                                band_key
-                            ].center_wavelength,
-                            "band_width": instrument_bands[
-                                band_key
-                            ].full_width_half_max,
-                        }
-                        band_dict_list.append(band_dict)
-                    elif ind == 26 or ind == 27:
-                        band_key_list = constants.SYNERGY_L2_A550_T550_BANDS
-                        band_dict_list = []
-                        for band in band_key_list:
-                            band_dict = {
-                                "name": constants.SENTINEL_OLCI_SLSTR_BANDS[band].name,
-                                "description": constants.SENTINEL_OLCI_SLSTR_BANDS[
-                                    band
-                                ].description,
-                                "center_wavelength": constants.SENTINEL_OLCI_SLSTR_BANDS[
-                                    band
-                                ].center_wavelength,
-                                "band_width": constants.SENTINEL_OLCI_SLSTR_BANDS[
-                                    band
-                                ].full_width_half_max,
-                            }
-                            band_dict_list.append(band_dict)
-                    elif ind == 28:
-                        band_key_list = constants.SYNERGY_L2_SDR_BANDS
-                        band_dict_list = []
-                        for band in band_key_list:
-                            band_dict = {
-                                "name": constants.SENTINEL_OLCI_SLSTR_BANDS[band].name,
-                                "description": constants.SENTINEL_OLCI_SLSTR_BANDS[
-                                    band
-                                ].description,
-                                "center_wavelength": constants.SENTINEL_OLCI_SLSTR_BANDS[
-                                    band
-                                ].center_wavelength,
-                                "band_width": constants.SENTINEL_OLCI_SLSTR_BANDS[
-                                    band
-                                ].full_width_half_max,
-                            }
-                            band_dict_list.append(band_dict)
-                    else:
-                        band_dict_list = []
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(
-                        self.granule_href, strip_prefix("./", asset_location)
-                    )
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_description = manifest.find_attr(
-                        "textInfo", f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    if skip_nc:
-                        asset_shape_list = []
-                    else:
-                        asset_shape_list = []
-                        ds = nc.Dataset(asset_href)
-                        for key in ds.dimensions.keys():
-                            asset_shape_dict = {key: int(ds.dimensions[key].size)}
-                            asset_shape_list.append(asset_shape_dict)
-                        ds.close()
-                    if band_dict_list:
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={
-                                "s3:shape": asset_shape_list,
-                                "s3:spatial_resolution": asset_resolution,
-                                "eo:bands": band_dict_list,
-                            },
-                        )
-                    else:
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={
-                                "s3:shape": asset_shape_list,
-                                "s3:spatial_resolution": asset_resolution,
-                            },
-                        )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-            elif any(product_id in product_type for product_id in ["_VG1_", "_V10_"]):
-                asset_key_list = constants.SYNERGY_V10_VG1_ASSET_KEYS
-                for ind, asset_key in enumerate(asset_key_list):
-                    band_dict_list = []
-                    if ind < 4:
-                        band_key = list(constants.SENTINEL_SYNERGY_BANDS.keys())[-4:][
-                            ind
-                        ]
-                        band_dict = {
-                            "name": instrument_bands[band_key].name,
-                            "description": instrument_bands[band_key].description,
-                            "center_wavelength": instrument_bands[
-                                band_key
-                            ].center_wavelength,
-                            "band_width": instrument_bands[
-                                band_key
-                            ].full_width_half_max,
-                        }
-                        band_dict_list.append(band_dict)
-                    elif ind == 4:
-                        band_key_list = ["B2", "B3"]
-                        for band in band_key_list:
-                            band_dict = {
-                                "name": instrument_bands[band].name,
-                                "description": instrument_bands[band].description,
-                                "center_wavelength": instrument_bands[
-                                    band
-                                ].center_wavelength,
-                                "band_width": instrument_bands[
-                                    band
-                                ].full_width_half_max,
-                            }
-                            band_dict_list.append(band_dict)
-                    else:
-                        band_dict_list = []
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(
-                        self.granule_href, strip_prefix("./", asset_location)
-                    )
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_description = manifest.find_attr(
-                        "textInfo", f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    if skip_nc:
-                        asset_shape_list = []
-                    else:
-                        asset_shape_list = []
-                        ds = nc.Dataset(asset_href)
-                        for key in ds.dimensions.keys():
-                            asset_shape_dict = {key: int(ds.dimensions[key].size)}
-                            asset_shape_list.append(asset_shape_dict)
-                        ds.close()
-                    if band_dict_list:
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={
-                                "s3:shape": asset_shape_list,
-                                "s3:spatial_resolution": asset_resolution,
-                                "eo:bands": band_dict_list,
-                            },
-                        )
-                    else:
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={
-                                "s3:shape": asset_shape_list,
-                                "s3:spatial_resolution": asset_resolution,
-                            },
-                        )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-            else:
-                asset_key_list = constants.SYNERGY_VGP_ASSET_KEYS
-                for ind, asset_key in enumerate(asset_key_list):
-                    band_dict_list = []
-                    if ind < 4:
-                        band_key = list(constants.SENTINEL_SYNERGY_BANDS.keys())[-4:][
-                            ind
-                        ]
-                        band_dict = {
-                            "name": instrument_bands[band_key].name,
-                            "description": instrument_bands[band_key].description,
-                            "center_wavelength": instrument_bands[
-                                band_key
-                            ].center_wavelength,
-                            "band_width": instrument_bands[
-                                band_key
-                            ].full_width_half_max,
-                        }
-                        band_dict_list.append(band_dict)
-                    else:
-                        band_dict_list = []
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(self.granule_href, asset_location)
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_description = manifest.find_attr(
-                        "textInfo", f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    if skip_nc:
-                        asset_shape_list = []
-                    else:
-                        asset_shape_list = []
-                        ds = nc.Dataset(asset_href)
-                        for key in ds.dimensions.keys():
-                            asset_shape_dict = {key: int(ds.dimensions[key].size)}
-                            asset_shape_list.append(asset_shape_dict)
-                        ds.close()
-                    if band_dict_list:
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={
-                                "s3:shape": asset_shape_list,
-                                "s3:spatial_resolution": asset_resolution,
-                                "eo:bands": band_dict_list,
-                            },
-                        )
-                    else:
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={
-                                "s3:shape": asset_shape_list,
-                                "s3:spatial_resolution": asset_resolution,
-                            },
-                        )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-        elif instrument_bands == constants.SENTINEL_OLCI_BANDS:
-            if "OL_1_" in product_type:
-                asset_key_list = constants.OLCI_L1_ASSET_KEYS
-                for asset_key, band in zip(asset_key_list, instrument_bands):
-                    band_dict = {
-                        "name": instrument_bands[band].name,
-                        "description": instrument_bands[band].description,
-                        "center_wavelength": instrument_bands[band].center_wavelength,
-                        "band_width": instrument_bands[band].full_width_half_max,
-                    }
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(
-                        self.granule_href, strip_prefix("./", asset_location)
-                    )
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_description = manifest.find_attr(
-                        "textInfo", f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    asset_obj = pystac.Asset(
-                        href=asset_href,
-                        media_type=media_type,
-                        description=asset_description,
-                        roles=["data"],
-                        extra_fields={
-                            "s3:spatial_resolution": asset_resolution,
-                            "eo:bands": [band_dict],
-                        },
-                    )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-            elif any(_str in product_type for _str in ["_LFR_", "_LRR_"]):
-                if len(manifest.findall(".//dataObject[@ID='ogviData']")) == 0:
-                    asset_key_list = constants.OLCI_L2_LAND_ASSET_KEYS_RENAMED
-                else:
-                    asset_key_list = constants.OLCI_L2_LAND_ASSET_KEYS
-                for asset_key in asset_key_list:
-                    if asset_key == "ogviData" or asset_key == "gifaparData":
-                        band_key_list = ["Oa03", "Oa10", "Oa17"]
-                    elif asset_key == "otciData":
-                        band_key_list = ["Oa10", "Oa11", "Oa12"]
-                    elif asset_key == "iwvData":
-                        band_key_list = ["Oa18", "Oa19"]
-                    elif asset_key == "rcOgviData":
-                        band_key_list = ["Oa10", "Oa17"]
-                    else:
-                        band_key_list = []
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(
-                        self.granule_href, strip_prefix("./", asset_location)
-                    )
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_description = manifest.find_attr(
-                        "textInfo", f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    if not band_key_list:
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={"s3:spatial_resolution": asset_resolution},
-                        )
-                    else:
-                        band_dict_list = []
-                        for band in band_key_list:
-                            band_dict = {
-                                "name": instrument_bands[band].name,
-                                "description": instrument_bands[band].description,
-                                "center_wavelength": instrument_bands[
-                                    band
-                                ].center_wavelength,
-                                "band_width": instrument_bands[
-                                    band
-                                ].full_width_half_max,
-                            }
-                            band_dict_list.append(band_dict)
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={
-                                "s3:spatial_resolution": asset_resolution,
-                                "eo:bands": band_dict_list,
-                            },
-                        )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-            elif "_WFR_" in product_type:
-                asset_key_list = constants.OLCI_L2_WATER_ASSET_KEYS
-                for asset_key in asset_key_list:
-                    if asset_key == "chlNnData" or asset_key == "tsmNnData":
-                        band_key_list = [
-                            "Oa01",
-                            "Oa02",
-                            "Oa03",
-                            "Oa04",
-                            "Oa05",
-                            "Oa06",
-                            "Oa07",
-                            "Oa08",
-                            "Oa09",
-                            "Oa10",
-                            "Oa11",
-                            "Oa12",
-                            "Oa16",
-                            "Oa17",
-                            "Oa18",
-                            "Oa21",
-                        ]
-                    elif asset_key == "chlOc4meData":
-                        band_key_list = ["Oa03", "Oa04", "Oa05", "Oa06"]
-                    elif asset_key == "iopNnData":
-                        band_key_list = [
-                            "Oa01",
-                            "Oa12",
-                            "Oa16",
-                            "Oa17",
-                            "Oa21",
-                        ]
-                    elif asset_key == "iwvData":
-                        band_key_list = [
-                            "Oa18",
-                            "Oa19",
-                        ]
-                    elif asset_key == "parData":
-                        band_key_list = []
-                    elif asset_key == "trspData":
-                        band_key_list = ["Oa04", "Oa06"]
-                    elif asset_key == "wAerData":
-                        band_key_list = ["Oa05", "Oa06", "Oa17"]
-                    elif any(
-                        asset_key == key
-                        for key in constants.OLCI_L2_WATER_ASSET_KEYS[-7:]
-                    ):
-                        band_key_list = []
-                    else:
-                        band_key_list = [asset_key[:4]]
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(
-                        self.granule_href, strip_prefix("./", asset_location)
-                    )
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_description = manifest.find_attr(
-                        "textInfo", f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    if band_key_list:
-                        band_dict_list = []
-                        for band in band_key_list:
-                            band_dict = {
-                                "name": instrument_bands[band].name,
-                                "description": instrument_bands[band].description,
-                                "center_wavelength": instrument_bands[
-                                    band
-                                ].center_wavelength,
-                                "band_width": instrument_bands[
-                                    band
-                                ].full_width_half_max,
-                            }
-                            band_dict_list.append(band_dict)
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={
-                                "s3:spatial_resolution": asset_resolution,
-                                "eo:bands": band_dict_list,
-                            },
-                        )
-                    else:
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={"s3:spatial_resolution": asset_resolution},
-                        )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-        elif instrument_bands == constants.SENTINEL_SLSTR_BANDS:
-            if "SL_1_" in product_type:
-                asset_key_list = constants.SLSTR_L1_ASSET_KEYS
-                for asset_key, band in zip(asset_key_list, instrument_bands):
-                    band_dict = {
-                        "name": instrument_bands[band].name,
-                        "description": instrument_bands[band].description,
-                        "center_wavelength": instrument_bands[band].center_wavelength,
-                        "band_width": instrument_bands[band].full_width_half_max,
-                    }
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(
-                        self.granule_href, strip_prefix("./", asset_location)
-                    )
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_description = manifest.find_attr(
-                        "textInfo", f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    asset_obj = pystac.Asset(
-                        href=asset_href,
-                        media_type=media_type,
-                        description=asset_description,
-                        roles=["data"],
-                        extra_fields={
-                            "s3:spatial_resolution": asset_resolution,
-                            "eo:bands": [band_dict],
-                        },
-                    )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-            elif "_FRP_" in product_type:
-                asset_key_list = constants.SLSTR_L2_FRP_KEYS
-                for asset_key in asset_key_list:
-                    if asset_key == "FRP_IN_Data":
-                        band_key_list = ["S05", "S06", "S07", "S10"]
-                    else:
-                        band_key_list = []
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(
-                        self.granule_href, strip_prefix("./", asset_location)
-                    )
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_description = manifest.find_attr(
-                        "textInfo", f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    if band_key_list:
-                        band_dict_list = []
-                        for band in band_key_list:
-                            band_dict = {
-                                "name": instrument_bands[band].name,
-                                "description": instrument_bands[band].description,
-                                "center_wavelength": instrument_bands[
-                                    band
-                                ].center_wavelength,
-                                "band_width": instrument_bands[
-                                    band
-                                ].full_width_half_max,
-                            }
-                            band_dict_list.append(band_dict)
-                        asset_description = "Fire Radiative Power (FRP) dataset"
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={
-                                "s3:spatial_resolution": asset_resolution,
-                                "eo:bands": band_dict_list,
-                            },
-                        )
-                    else:
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={"s3:spatial_resolution": asset_resolution},
-                        )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-            elif "_LST_" in product_type:
-                asset_key_list = constants.SLSTR_L2_LST_KEYS
-                for asset_key in asset_key_list:
-                    if asset_key == "LST_IN_Data":
-                        band_key_list = ["S08", "S09"]
-                    else:
-                        band_key_list = []
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(
-                        self.granule_href, strip_prefix("./", asset_location)
-                    )
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    if band_key_list:
-                        band_dict_list = []
-                        for band in band_key_list:
-                            band_dict = {
-                                "name": instrument_bands[band].name,
-                                "description": instrument_bands[band].description,
-                                "center_wavelength": instrument_bands[
-                                    band
-                                ].center_wavelength,
-                                "band_width": instrument_bands[
-                                    band
-                                ].full_width_half_max,
-                            }
-                            band_dict_list.append(band_dict)
-                        asset_description = "Land Surface Temperature (LST) values"
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={
-                                "s3:spatial_resolution": asset_resolution,
-                                "eo:bands": band_dict_list,
-                            },
-                        )
-                    else:
-                        asset_description = manifest.find_attr(
-                            "textInfo",
-                            f".//dataObject[@ID='{asset_key}']//fileLocation",
-                        )
-                        asset_obj = pystac.Asset(
-                            href=asset_href,
-                            media_type=media_type,
-                            description=asset_description,
-                            roles=["data"],
-                            extra_fields={"s3:spatial_resolution": asset_resolution},
-                        )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-            elif "_WST_" in product_type:
-                asset_key_list = ["L2P_Data"]
-                band_key_list = ["S07", "S08", "S09"]
-                band_dict_list = []
-                for asset_key in asset_key_list:
-                    for band in band_key_list:
-                        band_dict = {
-                            "name": instrument_bands[band].name,
-                            "description": instrument_bands[band].description,
-                            "center_wavelength": instrument_bands[
-                                band
-                            ].center_wavelength,
-                            "band_width": instrument_bands[band].full_width_half_max,
-                        }
-                        band_dict_list.append(band_dict)
-                    asset_location = self.read_href(
-                        f".//dataObject[@ID='{asset_key}']//fileLocation"
-                    )
-                    asset_href = os.path.join(
-                        self.granule_href, strip_prefix("./", asset_location)
-                    )
-                    media_type = manifest.find_attr(
-                        "mimeType", f".//dataObject[@ID='{asset_key}']//byteStream"
-                    )
-                    asset_description = (
-                        "Data respects the Group for High Resolution "
-                        "Sea Surface Temperature (GHRSST) L2P specification"
-                    )
-                    asset_resolution = self._get_resolution(asset_href, skip_nc)
-                    asset_obj = pystac.Asset(
-                        href=asset_href,
-                        media_type=media_type,
-                        description=asset_description,
-                        roles=["data"],
-                        extra_fields={
-                            "s3:spatial_resolution": asset_resolution,
-                            "eo:bands": band_dict_list,
-                        },
-                    )
-                    asset_identifier_list.append(asset_key)
-                    asset_list.append(asset_obj)
-        return asset_key_list, asset_identifier_list, asset_list
+    def create_band_asset(self, manifest: XmlElement, skip_nc=False):
+        """Creates the data assets of the granule, as described by the product
+        spec registered for its product type.
+
+        Returns:
+            Tuple[List[str], List[pystac.Asset]]: The manifest dataObject IDs
+            of the assets, which are also their keys, and the assets.
+        """
+        product_type = xml.find_text(manifest, ".//sentinel3:productType")
+        spec = get_product_spec(product_type)
+
+        asset_identifier_list = []
+        asset_list = []
+        for asset_spec in spec.select_assets(manifest):
+            asset_list.append(self._create_asset(manifest, spec, asset_spec, skip_nc))
+            asset_identifier_list.append(asset_spec.key)
+        return asset_identifier_list, asset_list
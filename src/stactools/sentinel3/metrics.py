@@ -0,0 +1,240 @@
+import logging
+import os
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, List, Optional, Sequence, Tuple
+
+from .instrumentation import Instrumentation
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "stac_sentinel3"
+
+# Upper bounds of the histogram buckets
+DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+BYTES_BUCKETS = tuple(float(1024 * 4**i) for i in range(11))  # 1 KiB to 1 GiB
+
+
+def _product_type(granule_href: str) -> str:
+    return os.path.basename(granule_href.rstrip("/"))[4:12]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+class Histogram:
+    """Counts observations in buckets, for a Prometheus histogram.
+
+    Args:
+        buckets (Sequence[float]): Upper bounds of the buckets, increasing.
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: Dict[str, str]) -> List[str]:
+        """Returns the cumulative buckets, sum and count in the text format."""
+        lines = []
+        cumulative = 0
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(dict(labels, le=bound))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {self.sum!r}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return lines
+
+
+class BatchMetrics(Instrumentation):
+    """Exports the progress of a batch as Prometheus metrics, in a file for the
+    textfile collector of the node exporter.
+
+    Pass it as the instrumentation of
+    :func:`stactools.sentinel3.batch.create_items`. While started, the file
+    is rewritten every
+    ``interval`` seconds, atomically so that it is never scraped half
+    written, and once more when stopped. The metrics are:
+
+    - ``stac_sentinel3_items_created_total``,
+      ``stac_sentinel3_items_reused_total`` and
+      ``stac_sentinel3_items_failed_total``: counters of items by product
+      type, reused ones from the item cache, and for failures by the class of
+      the error.
+    - ``stac_sentinel3_items_in_flight``: granules queued or being processed.
+    - ``stac_sentinel3_stages_in_flight``: items in each stage.
+    - ``stac_sentinel3_stage_duration_seconds``: a histogram of the duration
+      of each stage.
+    - ``stac_sentinel3_stage_read_bytes``: a histogram of the bytes read by
+      each stage; stages that read nothing aren't observed.
+
+    Args:
+        textfile (str): The file to write, ending in ``.prom``, in the
+            directory of the textfile collector.
+        interval (float): Seconds between writes.
+    """
+
+    def __init__(self, textfile: str, interval: float = 15.0) -> None:
+        self.textfile = textfile
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._created: DefaultDict[str, int] = defaultdict(int)
+        self._reused: DefaultDict[str, int] = defaultdict(int)
+        self._failed: DefaultDict[Tuple[str, str], int] = defaultdict(int)
+        self._in_flight = 0
+        self._stages_in_flight: DefaultDict[str, int] = defaultdict(int)
+        self._stage_of: Dict[str, str] = {}
+        self._durations: Dict[str, Histogram] = {}
+        self._bytes: Dict[str, Histogram] = {}
+        self._stopping = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+    def item_submitted(self, granule_href: str) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def stage_started(self, granule_href: str, stage: str) -> None:
+        with self._lock:
+            self._stages_in_flight[stage] += 1
+            self._stage_of[granule_href] = stage
+
+    def stage_finished(
+        self, granule_href: str, stage: str, seconds: float, nbytes: int
+    ) -> None:
+        with self._lock:
+            self._stages_in_flight[stage] -= 1
+            self._stage_of.pop(granule_href, None)
+            if stage not in self._durations:
+                self._durations[stage] = Histogram(DURATION_BUCKETS)
+            self._durations[stage].observe(seconds)
+            if nbytes:
+                if stage not in self._bytes:
+                    self._bytes[stage] = Histogram(BYTES_BUCKETS)
+                self._bytes[stage].observe(nbytes)
+
+    def item_finished(
+        self, granule_href: str, error: Optional[Exception], cached: bool
+    ) -> None:
+        product_type = _product_type(granule_href)
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+            # the stage that raised never finished
+            stage = self._stage_of.pop(granule_href, None)
+            if stage is not None:
+                self._stages_in_flight[stage] -= 1
+            if error is not None:
+                self._failed[product_type, type(error).__name__] += 1
+            elif cached:
+                self._reused[product_type] += 1
+            else:
+                self._created[product_type] += 1
+
+    def format(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def header(name: str, kind: str, description: str) -> str:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            return name
+
+        with self._lock:
+            name = header(f"{PREFIX}_items_created_total", "counter", "Items created.")
+            for product_type, count in sorted(self._created.items()):
+                lines.append(f"{name}{_labels({'product_type': product_type})} {count}")
+            name = header(
+                f"{PREFIX}_items_reused_total",
+                "counter",
+                "Items reused from the item cache.",
+            )
+            for product_type, count in sorted(self._reused.items()):
+                lines.append(f"{name}{_labels({'product_type': product_type})} {count}")
+            name = header(
+                f"{PREFIX}_items_failed_total", "counter", "Granules without an item."
+            )
+            for (product_type, error), count in sorted(self._failed.items()):
+                labels = _labels({"product_type": product_type, "error": error})
+                lines.append(f"{name}{labels} {count}")
+            name = header(
+                f"{PREFIX}_items_in_flight", "gauge", "Granules queued or in progress."
+            )
+            lines.append(f"{name} {self._in_flight}")
+            name = header(f"{PREFIX}_stages_in_flight", "gauge", "Items in each stage.")
+            for stage, count in self._stages_in_flight.items():
+                lines.append(f"{name}{_labels({'stage': stage})} {count}")
+            histograms: List[Tuple[str, str, Dict[str, Histogram]]] = [
+                ("stage_duration_seconds", "Duration of stages.", self._durations),
+                ("stage_read_bytes", "Bytes read by stages.", self._bytes),
+            ]
+            for suffix, description, by_stage in histograms:
+                name = header(f"{PREFIX}_{suffix}", "histogram", description)
+                for stage, histogram in by_stage.items():
+                    lines.extend(histogram.samples(name, {"stage": stage}))
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Writes the metrics to the textfile, replacing it atomically."""
+        temporary = f"{self.textfile}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            f.write(self.format())
+        os.replace(temporary, self.textfile)
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning(f"Failed to write metrics to {self.textfile}: {e}")
+
+    def start(self) -> None:
+        """Writes the metrics, then keeps rewriting them in the background."""
+        self.write()
+        self._stopping.clear()
+        self._writer = threading.Thread(
+            target=self._run, name="metrics-writer", daemon=True
+        )
+        self._writer.start()
+
+    def stop(self) -> None:
+        """Stops the background writes and writes the final metrics."""
+        if self._writer is not None:
+            self._stopping.set()
+            self._writer.join()
+            self._writer = None
+        self.write()
+
+    def __enter__(self) -> "BatchMetrics":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
@@ -0,0 +1,186 @@
+import bisect
+import json
+import logging
+import re
+from dataclasses import astuple, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import fsspec  # type: ignore
+import pystac
+
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# The instance ID at the end of an item ID: duration, cycle, relative orbit and,
+# for frames, the frame number
+_INSTANCE_ID = re.compile(
+    r"_\d{4}_(?P<cycle>\d{3})_(?P<relative_orbit>\d{3})(_\d{4})?$"
+)
+
+
+@dataclass(frozen=True, order=True)
+class OrbitEntry:
+    """An item in an orbit index, in sort order.
+
+    Attributes:
+        relative_orbit (int): ``sat:relative_orbit``.
+        cycle (int): The cycle, from the item ID; -1 if the ID has none.
+        absolute_orbit (int): ``sat:absolute_orbit``.
+        item_id (str): The item ID.
+        orbit_state (str): ``sat:orbit_state``.
+        offset (int): Byte offset of the item in the NDJSON file of the
+            index; -1 if the items weren't saved as NDJSON.
+    """
+
+    relative_orbit: int
+    cycle: int
+    absolute_orbit: int
+    item_id: str
+    orbit_state: str = ""
+    offset: int = -1
+
+    @classmethod
+    def from_item(cls, item: pystac.Item, offset: int = -1) -> "OrbitEntry":
+        """Creates the entry of an item with the sat extension's orbit properties.
+
+        Raises:
+            ValueError: If the item has no absolute orbit, or no relative
+                orbit in its properties or ID.
+        """
+        match = _INSTANCE_ID.search(item.id)
+        relative_orbit = item.properties.get("sat:relative_orbit")
+        if relative_orbit is None and match is not None:
+            relative_orbit = int(match.group("relative_orbit"))
+        absolute_orbit = item.properties.get("sat:absolute_orbit")
+        if relative_orbit is None or absolute_orbit is None:
+            raise ValueError(f"Item '{item.id}' has no orbit numbers")
+        return cls(
+            relative_orbit=int(relative_orbit),
+            cycle=int(match.group("cycle")) if match is not None else -1,
+            absolute_orbit=int(absolute_orbit),
+            item_id=item.id,
+            orbit_state=item.properties.get("sat:orbit_state", ""),
+            offset=offset,
+        )
+
+
+class OrbitIndex:
+    """Items sorted by relative orbit and cycle, and by absolute orbit, for
+    lookups by binary search.
+
+    Args:
+        entries (Iterable[OrbitEntry]): The items.
+        items_href (Optional[str]): The NDJSON file with the items, relative
+            to the index file, if they were saved as NDJSON.
+    """
+
+    def __init__(
+        self, entries: Iterable[OrbitEntry] = (), items_href: Optional[str] = None
+    ) -> None:
+        self.entries: List[OrbitEntry] = list(entries)
+        self.items_href = items_href
+        self._sorted = False
+
+    def _sort(self) -> None:
+        if self._sorted:
+            return
+        self.entries.sort()
+        self._keys = [(e.relative_orbit, e.cycle) for e in self.entries]
+        self._by_absolute_orbit = sorted(
+            range(len(self.entries)),
+            key=lambda i: (self.entries[i].absolute_orbit, self.entries[i].item_id),
+        )
+        self._absolute_orbits = [
+            self.entries[i].absolute_orbit for i in self._by_absolute_orbit
+        ]
+        self._sorted = True
+
+    def add_item(self, item: pystac.Item, offset: int = -1) -> None:
+        """Adds an item, skipping it with a warning if it has no orbit numbers.
+
+        Args:
+            item (pystac.Item): The item.
+            offset (int): Byte offset of the item in the NDJSON file, e.g. as
+                reported by :func:`stactools.sentinel3.serialization.save_items_ndjson`.
+        """
+        try:
+            entry = OrbitEntry.from_item(item, offset)
+        except ValueError as e:
+            logger.warning(f"Not adding item to the orbit index: {e}")
+            return
+        self.entries.append(entry)
+        self._sorted = False
+
+    def add_items(self, items: Iterable[pystac.Item]) -> Iterator[pystac.Item]:
+        """Adds items as they are consumed, passing them on."""
+        for item in items:
+            self.add_item(item)
+            yield item
+
+    def find(
+        self, relative_orbit: int, cycle: Optional[int] = None
+    ) -> List[OrbitEntry]:
+        """Returns the items of a relative orbit, optionally in a single cycle.
+
+        Args:
+            relative_orbit (int): The relative orbit.
+            cycle (Optional[int]): The cycle. Defaults to None, which returns
+                the items of all cycles.
+
+        Returns:
+            List[OrbitEntry]: The items, sorted by cycle and absolute orbit.
+        """
+        self._sort()
+        low: Tuple[int, ...] = (relative_orbit,)
+        high: Tuple[int, ...] = (relative_orbit + 1,)
+        if cycle is not None:
+            low, high = (relative_orbit, cycle), (relative_orbit, cycle + 1)
+        start = bisect.bisect_left(self._keys, low)
+        stop = bisect.bisect_left(self._keys, high, lo=start)
+        return self.entries[start:stop]
+
+    def find_absolute(self, absolute_orbit: int) -> List[OrbitEntry]:
+        """Returns the items of an absolute orbit, sorted by item ID."""
+        self._sort()
+        start = bisect.bisect_left(self._absolute_orbits, absolute_orbit)
+        stop = bisect.bisect_right(self._absolute_orbits, absolute_orbit, lo=start)
+        return [self.entries[i] for i in self._by_absolute_orbit[start:stop]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._sort()
+        return {
+            "version": INDEX_VERSION,
+            "items": self.items_href,
+            "columns": list(OrbitEntry.__dataclass_fields__),
+            "rows": [list(astuple(entry)) for entry in self.entries],
+            "by_absolute_orbit": self._by_absolute_orbit,
+        }
+
+    def save(self, dest_href: str) -> None:
+        """Saves the index as compact JSON, already sorted both ways."""
+        with fsspec.open(dest_href, "wb") as f:
+            f.write(dumps(self.to_dict()))
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "OrbitIndex":
+        if d.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported orbit index version: {d.get('version')}")
+        index = cls.__new__(cls)
+        index.entries = [OrbitEntry(*row) for row in d["rows"]]
+        index.items_href = d.get("items")
+        index._keys = [(e.relative_orbit, e.cycle) for e in index.entries]
+        index._by_absolute_orbit = d["by_absolute_orbit"]
+        index._absolute_orbits = [
+            index.entries[i].absolute_orbit for i in index._by_absolute_orbit
+        ]
+        index._sorted = True
+        return index
+
+    @classmethod
+    def load(cls, href: str) -> "OrbitIndex":
+        """Loads an index saved with :meth:`save`, without sorting it again."""
+        with fsspec.open(href, "rb") as f:
+            return cls.from_dict(json.loads(f.read()))
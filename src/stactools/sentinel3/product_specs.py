@@ -0,0 +1,372 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, cast
+
+from pystac.extensions.eo import Band
+from stactools.core.io.xml import XmlElement
+
+from . import constants
+
+
+def nano2micro(value: float) -> float:
+    """Converts nanometers to micrometers while handling floating
+    point arithmetic errors."""
+    return float(Decimal(str(value)) / Decimal("1000"))
+
+
+def hz2ghz(value: float) -> float:
+    """Converts hertz to gigahertz while handling floating point
+    arithmetic errors."""
+    return float(Decimal(str(value)) / Decimal("1000000000"))
+
+
+def eo_band(band: Band) -> Dict[str, Any]:
+    """Creates an ``eo:bands`` object, with wavelengths in micrometers."""
+    return {
+        "name": band.name,
+        "description": band.description,
+        "center_wavelength": nano2micro(cast(float, band.center_wavelength)),
+        "full_width_half_max": nano2micro(cast(float, band.full_width_half_max)),
+    }
+
+
+def altimetry_band(band: Band) -> Dict[str, Any]:
+    """Creates an ``s3:altimetry_bands`` object, with frequencies in gigahertz.
+
+    Radar altimetry is different enough than radar imagery that the existing
+    SAR extension doesn't quite work (plus, the SAR extension doesn't have a
+    band object). We use a band construct similar to eo:bands, but follow the
+    naming and unit conventions in the SAR extension. The band constants store
+    the central frequency and the bandwidth, in hertz, in the wavelength
+    fields.
+    """
+    return {
+        "description": band.description,
+        "frequency_band": band.name,
+        "center_frequency": hz2ghz(cast(float, band.center_wavelength)),
+        "band_width": hz2ghz(cast(float, band.full_width_half_max)),
+    }
+
+
+@dataclass(frozen=True)
+class AssetSpec:
+    """A data asset of a product type.
+
+    Attributes:
+        key (str): ID of the asset's dataObject in the manifest.
+        bands (Tuple[str, ...]): Keys of the asset's bands in the band catalog
+            of the product type.
+        description (Optional[str]): Replaces the description given by the
+            manifest.
+    """
+
+    key: str
+    bands: Tuple[str, ...] = ()
+    description: Optional[str] = None
+
+
+@dataclass
+class ProductSpec:
+    """Describes how to create the data assets of a product type.
+
+    Attributes:
+        product_type (str): The product type, e.g. ``OL_1_EFR``.
+        assets (Tuple[AssetSpec, ...]): The data assets, in item order.
+        band_catalog (Mapping[str, Band]): The bands the assets refer to.
+        band_field (str): Asset field holding the band objects.
+        band_converter (Callable[[Band], Dict[str, Any]]): Creates a band
+            object, with converted units, from a band constant.
+        spatial_resolution (bool): Read ``s3:spatial_resolution`` from the
+            NetCDF file of each asset.
+        shape_field (Optional[str]): Asset field holding the dimensions read
+            from the NetCDF file of each asset, or None to not read them.
+        alternative_assets (Optional[Tuple[AssetSpec, ...]]): Used instead of
+            ``assets`` when the manifest lacks the first of ``assets``, for
+            products whose files were renamed between processing baselines.
+    """
+
+    product_type: str
+    assets: Tuple[AssetSpec, ...]
+    band_catalog: Mapping[str, Band] = field(default_factory=dict)
+    band_field: str = "eo:bands"
+    band_converter: Callable[[Band], Dict[str, Any]] = eo_band
+    spatial_resolution: bool = True
+    shape_field: Optional[str] = None
+    alternative_assets: Optional[Tuple[AssetSpec, ...]] = None
+    _band_templates: Dict[AssetSpec, List[Dict[str, Any]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    @property
+    def reads_netcdf(self) -> bool:
+        return self.spatial_resolution or self.shape_field is not None
+
+    def select_assets(self, manifest: XmlElement) -> Tuple[AssetSpec, ...]:
+        """Returns the asset specs matching the files listed in the manifest."""
+        if self.alternative_assets is not None and not manifest.findall(
+            f".//dataObject[@ID='{self.assets[0].key}']"
+        ):
+            return self.alternative_assets
+        return self.assets
+
+    def bands(self, asset: AssetSpec) -> List[Dict[str, Any]]:
+        """Returns new band objects for an asset.
+
+        The band objects are converted once, on first use, and copied for
+        every call after that.
+        """
+        templates = self._band_templates.get(asset)
+        if templates is None:
+            templates = [
+                self.band_converter(self.band_catalog[band]) for band in asset.bands
+            ]
+            self._band_templates[asset] = templates
+        return [dict(template) for template in templates]
+
+
+PRODUCT_SPECS: Dict[str, ProductSpec] = {}
+
+
+def register_product_spec(spec: ProductSpec) -> None:
+    """Registers a product spec, replacing any spec for the same product type."""
+    PRODUCT_SPECS[spec.product_type] = spec
+
+
+def get_product_spec(product_type: str) -> ProductSpec:
+    """Returns the spec of a product type as given by the manifest, e.g.
+    ``OL_1_EFR___``."""
+    spec = PRODUCT_SPECS.get(product_type[:8])
+    if spec is None:
+        raise RuntimeError(f"Unknown product type encountered: {product_type}")
+    return spec
+
+
+def _assets(
+    keys: List[str],
+    bands: Optional[Mapping[str, Tuple[str, ...]]] = None,
+    descriptions: Optional[Mapping[str, str]] = None,
+) -> Tuple[AssetSpec, ...]:
+    bands = bands or {}
+    descriptions = descriptions or {}
+    return tuple(
+        AssetSpec(key, bands.get(key, ()), descriptions.get(key)) for key in keys
+    )
+
+
+# Assets are paired with the bands of the instrument in order
+_OLCI_L1_ASSETS = tuple(
+    AssetSpec(key, (band,))
+    for key, band in zip(constants.OLCI_L1_ASSET_KEYS, constants.SENTINEL_OLCI_BANDS)
+)
+_SLSTR_L1_ASSETS = tuple(
+    AssetSpec(key, (band,))
+    for key, band in zip(constants.SLSTR_L1_ASSET_KEYS, constants.SENTINEL_SLSTR_BANDS)
+)
+
+_OLCI_L2_LAND_BANDS = {
+    "ogviData": ("Oa03", "Oa10", "Oa17"),
+    "gifaparData": ("Oa03", "Oa10", "Oa17"),
+    "otciData": ("Oa10", "Oa11", "Oa12"),
+    "iwvData": ("Oa18", "Oa19"),
+    "rcOgviData": ("Oa10", "Oa17"),
+}
+
+_OLCI_L2_WATER_NN_BANDS = (
+    "Oa01",
+    "Oa02",
+    "Oa03",
+    "Oa04",
+    "Oa05",
+    "Oa06",
+    "Oa07",
+    "Oa08",
+    "Oa09",
+    "Oa10",
+    "Oa11",
+    "Oa12",
+    "Oa16",
+    "Oa17",
+    "Oa18",
+    "Oa21",
+)
+_OLCI_L2_WATER_BANDS = {
+    "chlNnData": _OLCI_L2_WATER_NN_BANDS,
+    "tsmNnData": _OLCI_L2_WATER_NN_BANDS,
+    "chlOc4meData": ("Oa03", "Oa04", "Oa05", "Oa06"),
+    "iopNnData": ("Oa01", "Oa12", "Oa16", "Oa17", "Oa21"),
+    "iwvData": ("Oa18", "Oa19"),
+    "trspData": ("Oa04", "Oa06"),
+    "wAerData": ("Oa05", "Oa06", "Oa17"),
+    # the reflectance assets hold the band their key starts with
+    **{
+        key: (key[:4],)
+        for key in constants.OLCI_L2_WATER_ASSET_KEYS
+        if key.endswith("_reflectanceData")
+    },
+}
+
+_SRAL_BANDS = tuple(constants.SENTINEL_SRAL_BANDS)
+# the reduced measurement file only holds the Ku band
+_SRAL_L2_BANDS = {
+    key: (_SRAL_BANDS[1],) if "reduced" in key else _SRAL_BANDS
+    for key in constants.SRAL_L2_LAN_WAT_KEYS
+}
+
+_SYNERGY_AOD_BANDS = (
+    "SYN_440",
+    "SYN_550",
+    "SYN_670",
+    "SYN_865",
+    "SYN_1600",
+    "SYN_2250",
+)
+_SYNERGY_SYN_BANDS = {
+    **{
+        key: (f"SYN{index + 1:02d}",)
+        for index, key in enumerate(constants.SYNERGY_SYN_ASSET_KEYS[:26])
+    },
+    "Syn_ATO550_Data": tuple(constants.SYNERGY_L2_A550_T550_BANDS),
+    "Syn_Angstrom_exp550_Data": tuple(constants.SYNERGY_L2_A550_T550_BANDS),
+    "Syn_SDR_removed_pixels_Data": tuple(constants.SYNERGY_L2_SDR_BANDS),
+}
+_SYNERGY_VEGETATION_BANDS = {
+    "b0Data": ("B0",),
+    "b2Data": ("B2",),
+    "b3Data": ("B3",),
+    "mirData": ("MIR",),
+}
+
+for _product_type in ("OL_1_EFR", "OL_1_ERR"):
+    register_product_spec(
+        ProductSpec(
+            _product_type,
+            _OLCI_L1_ASSETS,
+            band_catalog=constants.SENTINEL_OLCI_BANDS,
+        )
+    )
+
+for _product_type in ("OL_2_LFR", "OL_2_LRR"):
+    register_product_spec(
+        ProductSpec(
+            _product_type,
+            _assets(constants.OLCI_L2_LAND_ASSET_KEYS, _OLCI_L2_LAND_BANDS),
+            band_catalog=constants.SENTINEL_OLCI_BANDS,
+            alternative_assets=_assets(
+                constants.OLCI_L2_LAND_ASSET_KEYS_RENAMED, _OLCI_L2_LAND_BANDS
+            ),
+        )
+    )
+
+register_product_spec(
+    ProductSpec(
+        "OL_2_WFR",
+        _assets(constants.OLCI_L2_WATER_ASSET_KEYS, _OLCI_L2_WATER_BANDS),
+        band_catalog=constants.SENTINEL_OLCI_BANDS,
+    )
+)
+
+register_product_spec(
+    ProductSpec(
+        "SL_1_RBT",
+        _SLSTR_L1_ASSETS,
+        band_catalog=constants.SENTINEL_SLSTR_BANDS,
+    )
+)
+
+register_product_spec(
+    ProductSpec(
+        "SL_2_FRP",
+        _assets(
+            constants.SLSTR_L2_FRP_KEYS,
+            {"FRP_IN_Data": ("S05", "S06", "S07", "S10")},
+            {"FRP_IN_Data": "Fire Radiative Power (FRP) dataset"},
+        ),
+        band_catalog=constants.SENTINEL_SLSTR_BANDS,
+    )
+)
+
+register_product_spec(
+    ProductSpec(
+        "SL_2_LST",
+        _assets(
+            constants.SLSTR_L2_LST_KEYS,
+            {"LST_IN_Data": ("S08", "S09")},
+            {"LST_IN_Data": "Land Surface Temperature (LST) values"},
+        ),
+        band_catalog=constants.SENTINEL_SLSTR_BANDS,
+    )
+)
+
+register_product_spec(
+    ProductSpec(
+        "SL_2_WST",
+        _assets(
+            ["L2P_Data"],
+            {"L2P_Data": ("S07", "S08", "S09")},
+            {
+                "L2P_Data": "Data respects the Group for High Resolution "
+                "Sea Surface Temperature (GHRSST) L2P specification"
+            },
+        ),
+        band_catalog=constants.SENTINEL_SLSTR_BANDS,
+    )
+)
+
+for _product_type in ("SR_2_LAN", "SR_2_WAT"):
+    register_product_spec(
+        ProductSpec(
+            _product_type,
+            _assets(constants.SRAL_L2_LAN_WAT_KEYS, _SRAL_L2_BANDS),
+            band_catalog=constants.SENTINEL_SRAL_BANDS,
+            band_field="s3:altimetry_bands",
+            band_converter=altimetry_band,
+            spatial_resolution=False,
+            shape_field="shape",
+        )
+    )
+
+register_product_spec(
+    ProductSpec(
+        "SY_2_AOD",
+        _assets(
+            ["NTC_AOD_Data"],
+            {"NTC_AOD_Data": _SYNERGY_AOD_BANDS},
+            {"NTC_AOD_Data": "Global aerosol parameters"},
+        ),
+        band_catalog=constants.SENTINEL_SYNERGY_BANDS,
+    )
+)
+
+register_product_spec(
+    ProductSpec(
+        "SY_2_SYN",
+        _assets(constants.SYNERGY_SYN_ASSET_KEYS, _SYNERGY_SYN_BANDS),
+        band_catalog={
+            **constants.SENTINEL_SYNERGY_BANDS,
+            **constants.SENTINEL_OLCI_SLSTR_BANDS,
+        },
+        shape_field="s3:shape",
+    )
+)
+
+for _product_type in ("SY_2_V10", "SY_2_VG1"):
+    register_product_spec(
+        ProductSpec(
+            _product_type,
+            _assets(
+                constants.SYNERGY_V10_VG1_ASSET_KEYS,
+                {**_SYNERGY_VEGETATION_BANDS, "ndviData": ("B2", "B3")},
+            ),
+            band_catalog=constants.SENTINEL_SYNERGY_BANDS,
+            shape_field="s3:shape",
+        )
+    )
+
+register_product_spec(
+    ProductSpec(
+        "SY_2_VGP",
+        _assets(constants.SYNERGY_VGP_ASSET_KEYS, _SYNERGY_VEGETATION_BANDS),
+        band_catalog=constants.SENTINEL_SYNERGY_BANDS,
+        shape_field="s3:shape",
+    )
+)
@@ -127,10 +127,16 @@ def fill_file_properties(
     file_ext.size = int(asset_size)
 
 
+def manifest_checksum(manifest_text: str) -> str:
+    """Returns the MD5 of the manifest text, the ``file:checksum`` of the
+    manifest asset."""
+    return md5(manifest_text.encode(encoding="UTF-8")).hexdigest()
+
+
 def fill_manifest_file_properties(
     manifest_href: str, manifest_text: str, file_ext: FileExtensionUpdated
 ) -> None:
     manifest_text_encoded = manifest_text.encode(encoding="UTF-8")
-    file_ext.checksum = md5(manifest_text_encoded).hexdigest()
+    file_ext.checksum = manifest_checksum(manifest_text)
     file_ext.local_path = os.sep.join(manifest_href.split("/")[-2:])
     file_ext.size = int(len(manifest_text_encoded))
@@ -0,0 +1,276 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import fsspec  # type: ignore
+from stactools.core.io import ReadHrefModifier
+
+logger = logging.getLogger(__name__)
+
+HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+
+# The HDF5 superblock, the root group object header and, for files written in a
+# single pass, the dimension scales and global attributes sit at the start of
+# the file.
+DEFAULT_HEAD_BYTES = 64 * 1024
+# Metadata rewritten when a netCDF-4 file is closed is appended at its end.
+DEFAULT_TAIL_BYTES = 16 * 1024
+# Ranges of the same file separated by fewer bytes than this are fetched with a
+# single request.
+DEFAULT_MAX_GAP = 64 * 1024
+DEFAULT_MAX_WORKERS = 16
+# Files up to this size are completed rather than read from head and tail:
+# their metadata may fill the gap, and netCDF-C can crash instead of failing
+# when it reads metadata from unfetched bytes.
+DEFAULT_WHOLE_FILE_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ByteRange:
+    """A half-open byte range ``[start, end)`` of the file at ``href``."""
+
+    href: str
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+
+def normalize_href(href: str) -> str:
+    """Removes the ``./`` segments some manifest locations leave in hrefs."""
+    return href.replace("/./", "/")
+
+
+def coalesce_ranges(
+    ranges: Iterable[ByteRange], max_gap: int = DEFAULT_MAX_GAP
+) -> List[ByteRange]:
+    """Merges overlapping ranges, and ranges of the same file separated by at
+    most ``max_gap`` bytes, into single ranges.
+
+    Args:
+        ranges (Iterable[ByteRange]): The ranges to merge.
+        max_gap (int): Largest gap, in bytes, that is read rather than split
+            into a separate request.
+
+    Returns:
+        List[ByteRange]: The merged ranges, grouped by href and sorted by start.
+    """
+    by_href: Dict[str, List[ByteRange]] = {}
+    for byte_range in ranges:
+        by_href.setdefault(byte_range.href, []).append(byte_range)
+
+    merged: List[ByteRange] = []
+    for href, href_ranges in by_href.items():
+        href_ranges.sort(key=lambda r: r.start)
+        current = href_ranges[0]
+        for byte_range in href_ranges[1:]:
+            if byte_range.start - current.end <= max_gap:
+                current = ByteRange(
+                    href, current.start, max(current.end, byte_range.end)
+                )
+            else:
+                merged.append(current)
+                current = byte_range
+        merged.append(current)
+    return merged
+
+
+def hdf5_end_of_file(head: bytes) -> Optional[int]:
+    """Returns the end-of-file address stored in an HDF5 superblock, or None if
+    ``head`` doesn't start with a (complete) superblock."""
+    if not head.startswith(HDF5_SIGNATURE) or len(head) < 14:
+        return None
+    version = head[8]
+    if version in (0, 1):
+        size_of_offsets = head[13]
+        offset = (24 if version == 0 else 28) + 2 * size_of_offsets
+    elif version in (2, 3):
+        size_of_offsets = head[9]
+        offset = 12 + 2 * size_of_offsets
+    else:
+        return None
+    if len(head) < offset + size_of_offsets:
+        return None
+    return int.from_bytes(head[offset : offset + size_of_offsets], "little")
+
+
+class HeaderBuffer:
+    """The fetched ranges of a single NetCDF file.
+
+    Bytes that were not fetched read as zeros. Files with a version 2 or later
+    HDF5 superblock checksum all of their metadata, so reading metadata from an
+    unfetched range fails instead of returning garbage.
+    """
+
+    def __init__(self, head: bytes, requested: int, size: int) -> None:
+        self.chunks: List[Tuple[int, bytes]] = [(0, head)]
+        end_of_file = hdf5_end_of_file(head)
+        if end_of_file is not None:
+            self.size = end_of_file
+        elif len(head) < requested:
+            self.size = len(head)
+        else:
+            self.size = size
+        self.checksummed = head.startswith(HDF5_SIGNATURE) and head[8] >= 2
+
+    def add(self, start: int, data: bytes) -> None:
+        self.chunks.append((start, data))
+
+    @property
+    def complete(self) -> bool:
+        covered = 0
+        for start, data in sorted(self.chunks, key=lambda c: c[0]):
+            if start > covered:
+                return False
+            covered = max(covered, start + len(data))
+        return covered >= self.size
+
+    def getbuffer(self) -> bytearray:
+        buffer = bytearray(self.size)
+        for start, data in self.chunks:
+            data = data[: max(self.size - start, 0)]
+            buffer[start : start + len(data)] = data
+        return buffer
+
+
+@dataclass
+class PrefetchResult:
+    buffers: Dict[str, HeaderBuffer] = field(default_factory=dict)
+    requests: int = 0
+    bytes_read: int = 0
+    # every request, with the bytes it returned and how long it took
+    fetches: List[Tuple[ByteRange, int, float]] = field(default_factory=list)
+
+
+def plan_ranges(
+    sizes: Dict[str, int],
+    head_bytes: int = DEFAULT_HEAD_BYTES,
+    tail_bytes: int = DEFAULT_TAIL_BYTES,
+    max_gap: int = DEFAULT_MAX_GAP,
+) -> List[ByteRange]:
+    """Plans the ranges holding the headers of the given files.
+
+    Args:
+        sizes (Dict[str, int]): File sizes, as reported by the manifest, by href.
+        head_bytes (int): Bytes to read from the start of each file.
+        tail_bytes (int): Bytes to read from the end of each file.
+        max_gap (int): Largest gap between the head and the tail of a file
+            that is read rather than split into a separate request.
+
+    Returns:
+        List[ByteRange]: The coalesced ranges. Small files are read whole.
+    """
+    ranges = []
+    for href, size in sizes.items():
+        ranges.append(ByteRange(href, 0, min(head_bytes, size)))
+        if tail_bytes and size > head_bytes:
+            ranges.append(ByteRange(href, max(size - tail_bytes, head_bytes), size))
+    return coalesce_ranges(ranges, max_gap)
+
+
+def fetch_ranges(
+    ranges: List[ByteRange],
+    read_href_modifier: Optional[ReadHrefModifier] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> List[Tuple[ByteRange, bytes, float]]:
+    """Reads the given ranges concurrently, one request per range.
+
+    Returns:
+        List[Tuple[ByteRange, bytes, float]]: Each range with its data and the
+        seconds its request took.
+    """
+
+    def fetch(byte_range: ByteRange) -> Tuple[ByteRange, bytes, float]:
+        href = byte_range.href
+        if read_href_modifier is not None:
+            href = read_href_modifier(href)
+        start = time.perf_counter()
+        fs, path = fsspec.core.url_to_fs(href)
+        data = fs.cat_file(path, start=byte_range.start, end=byte_range.end)
+        return byte_range, data, time.perf_counter() - start
+
+    if not ranges:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ranges)))) as pool:
+        return list(pool.map(fetch, ranges))
+
+
+def prefetch_headers(
+    sizes: Dict[str, int],
+    read_href_modifier: Optional[ReadHrefModifier] = None,
+    head_bytes: int = DEFAULT_HEAD_BYTES,
+    tail_bytes: int = DEFAULT_TAIL_BYTES,
+    max_gap: int = DEFAULT_MAX_GAP,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    whole_file_bytes: int = DEFAULT_WHOLE_FILE_BYTES,
+) -> PrefetchResult:
+    """Fetches the headers of the given NetCDF files in at most two rounds of
+    concurrent range requests.
+
+    The first round reads the head of every file, which covers small files
+    entirely. The second round reads the tail of the checksummed files whose
+    head doesn't reach the end-of-file address recorded in their superblock.
+
+    Args:
+        sizes (Dict[str, int]): File sizes, as reported by the manifest, by href.
+        read_href_modifier: A function that takes an HREF and returns a modified HREF.
+        head_bytes (int): Bytes to read from the start of each file.
+        tail_bytes (int): Bytes to read from the end of each file.
+        max_gap (int): Largest gap that is read rather than split into a
+            separate request.
+        max_workers (int): Maximum number of concurrent requests.
+        whole_file_bytes (int): Checksummed files up to this size are read
+            entirely in the second round, instead of just their tail.
+
+    Returns:
+        PrefetchResult: The buffers by normalized href, with request statistics.
+    """
+    result = PrefetchResult()
+    plan = plan_ranges(sizes, head_bytes, tail_bytes, max_gap)
+
+    heads = [r for r in plan if r.start == 0]
+    for byte_range, data, seconds in fetch_ranges(
+        heads, read_href_modifier, max_workers
+    ):
+        result.requests += 1
+        result.bytes_read += len(data)
+        result.fetches.append((byte_range, len(data), seconds))
+        result.buffers[normalize_href(byte_range.href)] = HeaderBuffer(
+            data, byte_range.length, sizes[byte_range.href]
+        )
+
+    tails = []
+    for byte_range in plan:
+        if byte_range.start == 0:
+            continue
+        buffer = result.buffers[normalize_href(byte_range.href)]
+        if buffer.complete or not buffer.checksummed:
+            continue
+        # anchor the tail to the superblock's end-of-file address, which is
+        # more reliable than the manifest size
+        fetched = len(buffer.chunks[0][1])
+        start = max(buffer.size - byte_range.length, fetched)
+        if start - fetched <= max_gap or buffer.size <= whole_file_bytes:
+            start = fetched
+        if start < buffer.size:
+            tails.append(ByteRange(byte_range.href, start, buffer.size))
+
+    for byte_range, data, seconds in fetch_ranges(
+        tails, read_href_modifier, max_workers
+    ):
+        result.requests += 1
+        result.bytes_read += len(data)
+        result.fetches.append((byte_range, len(data), seconds))
+        result.buffers[normalize_href(byte_range.href)].add(byte_range.start, data)
+
+    logger.debug(
+        "Prefetched %d NetCDF headers with %d requests (%d bytes)",
+        len(result.buffers),
+        result.requests,
+        result.bytes_read,
+    )
+    return result
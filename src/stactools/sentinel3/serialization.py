@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+import fsspec  # type: ignore
+import pystac
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+def dumps(item_dict: Dict[str, Any]) -> bytes:
+    """Serializes an Item dictionary to compact JSON.
+
+    orjson is used when it is installed, the standard library otherwise. Both
+    give the same document, with non-ASCII characters written as UTF-8; the
+    exception is NaN, which isn't valid JSON and which orjson writes as null.
+
+    Args:
+        item_dict (Dict[str, Any]): The dictionary, e.g. from ``Item.to_dict``.
+
+    Returns:
+        bytes: UTF-8 encoded JSON, without a trailing newline.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(item_dict)
+        except TypeError as e:
+            # e.g. integers beyond 64 bits, which json handles
+            logger.debug("orjson could not serialize the item, using json: %s", e)
+    return json.dumps(item_dict, separators=(",", ":"), ensure_ascii=False).encode(
+        "utf-8"
+    )
+
+
+def item_to_json(item: pystac.Item, dest_href: Optional[str] = None) -> bytes:
+    """Serializes an Item to compact JSON.
+
+    Unlike ``Item.save_object``, link HREFs aren't resolved against the root
+    catalog, since the items created by this package aren't part of one.
+
+    Args:
+        item (pystac.Item): The item.
+        dest_href (Optional[str]): Sets the item's self HREF before serializing.
+
+    Returns:
+        bytes: UTF-8 encoded JSON, without a trailing newline.
+    """
+    if dest_href is not None:
+        item.set_self_href(dest_href)
+    return dumps(item.to_dict(include_self_link=True, transform_hrefs=False))
+
+
+def save_item(item: pystac.Item, dest_href: str) -> None:
+    """Saves an Item as compact JSON, a faster alternative to
+    ``Item.save_object``.
+
+    Args:
+        item (pystac.Item): The item.
+        dest_href (str): Where to save the item; also becomes its self HREF.
+    """
+    data = item_to_json(item, dest_href)
+    with fsspec.open(dest_href, "wb") as f:
+        f.write(data)
+
+
+def save_items_ndjson(
+    items: Iterable[pystac.Item],
+    dest_href: str,
+    on_write: Optional[Callable[[pystac.Item, int], None]] = None,
+) -> int:
+    """Saves Items to a newline-delimited JSON file, one compact item per line.
+
+    Items are written as they are consumed, so this can be fed straight from
+    :func:`stactools.sentinel3.batch.create_items`.
+
+    Args:
+        items (Iterable[pystac.Item]): The items.
+        dest_href (str): The NDJSON file to write.
+        on_write (Optional[Callable[[pystac.Item, int], None]]): Called with
+            each item and the byte offset of its line, e.g. to index it.
+
+    Returns:
+        int: The number of items written.
+    """
+    count = 0
+    offset = 0
+    with fsspec.open(dest_href, "wb") as f:
+        for item in items:
+            data = item_to_json(item)
+            f.write(data)
+            f.write(b"\n")
+            if on_write is not None:
+                on_write(item, offset)
+            offset += len(data) + 1
+            count += 1
+    return count
+
+
+def read_items_ndjson(href: str, offsets: Iterable[int]) -> Iterator[pystac.Item]:
+    """Reads Items from a newline-delimited JSON file at the given byte offsets.
+
+    Args:
+        href (str): The NDJSON file, e.g. written by :func:`save_items_ndjson`.
+        offsets (Iterable[int]): Byte offsets of the lines to read, e.g. as
+            reported by the ``on_write`` callback of :func:`save_items_ndjson`.
+
+    Returns:
+        Iterator[pystac.Item]: The items, in the order of the offsets.
+    """
+    with fsspec.open(href, "rb") as f:
+        for offset in offsets:
+            if offset < 0:
+                raise ValueError(f"Invalid offset into {href}: {offset}")
+            f.seek(offset)
+            yield pystac.Item.from_dict(json.loads(f.readline()))
+
+
+def relative_items_href(index_href: str, items_href: str) -> str:
+    """Returns the HREF of an NDJSON file relative to an index of its items,
+    as :func:`read_index_items` expects it.
+
+    Args:
+        index_href (str): The index file.
+        items_href (str): The NDJSON file.
+    """
+    return os.path.relpath(items_href, os.path.dirname(index_href))
+
+
+def read_index_items(
+    index_href: str, items_href: Optional[str], offsets: Iterable[int]
+) -> Iterator[pystac.Item]:
+    """Reads the Items found in an index from its NDJSON file, seeking to
+    their offsets.
+
+    Args:
+        index_href (str): Where the index was loaded from.
+        items_href (Optional[str]): The NDJSON file, relative to the index,
+            as stored in it; None if the items weren't saved as NDJSON.
+        offsets (Iterable[int]): Byte offsets of the items.
+
+    Returns:
+        Iterator[pystac.Item]: The items, in the order of the offsets.
+
+    Raises:
+        ValueError: If the items weren't saved as NDJSON.
+    """
+    if items_href is None:
+        raise ValueError("The items of this index weren't saved as NDJSON")
+    return read_items_ndjson(
+        os.path.join(os.path.dirname(index_href), items_href), offsets
+    )
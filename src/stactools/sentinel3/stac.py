@@ -1,33 +1,44 @@
 import logging
 import os
 import re
-from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-import antimeridian
 import pystac
-import shapely.geometry
 from pystac.utils import now_to_rfc3339_str
 from pystac.extensions.eo import EOExtension
 from pystac.extensions.sat import SatExtension
 from stactools.core.io import ReadHrefModifier
 
-from .constants import (
-    MANIFEST_FILENAME,
-    SENTINEL_CONSTELLATION,
-    SENTINEL_PROVIDER,
-    SPECIAL_ASSET_KEYS,
-)
+from .constants import MANIFEST_FILENAME, SENTINEL_CONSTELLATION
 from .file_extension_updated import FileExtensionUpdated
+from .geometry import Footprint, NormalizedFootprint, normalize_footprints
+from .geometry import recursive_round  # noqa: F401
+from .instrumentation import (
+    BAND_ASSETS,
+    FILE_PROPERTIES,
+    FOOTPRINT,
+    MANIFEST_ASSET,
+    NORMALIZE_FOOTPRINT,
+    PREFETCH_HEADERS,
+    PRODUCT_METADATA,
+    Instrumentation,
+    StageTimer,
+)
+from .item_template import get_item_template
+from .item_template import product_name as product_type  # noqa: F401
+from .item_template import sen3_to_kebab, sen3_to_snake  # noqa: F401
 from .metadata_links import MetadataLinks
 from .product_metadata import ProductMetadata
+from .product_specs import hz2ghz, nano2micro  # noqa: F401
 from .properties import (
     fill_eo_properties,
     fill_file_properties,
     fill_manifest_file_properties,
     fill_sat_properties,
 )
-from .winding import get_winding
+from .tie_points import read_tie_point_footprint
+from .tiles import add_quadkeys
+from .track import read_track_footprint
 
 logger = logging.getLogger(__name__)
 
@@ -37,76 +48,6 @@ logger = logging.getLogger(__name__)
 # https://github.com/microsoft/planetary-computer-tasks/blob/main/datasets/sentinel-3/
 
 
-def recursive_round(coordinates: List[Any], precision: int) -> List[Any]:
-    """Rounds a list of numbers. The list can contain additional nested lists
-    or tuples of numbers.
-
-    Any tuples encountered will be converted to lists.
-
-    Args:
-        coordinates (List[Any]): A list of numbers, possibly containing nested
-            lists or tuples of numbers.
-        precision (int): Number of decimal places to use for rounding.
-
-    Returns:
-        List[Any]: The list of numbers rounded to the given precision.
-    """
-    rounded: List[Any] = []
-    for value in coordinates:
-        if isinstance(value, (int, float)):
-            rounded.append(round(value, precision))
-        else:
-            rounded.append(recursive_round(list(value), precision))
-    return rounded
-
-
-def nano2micro(value: float) -> float:
-    """Converts nanometers to micrometers while handling floating
-    point arithmetic errors."""
-    return float(Decimal(str(value)) / Decimal("1000"))
-
-
-def hz2ghz(value: float) -> float:
-    """Converts hertz to gigahertz while handling floating point
-    arithmetic errors."""
-    return float(Decimal(str(value)) / Decimal("1000000000"))
-
-
-def sen3_to_kebab(asset_key: str) -> str:
-    """Converts asset_key to a clean kebab case"""
-    if asset_key in SPECIAL_ASSET_KEYS:
-        return SPECIAL_ASSET_KEYS[asset_key]
-
-    # purge Data suffix
-    asset_key = asset_key.replace("_Data", "").replace("Data", "", 1)
-
-    new_asset_key = ""
-    for first, second in zip(asset_key, asset_key[1:]):
-        new_asset_key += first.lower()
-        if first.islower() and second.isupper():
-            new_asset_key += "-"
-    new_asset_key += asset_key[-1].lower()
-    new_asset_key = new_asset_key.replace("_", "-")
-    return new_asset_key
-
-
-def sen3_to_snake(key: str) -> str:
-    new_key = "".join("_" + char.lower() if char.isupper() else char for char in key)
-    # strip "_pixels_percentages" to match eo:cloud_cover pattern
-    if new_key.endswith("_pixels_percentage"):
-        new_key = new_key.replace("_pixels_percentage", "")
-    elif new_key.endswith("_pixelss_percentage"):
-        new_key = new_key.replace("_pixelss_percentage", "")
-    elif new_key.endswith("_percentage"):
-        new_key = new_key.replace("_percentage", "")
-    return new_key
-
-
-def product_type(source, datatype):
-    source_to_name = {"OL": "olci", "SL": "slstr", "SR": "sral", "SY": "synergy"}
-    return f"{source_to_name[source]}-{datatype.strip('_').lower()}"
-
-
 def get_array_shape(
     asset_shape: List[Dict[str, int]], item_shape: List[int]
 ) -> List[int]:
@@ -157,6 +98,13 @@ def create_item(
     granule_href: str,
     skip_nc: bool = False,
     read_href_modifier: Optional[ReadHrefModifier] = None,
+    prefetch_headers: bool = False,
+    simplify_tolerance: Optional[float] = None,
+    simplify_units: str = "degrees",
+    tie_point_footprint: bool = False,
+    track_footprint: bool = False,
+    quadkey_zoom: Optional[int] = None,
+    instrumentation: Optional[Instrumentation] = None,
 ) -> pystac.Item:
     """Create a STC Item from a Sentinel-3 scene.
 
@@ -169,13 +117,84 @@ def create_item(
         read_href_modifier: A function that takes an HREF and returns a modified HREF.
             This can be used to modify a HREF to make it readable, e.g. appending
             an Azure SAS token or creating a signed URL.
+        prefetch_headers (bool): Fetch the headers of all NetCDF files with planned,
+            concurrent range requests before reading them, instead of opening each
+            file in turn. Recommended when working over network. Defaults to False.
+        simplify_tolerance (Optional[float]): Simplify the footprint with this
+            tolerance. The simplified footprint always covers the original one.
+            Defaults to None, which keeps the footprint as it is.
+        simplify_units (str): Units of ``simplify_tolerance``, "degrees" or
+            "meters". Defaults to "degrees".
+        tie_point_footprint (bool): Derive the footprint of OLCI and SLSTR
+            granules from the edges of their tie-point geolocation grid, which
+            is read even if ``skip_nc`` is set, instead of using the coarser
+            footprint of the manifest. Falls back to the manifest footprint if
+            the grid can't be read. Defaults to False.
+        track_footprint (bool): Derive the footprint of SRAL granules by
+            buffering their 1 Hz nadir track, read from the standard
+            measurement file even if ``skip_nc`` is set. Falls back to the
+            manifest footprint if the track can't be read. Defaults to False.
+        quadkey_zoom (Optional[int]): Add the quadkeys of the Web Mercator
+            tiles at this zoom level that the footprint covers, as the
+            ``s3:quadkeys`` property. Defaults to None, which doesn't.
+        instrumentation (Optional[Instrumentation]): Receives the start and
+            end of each stage and the files read, e.g. a
+            :class:`stactools.sentinel3.instrumentation.StageStats` or an
+            :class:`stactools.sentinel3.instrumentation.IOReport`. Defaults
+            to None.
 
     Returns:
         pystac.Item: An item representing the Sentinel-3 OLCI or SLSTR scene.
     """
 
-    metalinks = MetadataLinks(granule_href, read_href_modifier)
+    item, footprint = prepare_item(
+        granule_href,
+        skip_nc,
+        read_href_modifier,
+        prefetch_headers,
+        tie_point_footprint,
+        track_footprint,
+        instrumentation,
+    )
+    timer = StageTimer(instrumentation, granule_href)
+    timer.begin(NORMALIZE_FOOTPRINT)
+    (normalized,) = normalize_footprints(
+        [footprint], simplify_tolerance, simplify_units
+    )
+    apply_footprint(item, normalized, quadkey_zoom)
+    timer.end()
+    return item
+
+
+def prepare_item(
+    granule_href: str,
+    skip_nc: bool = False,
+    read_href_modifier: Optional[ReadHrefModifier] = None,
+    prefetch_headers: bool = False,
+    tie_point_footprint: bool = False,
+    track_footprint: bool = False,
+    instrumentation: Optional[Instrumentation] = None,
+) -> Tuple[pystac.Item, Footprint]:
+    """Creates a STAC Item without fixing its footprint.
+
+    The footprint is returned separately, so that the footprints of many
+    items can be normalized together with
+    :func:`stactools.sentinel3.geometry.normalize_footprints` and applied
+    with :func:`apply_footprint`. The arguments are those of
+    :func:`create_item`.
+
+    Returns:
+        Tuple[pystac.Item, Footprint]: The item, with the footprint from the
+        manifest as geometry, and the footprint to normalize.
+    """
+
+    timer = StageTimer(instrumentation, granule_href)
+    metalinks = MetadataLinks(granule_href, read_href_modifier, timer)
+    if prefetch_headers and not skip_nc:
+        timer.begin(PREFETCH_HEADERS)
+        timer.add_bytes(metalinks.prefetch_headers().bytes_read)
 
+    timer.begin(PRODUCT_METADATA)
     product_metadata = ProductMetadata(granule_href, metalinks.manifest)
 
     item = pystac.Item(
@@ -184,7 +203,6 @@ def create_item(
         bbox=product_metadata.bbox,
         datetime=product_metadata.get_datetime,
         properties={"created": now_to_rfc3339_str()},
-        stac_extensions=["https://stac-extensions.github.io/file/v2.1.0/schema.json"],
     )
     sen3naming = re.match(
         r"^.*/?(?P<mission>...)_(?P<source>[A-Z]{2})_(?P<level>[_012])_(?P<datatype>.{6})"
@@ -199,22 +217,27 @@ def create_item(
         raise ValueError(
             "Granule name does not match SEN3 naming convention(s)", granule_href
         )
+    template = get_item_template(
+        "{}_{}_{}".format(*sen3naming.group("source", "level", "datatype"))[:8],
+        sen3naming.group("collection"),
+    )
 
     # ---- Add Extensions ----
+    item.stac_extensions = list(template.stac_extensions)
     # sat
-    sat = SatExtension.ext(item, add_if_missing=True)
+    sat = SatExtension.ext(item)
     fill_sat_properties(sat, metalinks.manifest)
 
     # eo
-    if sen3naming.group("datatype") not in ("WAT___", "LAN___"):
-        eo = EOExtension.ext(item, add_if_missing=True)
+    if template.is_eo:
+        eo = EOExtension.ext(item)
         fill_eo_properties(eo, metalinks.manifest)
 
     # s3 properties
     item.properties.update({**product_metadata.metadata_dict})
 
     # --Common metadata--
-    item.common_metadata.providers = [SENTINEL_PROVIDER]
+    # Providers are supplied in the Collection, not the Item
     item.common_metadata.platform = product_metadata.platform
     item.common_metadata.constellation = SENTINEL_CONSTELLATION
 
@@ -227,11 +250,7 @@ def create_item(
     item.properties["s3:processing_timeliness"] = sen3naming["timeliness"]
 
     # Add a user-friendly name
-    item.properties["s3:product_name"] = product_type(
-        *sen3naming.group("source", "datatype")
-    )
-    # Providers should be supplied in the Collection, not the Item
-    item.properties.pop("providers", None)
+    item.properties["s3:product_name"] = template.product_name
 
     # start_datetime and end_datetime are incorrectly formatted
     item.properties["start_datetime"] = pystac.utils.datetime_to_str(
@@ -248,12 +267,13 @@ def create_item(
     new_props = {}
     for key, value in item.properties.items():
         if key.startswith("s3:"):
-            new_props[sen3_to_snake(key)] = value
+            new_props[template.property_key(key)] = value
         else:
             new_props[key] = value
     item.properties = new_props
 
     # Add assets to item
+    timer.begin(MANIFEST_ASSET)
     manifest_asset_key, manifest_asset = metalinks.create_manifest_asset()
     item.add_asset(manifest_asset_key, manifest_asset)
     manifest_href = os.path.join(granule_href, MANIFEST_FILENAME)
@@ -261,13 +281,15 @@ def create_item(
     fill_manifest_file_properties(manifest_href, metalinks.manifest_text, manifest_file)
 
     # create band asset list
-    band_list, asset_identifier_list, asset_list = metalinks.create_band_asset(
+    timer.begin(BAND_ASSETS)
+    asset_identifier_list, asset_list = metalinks.create_band_asset(
         metalinks.manifest, skip_nc
     )
 
-    band_list = [sen3_to_kebab(key) for key in band_list]
+    band_list = [template.asset_key(key) for key in asset_identifier_list]
 
     # objects for bands
+    timer.begin(FILE_PROPERTIES)
     for band, identifier, asset in zip(band_list, asset_identifier_list, asset_list):
         item.add_asset(band, asset)
         file = FileExtensionUpdated.ext(asset, add_if_missing=True)
@@ -295,28 +317,8 @@ def create_item(
         if asset_key == "safe-manifest":
             asset.description = "SAFE product manifest"
 
-        # correct eo:bands
-        if "eo:bands" in asset.extra_fields:
-            for band in asset.extra_fields["eo:bands"]:
-                band["center_wavelength"] = nano2micro(band["center_wavelength"])
-                band["full_width_half_max"] = nano2micro(band["band_width"])
-                band.pop("band_width")
-
-        # Tune up the radar altimetry bands. Radar altimetry is different
-        # enough than radar imagery that the existing SAR extension doesn't
-        # quite work (plus, the SAR extension doesn't have a band object).
-        # We'll use a band construct similar to eo:bands, but follow the
-        # naming and unit conventions in the SAR extension.
-        if "sral:bands" in asset.extra_fields:
-            asset.extra_fields["s3:altimetry_bands"] = asset.extra_fields.pop(
-                "sral:bands"
-            )
-            for band in asset.extra_fields["s3:altimetry_bands"]:
-                band["frequency_band"] = band.pop("name")
-                band["center_frequency"] = hz2ghz(band.pop("central_frequency"))
-                band["band_width"] = hz2ghz(band.pop("band_width_in_Hz"))
-
     # ---- GEOMETRY ----
+    timer.begin(FOOTPRINT)
     geometry_dict = item.geometry
     assert isinstance(geometry_dict, dict)
     assert geometry_dict["type"] == "Polygon"
@@ -329,34 +331,52 @@ def create_item(
     else:
         max_delta_lon = 120
 
-    coords = list(geometry_dict["coordinates"][0])
-    winding = get_winding(coords, max_delta_lon)
-    if winding == "CW":
-        geometry_dict["coordinates"] = [coords[::-1]]
-    elif winding is None:
-        logger.warning(
-            "Could not determine winding order of polygon in " f"Item: '{item.id}'"
-        )
-
-    geometry = shapely.geometry.shape(geometry_dict)
-
     # slstr-lst strip geometries are incorrect, so we apply a hack
-    if item.properties["s3:product_name"] == "slstr-lst" and sen3naming.group(
-        "instance_id"
-    ).endswith("_____"):
-        geometry = antimeridian.fix_polygon(geometry, force_north_pole=True)
-    else:
-        geometry = antimeridian.fix_polygon(geometry)
+    is_lst_strip = item.properties["s3:product_name"] == "slstr-lst"
+    is_lst_strip &= sen3naming.group("instance_id").endswith("_____")
+
+    coordinates = geometry_dict["coordinates"][0]
+    if tie_point_footprint:
+        try:
+            coordinates = (
+                read_tie_point_footprint(metalinks, sen3naming.group("source"))
+                or coordinates
+            )
+        except (OSError, KeyError, RuntimeError, ValueError) as e:
+            logger.warning(
+                f"Using the manifest footprint of '{granule_href}', "
+                f"the tie-point grid could not be read: {e}"
+            )
 
-    if not geometry.is_valid:
-        geometry = geometry.buffer(0)
+    track = None
+    if track_footprint and sen3naming.group("source") == "SR":
+        try:
+            track = read_track_footprint(metalinks)
+        except (OSError, KeyError, RuntimeError, ValueError) as e:
+            logger.warning(
+                f"Using the manifest footprint of '{granule_href}', "
+                f"the track could not be read: {e}"
+            )
 
-    item.bbox = recursive_round(list(geometry.bounds), precision=4)
-    geometry_dict = shapely.geometry.mapping(geometry)
-    assert isinstance(geometry_dict, dict)
-    geometry_dict["coordinates"] = recursive_round(
-        list(geometry_dict["coordinates"]), precision=4
+    footprint = Footprint(
+        coordinates=coordinates,
+        max_delta_lon=max_delta_lon,
+        force_north_pole=is_lst_strip,
+        name=item.id,
+        geometry=track,
     )
-    item.geometry = geometry_dict
-
-    return item
+    timer.end()
+    return item, footprint
+
+
+def apply_footprint(
+    item: pystac.Item,
+    footprint: NormalizedFootprint,
+    quadkey_zoom: Optional[int] = None,
+) -> None:
+    """Sets the geometry and bbox of an item from its normalized footprint,
+    and its quadkeys if ``quadkey_zoom`` is given."""
+    item.geometry = footprint.geometry
+    item.bbox = footprint.bbox
+    if quadkey_zoom is not None:
+        add_quadkeys(item, quadkey_zoom)
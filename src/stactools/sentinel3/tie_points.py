@@ -0,0 +1,164 @@
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from .metadata_links import _NETCDF_LOCK, MetadataLinks
+
+logger = logging.getLogger(__name__)
+
+# Rows of the geolocation grid read at once, when reading its first and last
+# columns
+CHUNK_ROWS = 1024
+
+# Points kept along each edge of the grid
+EDGE_POINTS = 32
+
+
+@dataclass(frozen=True)
+class TiePointGrid:
+    """Where to find the tie-point geolocation grid of a data source.
+
+    Attributes:
+        data_object (str): ID of the grid's dataObject in the manifest.
+        latitude (str): Name of the latitude variable.
+        longitude (str): Name of the longitude variable.
+    """
+
+    data_object: str
+    latitude: str
+    longitude: str
+
+
+TIE_POINT_GRIDS = {
+    "OL": TiePointGrid("tieGeoCoordinatesData", "latitude", "longitude"),
+    "SL": TiePointGrid("SLSTR_GEODETIC_TX_Data", "latitude_tx", "longitude_tx"),
+}
+
+
+def _edge_indices(size: int, points: int) -> np.ndarray:
+    # evenly spaced indices along an edge, always including both ends
+    return np.unique(np.linspace(0, size - 1, min(size, points)).round().astype(int))
+
+
+def _read_columns(
+    variable: Any, columns: Tuple[int, int], chunk_rows: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    # reads two columns of a (rows, columns) variable, chunk_rows rows at a time
+    rows = variable.shape[0]
+    first = []
+    last = []
+    for start in range(0, rows, chunk_rows):
+        stop = min(start + chunk_rows, rows)
+        first.append(np.ma.asarray(variable[start:stop, columns[0]]))
+        last.append(np.ma.asarray(variable[start:stop, columns[1]]))
+    return np.ma.concatenate(first), np.ma.concatenate(last)
+
+
+def boundary_ring(
+    latitude: Any,
+    longitude: Any,
+    edge_points: int = EDGE_POINTS,
+    chunk_rows: int = CHUNK_ROWS,
+) -> np.ndarray:
+    """Returns the ring around a latitude/longitude grid.
+
+    Only the first and last rows and columns of the grid are read; the columns
+    are read ``chunk_rows`` rows at a time. The ring goes along the first row,
+    down the last column, back along the last row and up the first column.
+    Points with a fill value are left out.
+
+    Args:
+        latitude: A 2-dimensional array of latitudes, e.g. a netCDF4 variable.
+        longitude: The matching array of longitudes.
+        edge_points (int): Points kept along each edge of the grid.
+        chunk_rows (int): Rows read at once from the first and last columns.
+
+    Returns:
+        np.ndarray: A closed ring of (longitude, latitude) points.
+    """
+    if latitude.shape != longitude.shape or len(latitude.shape) != 2:
+        raise ValueError(
+            f"Expected two grids of the same 2-dimensional shape, got "
+            f"{latitude.shape} and {longitude.shape}"
+        )
+    rows, columns = latitude.shape
+    row_indices = _edge_indices(rows, edge_points)
+    column_indices = _edge_indices(columns, edge_points)
+
+    edges = []
+    for variable in (longitude, latitude):
+        first_row = np.ma.asarray(variable[0, :])[column_indices]
+        last_row = np.ma.asarray(variable[rows - 1, :])[column_indices]
+        first_column, last_column = _read_columns(
+            variable, (0, columns - 1), chunk_rows
+        )
+        edges.append(
+            np.ma.concatenate(
+                [
+                    first_row,
+                    last_column[row_indices][1:],
+                    last_row[::-1][1:],
+                    first_column[row_indices][::-1][1:],
+                ]
+            )
+        )
+
+    lon, lat = edges
+    valid = ~(np.ma.getmaskarray(lon) | np.ma.getmaskarray(lat))
+    ring = np.column_stack([lon.filled(np.nan), lat.filled(np.nan)])[valid]
+    ring = ring[np.isfinite(ring).all(axis=1)]
+    if len(ring):
+        # drop repeated points, e.g. along an edge one point long
+        keep = np.ones(len(ring), dtype=bool)
+        keep[1:] = np.any(np.diff(ring, axis=0) != 0, axis=1)
+        ring = ring[keep]
+    if len(ring) < 3:
+        raise ValueError("The grid has fewer than three valid boundary points")
+    if not np.array_equal(ring[0], ring[-1]):
+        ring = np.vstack([ring, ring[:1]])
+    return ring
+
+
+def read_tie_point_footprint(
+    metadata_links: MetadataLinks,
+    source: str,
+    edge_points: int = EDGE_POINTS,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Optional[List[List[float]]]:
+    """Reads the footprint of a granule from its tie-point geolocation grid.
+
+    Args:
+        metadata_links (MetadataLinks): The granule's manifest links.
+        source (str): The data source, e.g. ``OL``.
+        edge_points (int): Points kept along each edge of the grid.
+        chunk_rows (int): Rows read at once from the first and last columns.
+
+    Returns:
+        Optional[List[List[float]]]: The ring of (longitude, latitude) points,
+        or None if the data source doesn't have a tie-point grid.
+    """
+    grid = TIE_POINT_GRIDS.get(source)
+    if grid is None:
+        return None
+    location = metadata_links.read_href(
+        f".//dataObject[@ID='{grid.data_object}']//fileLocation"
+    )
+    if location.startswith("./"):
+        location = location[2:]
+    href = os.path.join(metadata_links.granule_href, location)
+    with _NETCDF_LOCK:
+        ds = metadata_links.open_dataset(href)
+        try:
+            ring = boundary_ring(
+                ds.variables[grid.latitude],
+                ds.variables[grid.longitude],
+                edge_points,
+                chunk_rows,
+            )
+        finally:
+            ds.close()
+    logger.debug("Read a footprint of %d points from %s", len(ring), href)
+    return ring.tolist()
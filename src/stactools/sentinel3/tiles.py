@@ -0,0 +1,149 @@
+import logging
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, Iterable, List, Set
+
+import fsspec  # type: ignore
+import numpy as np
+import pystac
+import shapely  # type: ignore
+from shapely.geometry.base import BaseGeometry  # type: ignore
+
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+QUADKEYS_PROPERTY = "s3:quadkeys"
+
+# Web Mercator tiles stop at this latitude
+MAX_LATITUDE = 85.0511287798066
+
+
+def tile_bounds(x: np.ndarray, y: np.ndarray, zoom: int) -> np.ndarray:
+    """Returns the longitude/latitude bounds of Web Mercator tiles.
+
+    Args:
+        x (np.ndarray): Tile columns.
+        y (np.ndarray): Tile rows, from the north.
+        zoom (int): The zoom level.
+
+    Returns:
+        np.ndarray: (min_lon, min_lat, max_lon, max_lat) of each tile.
+    """
+    n = 2**zoom
+
+    def latitude(row: np.ndarray) -> np.ndarray:
+        return np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * row / n))))
+
+    return np.column_stack(
+        [x / n * 360 - 180, latitude(y + 1), (x + 1) / n * 360 - 180, latitude(y)]
+    )
+
+
+def quadkeys_of(x: np.ndarray, y: np.ndarray, zoom: int) -> List[str]:
+    """Returns the quadkeys of tiles.
+
+    Args:
+        x (np.ndarray): Tile columns.
+        y (np.ndarray): Tile rows, from the north.
+        zoom (int): The zoom level, at least 1.
+
+    Returns:
+        List[str]: One quadkey per tile, ``zoom`` digits long.
+    """
+    if zoom < 1:
+        raise ValueError(f"Zoom must be at least 1, got {zoom}")
+    shifts = np.arange(zoom - 1, -1, -1)
+    x = np.asarray(x, dtype=np.int64)[:, None]
+    y = np.asarray(y, dtype=np.int64)[:, None]
+    digits = ((x >> shifts) & 1) + 2 * ((y >> shifts) & 1) + ord("0")
+    keys = np.ascontiguousarray(digits.astype(np.uint8)).view(f"S{zoom}").ravel()
+    return [key.decode("ascii") for key in keys]
+
+
+def covering_quadkeys(geometry: BaseGeometry, zoom: int) -> List[str]:
+    """Returns the quadkeys of the tiles a footprint covers.
+
+    Tiles are refined one zoom level at a time. Only the tiles on the edge of
+    the footprint are tested, with shapely's array predicates; the children
+    of tiles inside the footprint are kept without testing.
+
+    Args:
+        geometry (BaseGeometry): The footprint, in longitude/latitude.
+        zoom (int): The zoom level, at least 1.
+
+    Returns:
+        List[str]: The sorted quadkeys of the tiles that intersect the
+        footprint.
+    """
+    if zoom < 1:
+        raise ValueError(f"Zoom must be at least 1, got {zoom}")
+    shapely.prepare(geometry)
+    inside_x = np.empty(0, dtype=np.int64)
+    inside_y = np.empty(0, dtype=np.int64)
+    edge_x = np.zeros(1, dtype=np.int64)
+    edge_y = np.zeros(1, dtype=np.int64)
+    for level in range(1, zoom + 1):
+        # the four children of every tile
+        inside_x = np.concatenate([2 * inside_x + dx for dx in (0, 1, 0, 1)])
+        inside_y = np.concatenate([2 * inside_y + dy for dy in (0, 0, 1, 1)])
+        x = np.concatenate([2 * edge_x + dx for dx in (0, 1, 0, 1)])
+        y = np.concatenate([2 * edge_y + dy for dy in (0, 0, 1, 1)])
+
+        tiles = shapely.box(*tile_bounds(x, y, level).T)
+        intersects = shapely.intersects(geometry, tiles)
+        contained = intersects & shapely.contains_properly(geometry, tiles)
+        inside_x = np.concatenate([inside_x, x[contained]])
+        inside_y = np.concatenate([inside_y, y[contained]])
+        edge = intersects & ~contained
+        edge_x, edge_y = x[edge], y[edge]
+
+    keys = quadkeys_of(
+        np.concatenate([inside_x, edge_x]), np.concatenate([inside_y, edge_y]), zoom
+    )
+    return sorted(keys)
+
+
+def add_quadkeys(item: pystac.Item, zoom: int) -> List[str]:
+    """Adds the quadkeys covered by an item's geometry to its properties.
+
+    Args:
+        item (pystac.Item): The item.
+        zoom (int): The zoom level, at least 1.
+
+    Returns:
+        List[str]: The quadkeys.
+    """
+    assert item.geometry is not None
+    keys = covering_quadkeys(shapely.geometry.shape(item.geometry), zoom)
+    item.properties[QUADKEYS_PROPERTY] = keys
+    return keys
+
+
+class TileIndex:
+    """A sidecar index mapping quadkeys to the IDs of the items covering them."""
+
+    def __init__(self) -> None:
+        self.cells: DefaultDict[str, Set[str]] = defaultdict(set)
+
+    def add_item(self, item: pystac.Item) -> None:
+        """Adds an item with quadkeys, see :func:`add_quadkeys`."""
+        keys = item.properties.get(QUADKEYS_PROPERTY)
+        if keys is None:
+            logger.warning(f"Item '{item.id}' has no {QUADKEYS_PROPERTY}, skipping it")
+            return
+        for key in keys:
+            self.cells[key].add(item.id)
+
+    def add_items(self, items: Iterable[pystac.Item]) -> Iterable[pystac.Item]:
+        """Adds items as they are consumed, passing them on."""
+        for item in items:
+            self.add_item(item)
+            yield item
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: sorted(self.cells[key]) for key in sorted(self.cells)}
+
+    def save(self, dest_href: str) -> None:
+        """Saves the index as JSON, an object from quadkeys to sorted item IDs."""
+        with fsspec.open(dest_href, "wb") as f:
+            f.write(dumps(self.to_dict()))
@@ -0,0 +1,191 @@
+import bisect
+import json
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, DefaultDict, Dict, Iterable, Iterator, List, Optional, Union
+
+import fsspec  # type: ignore
+import pystac
+from pystac.utils import str_to_datetime
+
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+Datetime = Union[datetime, str]
+
+
+def _timestamp(value: Datetime) -> float:
+    if isinstance(value, str):
+        value = str_to_datetime(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _product_type(product_type: str) -> str:
+    # "OL_1_EFR___" and "OL_1_EFR" are the same product type
+    return product_type.rstrip("_")
+
+
+@dataclass(frozen=True, order=True)
+class TimeEntry:
+    """An item in a time index, in sort order.
+
+    Attributes:
+        start (float): Start of the item's interval, as a POSIX timestamp.
+        end (float): End of the item's interval, as a POSIX timestamp.
+        item_id (str): The item ID.
+        offset (int): Byte offset of the item in the NDJSON file of the
+            index; -1 if the items weren't saved as NDJSON.
+    """
+
+    start: float
+    end: float
+    item_id: str
+    offset: int = -1
+
+
+@dataclass
+class _Intervals:
+    # the entries of one product type, sorted by start, and the longest interval
+    entries: List[TimeEntry] = field(default_factory=list)
+    starts: List[float] = field(default_factory=list)
+    max_duration: float = 0.0
+    sorted: bool = False
+
+    def sort(self) -> None:
+        if not self.sorted:
+            self.entries.sort()
+            self.starts = [entry.start for entry in self.entries]
+            self.sorted = True
+
+
+class TimeIndex:
+    """Item intervals per product type, sorted by start, for lookups of the
+    items overlapping a time window by binary search.
+
+    Args:
+        items_href (Optional[str]): The NDJSON file with the items, relative
+            to the index file, if they were saved as NDJSON.
+    """
+
+    def __init__(self, items_href: Optional[str] = None) -> None:
+        self.items_href = items_href
+        self._intervals: DefaultDict[str, _Intervals] = defaultdict(_Intervals)
+
+    @property
+    def product_types(self) -> List[str]:
+        return sorted(self._intervals)
+
+    def add_item(self, item: pystac.Item, offset: int = -1) -> None:
+        """Adds an item, skipping it with a warning if it has no product type.
+
+        The interval is ``start_datetime`` to ``end_datetime``, or just
+        ``datetime`` if the item doesn't have them.
+
+        Args:
+            item (pystac.Item): The item.
+            offset (int): Byte offset of the item in the NDJSON file, e.g. as
+                reported by :func:`stactools.sentinel3.serialization.save_items_ndjson`.
+        """
+        product_type = item.properties.get("s3:product_type")
+        start = item.properties.get("start_datetime") or item.datetime
+        end = item.properties.get("end_datetime") or item.datetime
+        if product_type is None or start is None or end is None:
+            logger.warning(
+                f"Not adding item '{item.id}' to the time index, it has no "
+                "product type or datetime"
+            )
+            return
+        entry = TimeEntry(_timestamp(start), _timestamp(end), item.id, offset)
+        intervals = self._intervals[_product_type(product_type)]
+        intervals.entries.append(entry)
+        intervals.max_duration = max(intervals.max_duration, entry.end - entry.start)
+        intervals.sorted = False
+
+    def add_items(self, items: Iterable[pystac.Item]) -> Iterator[pystac.Item]:
+        """Adds items as they are consumed, passing them on."""
+        for item in items:
+            self.add_item(item)
+            yield item
+
+    def find(
+        self, product_type: str, start: Datetime, end: Datetime
+    ) -> List[TimeEntry]:
+        """Returns the items of a product type overlapping a time window.
+
+        Only items starting between ``start`` minus the longest interval of
+        the product type and ``end`` are looked at, found by binary search.
+
+        Args:
+            product_type (str): The product type, e.g. ``OL_1_EFR``.
+            start (Datetime): Start of the window, a datetime or an RFC 3339
+                string; naive datetimes are taken as UTC.
+            end (Datetime): End of the window, included.
+
+        Returns:
+            List[TimeEntry]: The items, sorted by start.
+        """
+        intervals = self._intervals.get(_product_type(product_type))
+        if intervals is None:
+            return []
+        intervals.sort()
+        window_start, window_end = _timestamp(start), _timestamp(end)
+        first = bisect.bisect_left(
+            intervals.starts, window_start - intervals.max_duration
+        )
+        last = bisect.bisect_right(intervals.starts, window_end, lo=first)
+        return [
+            entry
+            for entry in intervals.entries[first:last]
+            if entry.end >= window_start
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        product_types = {}
+        for product_type in self.product_types:
+            intervals = self._intervals[product_type]
+            intervals.sort()
+            product_types[product_type] = {
+                "max_duration": intervals.max_duration,
+                "rows": [
+                    [e.start, e.end, e.item_id, e.offset] for e in intervals.entries
+                ],
+            }
+        return {
+            "version": INDEX_VERSION,
+            "items": self.items_href,
+            "columns": list(TimeEntry.__dataclass_fields__),
+            "product_types": product_types,
+        }
+
+    def save(self, dest_href: str) -> None:
+        """Saves the index as compact JSON, already sorted."""
+        with fsspec.open(dest_href, "wb") as f:
+            f.write(dumps(self.to_dict()))
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "TimeIndex":
+        if d.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported time index version: {d.get('version')}")
+        index = cls(d.get("items"))
+        for product_type, data in d["product_types"].items():
+            entries = [TimeEntry(*row) for row in data["rows"]]
+            index._intervals[product_type] = _Intervals(
+                entries=entries,
+                starts=[entry.start for entry in entries],
+                max_duration=data["max_duration"],
+                sorted=True,
+            )
+        return index
+
+    @classmethod
+    def load(cls, href: str) -> "TimeIndex":
+        """Loads an index saved with :meth:`save`, without sorting it again."""
+        with fsspec.open(href, "rb") as f:
+            return cls.from_dict(json.loads(f.read()))
@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import fsspec  # type: ignore
+
+from .instrumentation import Instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+class TraceRecorder(Instrumentation):
+    """Records the stages of creating items as a Chrome trace, which can be
+    opened in Perfetto (https://ui.perfetto.dev) or chrome://tracing.
+
+    Each stage is a span on the timeline of the thread that ran it, so with
+    :func:`stactools.sentinel3.batch.create_items` there is one timeline per
+    worker. Files opened and read, and the time a granule waited for a worker
+    after being queued, are asynchronous spans, as reads run concurrently when
+    headers are prefetched. Every span carries the granule in its arguments.
+
+    With ``use_processes``, each worker process records the stages of its
+    items with a recorder of its own, started at the :attr:`origin` of this
+    one, and the events are merged into this one with :meth:`merge`; every
+    worker is then a process of the trace.
+
+    Args:
+        process_name (str): The name to show for the process.
+        origin (Optional[float]): The ``time.perf_counter()`` at which the
+            trace starts. Defaults to now.
+    """
+
+    def __init__(
+        self, process_name: str = "stac sentinel3", origin: Optional[float] = None
+    ) -> None:
+        self._lock = threading.Lock()
+        self.origin = time.perf_counter() if origin is None else origin
+        self._pid = os.getpid()
+        self._events: List[Dict[str, Any]] = [
+            self._metadata("process_name", 0, process_name)
+        ]
+        self._named: Set[Tuple[str, int, int]] = {("process_name", self._pid, 0)}
+        self._threads: Dict[int, str] = {}
+        self._started: Dict[Tuple[str, str], float] = {}
+        self._submitted: Dict[str, float] = {}
+        self._ids = 0
+
+    def _now(self) -> float:
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def _metadata(self, name: str, tid: int, value: str) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "ph": "M",
+            "pid": self._pid,
+            "tid": tid,
+            "args": {"name": value},
+        }
+
+    def _tid(self) -> int:
+        # must be called with the lock held
+        thread = threading.current_thread()
+        tid = thread.ident or 0
+        if tid not in self._threads:
+            self._threads[tid] = thread.name
+            self._named.add(("thread_name", self._pid, tid))
+            self._events.append(self._metadata("thread_name", tid, thread.name))
+        return tid
+
+    def _async_span(
+        self, name: str, category: str, start: float, end: float, args: Dict[str, Any]
+    ) -> None:
+        # must be called with the lock held
+        self._ids += 1
+        event = {
+            "name": name,
+            "cat": category,
+            "id": self._ids,
+            "pid": self._pid,
+            "tid": self._tid(),
+        }
+        self._events.append(dict(event, ph="b", ts=start, args=args))
+        self._events.append(dict(event, ph="e", ts=end))
+
+    def item_submitted(self, granule_href: str) -> None:
+        with self._lock:
+            self._submitted[granule_href] = self._now()
+
+    def item_finished(
+        self, granule_href: str, error: Optional[Exception], cached: bool
+    ) -> None:
+        with self._lock:
+            # items reused from the cache have no stages to end the queueing
+            self._submitted.pop(granule_href, None)
+
+    def stage_started(self, granule_href: str, stage: str) -> None:
+        now = self._now()
+        with self._lock:
+            submitted = self._submitted.pop(granule_href, None)
+            if submitted is not None:
+                self._async_span(
+                    "queued", "queue", submitted, now, {"granule": granule_href}
+                )
+            self._started[granule_href, stage] = now
+
+    def stage_finished(
+        self, granule_href: str, stage: str, seconds: float, nbytes: int
+    ) -> None:
+        now = self._now()
+        with self._lock:
+            start = self._started.pop((granule_href, stage), now - seconds * 1e6)
+            self._events.append(
+                {
+                    "name": stage,
+                    "cat": "stage",
+                    "ph": "X",
+                    "ts": start,
+                    "dur": seconds * 1e6,
+                    "pid": self._pid,
+                    "tid": self._tid(),
+                    "args": {"granule": granule_href, "bytes": nbytes},
+                }
+            )
+
+    def io_finished(
+        self,
+        granule_href: str,
+        stage: str,
+        href: str,
+        ranges: Sequence[Tuple[int, int]],
+        seconds: float,
+    ) -> None:
+        now = self._now()
+        with self._lock:
+            self._async_span(
+                os.path.basename(href),
+                "io",
+                now - seconds * 1e6,
+                now,
+                {
+                    "granule": granule_href,
+                    "stage": stage,
+                    "href": href,
+                    "bytes": sum(end - start for start, end in ranges),
+                    "ranges": [list(r) for r in ranges],
+                },
+            )
+
+    def merge(self, granule_href: str, events: Sequence[Dict[str, Any]]) -> None:
+        """Adds the events recorded for the item of a granule by the recorder
+        of a worker process.
+
+        The time from submitting the granule to the first event is recorded
+        as the time it was queued, and the ids of asynchronous spans are
+        renumbered, as each worker numbers them from 1.
+        """
+        with self._lock:
+            ids: Dict[Any, int] = {}
+            start = None
+            for event in events:
+                if event["ph"] == "M":
+                    key = (event["name"], event["pid"], event["tid"])
+                    if key in self._named:
+                        continue
+                    self._named.add(key)
+                else:
+                    start = event["ts"] if start is None else min(start, event["ts"])
+                if "id" in event:
+                    if event["id"] not in ids:
+                        self._ids += 1
+                        ids[event["id"]] = self._ids
+                    event = dict(event, id=ids[event["id"]])
+                self._events.append(event)
+            submitted = self._submitted.pop(granule_href, None)
+            if submitted is not None and start is not None:
+                self._async_span(
+                    "queued", "queue", submitted, start, {"granule": granule_href}
+                )
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Returns the events recorded, e.g. to :meth:`merge` them."""
+        with self._lock:
+            return list(self._events)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the trace in the Chrome trace-event format."""
+        return {"traceEvents": self.events(), "displayTimeUnit": "ms"}
+
+    def save(self, dest_href: str) -> None:
+        """Saves the trace as a JSON file."""
+        trace = self.to_dict()
+        with fsspec.open(dest_href, "w") as f:
+            json.dump(trace, f)
+        logger.info(f"Wrote {len(trace['traceEvents'])} trace events to {dest_href}")
@@ -0,0 +1,122 @@
+import logging
+import os
+from typing import Any
+
+import numpy as np
+import shapely  # type: ignore
+from shapely.geometry.base import BaseGeometry  # type: ignore
+
+from .geometry import track_footprint
+from .metadata_links import _NETCDF_LOCK, MetadataLinks
+
+logger = logging.getLogger(__name__)
+
+# The SRAL file with the 1 Hz positions, and their variables
+TRACK_DATA_OBJECT = "standardMeasurementData"
+TRACK_LATITUDE = "lat_01"
+TRACK_LONGITUDE = "lon_01"
+
+# Positions read at once
+CHUNK_POINTS = 2048
+
+# Distance around the track, and tolerance of its simplification, in degrees
+TRACK_BUFFER = 0.1
+TRACK_TOLERANCE = 0.01
+
+
+def read_track(
+    latitude: Any,
+    longitude: Any,
+    tolerance: float = TRACK_TOLERANCE,
+    chunk_points: int = CHUNK_POINTS,
+) -> np.ndarray:
+    """Reads a track from latitude and longitude vectors, in chunks.
+
+    Each chunk is simplified as it is read, so only the simplified track is
+    kept in memory. Longitudes are unwrapped across chunks, so the track is
+    continuous and may go beyond ±180. Points with a fill value are left out.
+
+    Args:
+        latitude: A 1-dimensional array of latitudes, e.g. a netCDF4 variable.
+        longitude: The matching array of longitudes.
+        tolerance (float): Tolerance of the simplification, in degrees.
+        chunk_points (int): Points read at once.
+
+    Returns:
+        np.ndarray: The simplified track, as (longitude, latitude) points.
+    """
+    if latitude.shape != longitude.shape or len(latitude.shape) != 1:
+        raise ValueError(
+            f"Expected two vectors of the same length, got "
+            f"{latitude.shape} and {longitude.shape}"
+        )
+    size = latitude.shape[0]
+    parts = []
+    last = None
+    for start in range(0, size, chunk_points):
+        stop = min(start + chunk_points, size)
+        lat = np.ma.asarray(latitude[start:stop])
+        lon = np.ma.asarray(longitude[start:stop])
+        valid = ~(np.ma.getmaskarray(lat) | np.ma.getmaskarray(lon))
+        points = np.column_stack([lon.filled(np.nan), lat.filled(np.nan)])[valid]
+        points = points[np.isfinite(points).all(axis=1)]
+        if not len(points):
+            continue
+
+        points[:, 0] = np.unwrap(points[:, 0], period=360)
+        if last is not None:
+            points[:, 0] += 360 * np.round((last[0, 0] - points[0, 0]) / 360)
+            # start from the end of the previous chunk, so the simplified
+            # chunks join up
+            points = np.vstack([last, points])
+        if len(points) > 2:
+            line = shapely.linestrings(points).simplify(tolerance)
+            points = shapely.get_coordinates(line)
+        if last is not None:
+            points = points[1:]
+        if len(points):
+            parts.append(points)
+            last = points[-1:]
+
+    if not parts:
+        return np.empty((0, 2))
+    return np.concatenate(parts)
+
+
+def read_track_footprint(
+    metadata_links: MetadataLinks,
+    buffer: float = TRACK_BUFFER,
+    tolerance: float = TRACK_TOLERANCE,
+    chunk_points: int = CHUNK_POINTS,
+) -> BaseGeometry:
+    """Reads the footprint of an SRAL granule from its 1 Hz track.
+
+    Args:
+        metadata_links (MetadataLinks): The granule's manifest links.
+        buffer (float): Distance around the track, in degrees.
+        tolerance (float): Tolerance of the simplification, in degrees.
+        chunk_points (int): Points read at once.
+
+    Returns:
+        BaseGeometry: The footprint, a Polygon or a MultiPolygon split at the
+        antimeridian.
+    """
+    location = metadata_links.read_href(
+        f".//dataObject[@ID='{TRACK_DATA_OBJECT}']//fileLocation"
+    )
+    if location.startswith("./"):
+        location = location[2:]
+    href = os.path.join(metadata_links.granule_href, location)
+    with _NETCDF_LOCK:
+        ds = metadata_links.open_dataset(href)
+        try:
+            track = read_track(
+                ds.variables[TRACK_LATITUDE],
+                ds.variables[TRACK_LONGITUDE],
+                tolerance,
+                chunk_points,
+            )
+        finally:
+            ds.close()
+    logger.debug("Read a track of %d points from %s", len(track), href)
+    return track_footprint(track, buffer, tolerance)
@@ -1,5 +1,7 @@
-from itertools import groupby
-from typing import List, Optional
+from itertools import chain, groupby
+from typing import List, Optional, Sequence
+
+import numpy as np
 
 
 def crossing_longitude(
@@ -95,3 +97,150 @@ def get_winding(coords: List[List[float]], max_delta_lon: float) -> Optional[str
         winding = ccw_or_cw(lon_crossings, max_delta_lon)
 
     return winding
+
+
+def wrap_longitudes(coords: Sequence[Sequence[float]]) -> np.ndarray:
+    """Returns the coordinates as an (n, 2) array, with all longitudes in the
+    range [-180, 180)."""
+    if isinstance(coords, np.ndarray):
+        array = coords[:, :2].astype(float)
+    else:
+        # much quicker than np.array for lists of lists
+        array = np.fromiter(chain.from_iterable(coords), dtype=float)
+        if len(array) == 2 * len(coords):
+            array = array.reshape(-1, 2)
+        else:
+            array = np.array(coords, dtype=float)[:, :2]
+    array[:, 0] = ((array[:, 0] + 180) % 360) - 180
+    return array
+
+
+def _crossing_longitudes_sequential(
+    lons1: np.ndarray,
+    lons2: np.ndarray,
+    lats1: np.ndarray,
+    lats2: np.ndarray,
+    consecutive: np.ndarray,
+    center_lat: float,
+    max_delta_lon: float,
+) -> np.ndarray:
+    # crossing_longitude moves the end point of a segment that spans the
+    # antimeridian, and the next segment may start from that point
+    longitudes = np.empty(len(lons1))
+    end_lon = 0.0
+    for i in range(len(lons1)):
+        start_lon = end_lon if i > 0 and consecutive[i - 1] else lons1[i]
+        end = [lons2[i], lats2[i]]
+        longitudes[i] = crossing_longitude(
+            [start_lon, lats1[i]], end, center_lat, max_delta_lon
+        )
+        end_lon = end[0]
+    return longitudes
+
+
+def _ccw_or_cw(
+    longitudes: np.ndarray, directions: np.ndarray, max_delta_lon: float
+) -> Optional[str]:
+    close = np.flatnonzero(np.diff(longitudes) < max_delta_lon)
+    if len(close) == 0:
+        return None
+    i = close[0]
+    if directions[i] != -directions[i + 1]:
+        raise ValueError("Crossings should be in opposite directions")
+    if directions[i] == -1:
+        return "CCW"
+    else:
+        return "CW"
+
+
+def get_winding_vectorized(
+    coords: Sequence[Sequence[float]], max_delta_lon: float
+) -> Optional[str]:
+    """Array-based equivalent of :func:`get_winding`, for long strip polygons.
+
+    Gives the same result as :func:`get_winding`, but doesn't modify
+    ``coords``.
+
+    Args:
+        coords (Sequence[Sequence[float]]): Coordinates of the polygon.
+        max_delta_lon (float): See :func:`get_winding`.
+    """
+    array = wrap_longitudes(coords)
+
+    # duplicate points will cause a divide by zero problem
+    keep = np.ones(len(array), dtype=bool)
+    keep[1:] = np.any(array[1:] != array[:-1], axis=1)
+    array = array[keep]
+
+    # get center latitude against which we will check for crossings
+    lons = array[:, 0]
+    lats = array[:, 1]
+    center_lat = (lats.max() + lats.min()) / 2
+
+    # find all longitude crossings of the center latitude
+    lats1 = lats[:-1]
+    lats2 = lats[1:]
+    down = (lats1 >= center_lat) & (lats2 < center_lat)
+    up = (lats1 <= center_lat) & (lats2 > center_lat)
+    crossing = np.flatnonzero(down | up)
+    if len(crossing) == 0:
+        raise ValueError("No crossings found")
+    if len(crossing) % 2 != 0:
+        raise ValueError("Number of crossings should always be a multiple of 2")
+    directions = np.where(down[crossing], -1, 1)
+
+    lons1 = lons[crossing]
+    lons2 = lons[crossing + 1]
+    lats1 = lats1[crossing]
+    lats2 = lats2[crossing]
+    delta_lon = np.abs(lons2 - lons1)
+    spans_antimeridian = delta_lon > max_delta_lon
+    consecutive = np.diff(crossing) == 1
+    if np.any(spans_antimeridian[:-1] & consecutive):
+        longitudes = _crossing_longitudes_sequential(
+            lons1, lons2, lats1, lats2, consecutive, center_lat, max_delta_lon
+        )
+    else:
+        delta_lon_2 = 360 - delta_lon
+        lons2 = np.where(
+            spans_antimeridian,
+            np.where(lons1 < 0, lons1 - delta_lon_2, lons1 + delta_lon_2),
+            lons2,
+        )
+        longitudes = ((center_lat - lats1) / (lats2 - lats1)) * (lons2 - lons1) + lons1
+        longitudes = ((longitudes + 180) % 360) - 180
+
+    order = np.argsort(longitudes, kind="stable")
+    longitudes = longitudes[order]
+    directions = directions[order]
+
+    # get winding
+    winding = _ccw_or_cw(longitudes, directions, max_delta_lon)
+    if winding is None:
+        # we could have an antimeridian crossing
+        longitudes = np.where(longitudes < 0, longitudes + 360, longitudes)
+        order = np.argsort(longitudes, kind="stable")
+        winding = _ccw_or_cw(longitudes[order], directions[order], max_delta_lon)
+
+    return winding
+
+
+# Below this many points, the fixed cost of the array operations outweighs
+# the per-point savings (see benchmarks/winding.py)
+VECTORIZE_MIN_POINTS = 250
+
+
+def winding_order(
+    coords: Sequence[Sequence[float]], max_delta_lon: float
+) -> Optional[str]:
+    """Determines the winding of a polygon with :func:`get_winding_vectorized`
+    for long strips and :func:`get_winding` otherwise, without modifying
+    ``coords``.
+
+    Args:
+        coords (Sequence[Sequence[float]]): Coordinates of the polygon.
+        max_delta_lon (float): See :func:`get_winding`.
+    """
+    if len(coords) >= VECTORIZE_MIN_POINTS:
+        return get_winding_vectorized(coords, max_delta_lon)
+    return get_winding([list(c) for c in coords], max_delta_lon)
@@ -1,7 +1,10 @@
 from pathlib import Path
+from typing import Iterator, Tuple
 
 import pytest
 
+from tests.http_server import RequestStats, serve_directory
+
 
 @pytest.fixture
 def ol_1_efr() -> Path:
@@ -13,3 +16,11 @@ def ol_1_efr() -> Path:
             "20211021T091357_0164_077_334_4320_LN1_O_NR_002.SEN3"
         )
     )
+
+
+@pytest.fixture
+def object_store() -> Iterator[Tuple[str, RequestStats]]:
+    """Serves the fixture granules over HTTP, yielding the base URL and the
+    request counters."""
+    with serve_directory(Path(__file__).parent / "data-files") as served:
+        yield served
@@ -0,0 +1,315 @@
+"""Differential equivalence harness for the optimized code paths.
+
+Creates the items of granules with each optimized pipeline and reports the
+structural differences from the reference items. ``properties.created`` is
+ignored. A granule that fails must fail with the same class of error.
+
+The reference items of the fixtures are golden files in
+``tests/data-files/golden``, written from the items created by
+``create_item`` at commit 9ea16b1, before any of the optimized code paths.
+Other granules are created with the slow paths that remain forced, see
+:func:`slow_paths`.
+
+Run from the repository root over the fixtures and synthetic granules:
+
+    python -m tests.equivalence
+
+or over directories of granules:
+
+    python -m tests.equivalence /data/granules --skip_nc
+
+After an intended change of the items, rewrite the golden files with:
+
+    python -m tests.equivalence --write_golden
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pystac
+
+from stactools.sentinel3 import winding
+from stactools.sentinel3.batch import create_items
+from stactools.sentinel3.item_cache import ItemCache
+from stactools.sentinel3.item_template import get_item_template
+from stactools.sentinel3.serialization import item_to_json
+from stactools.sentinel3.stac import create_item
+from tests.synthetic import DATA_FILES, make_granules
+
+# The item as JSON, or the class of the error for granules that failed
+Outcome = Any
+Pipeline = Callable[..., Dict[str, Outcome]]
+
+IGNORED = {"properties.created"}
+GOLDEN = DATA_FILES / "golden"
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+
+def as_json(item: pystac.Item) -> Dict[str, Any]:
+    """Returns the item as written by ``Item.save_object``, read back."""
+    return json.loads(json.dumps(item.to_dict()))
+
+
+def golden_path(granule_href: str, skip_nc: bool = False) -> Path:
+    suffix = ".skip_nc" if skip_nc else ""
+    return GOLDEN / f"{Path(granule_href).name}{suffix}.json"
+
+
+def load_golden(granule_href: str, skip_nc: bool = False) -> Optional[Outcome]:
+    """Returns the golden outcome of a fixture, or None if it has none."""
+    path = golden_path(granule_href, skip_nc)
+    # synthetic granules are named after the fixtures they were made from
+    if Path(granule_href).parent.resolve() != DATA_FILES.resolve():
+        return None
+    if not path.exists():
+        return None
+    outcome = json.loads(path.read_text())
+    if "error" in outcome:
+        return outcome["error"]
+    for asset in outcome["assets"].values():
+        asset["href"] = os.path.join(granule_href, asset["href"])
+    return outcome
+
+
+def save_golden(granule_href: str, outcome: Outcome, skip_nc: bool = False) -> None:
+    """Writes the golden outcome of a granule, with the HREFs of the assets
+    relative to the granule."""
+    if isinstance(outcome, str):
+        outcome = {"error": outcome}
+    else:
+        outcome = json.loads(json.dumps(outcome))
+        for asset in outcome["assets"].values():
+            asset["href"] = os.path.relpath(asset["href"], granule_href)
+    path = golden_path(granule_href, skip_nc)
+    path.write_text(json.dumps(outcome, indent=2, sort_keys=True) + "\n")
+
+
+@contextmanager
+def slow_paths() -> Iterator[None]:
+    """Forces the scalar winding order and disables the item templates
+    cache, which is also cleared before each item."""
+    min_points = winding.VECTORIZE_MIN_POINTS
+    winding.VECTORIZE_MIN_POINTS = sys.maxsize
+    try:
+        yield
+    finally:
+        winding.VECTORIZE_MIN_POINTS = min_points
+        get_item_template.cache_clear()
+
+
+def reference(hrefs: Iterable[str], **kwargs: Any) -> Dict[str, Outcome]:
+    """Returns the golden outcomes of the granules, if only ``skip_nc`` is
+    given, and creates the items of other granules one at a time with
+    ``create_item`` and its :func:`slow_paths`."""
+    outcomes: Dict[str, Outcome] = {}
+    with slow_paths():
+        for href in hrefs:
+            if set(kwargs) <= {"skip_nc"}:
+                outcomes[href] = load_golden(href, **kwargs)
+                if outcomes[href] is not None:
+                    continue
+            get_item_template.cache_clear()
+            outcomes.update(single([href], **kwargs))
+    return outcomes
+
+
+def single(hrefs: Iterable[str], **kwargs: Any) -> Dict[str, Outcome]:
+    """Creates the items one at a time with ``create_item``."""
+    outcomes: Dict[str, Outcome] = {}
+    for href in hrefs:
+        try:
+            outcomes[href] = as_json(create_item(href, **kwargs))
+        except Exception as e:
+            outcomes[href] = type(e).__name__
+    return outcomes
+
+
+def batch(hrefs: Iterable[str], **kwargs: Any) -> Dict[str, Outcome]:
+    """Creates the items with ``create_items``."""
+    return {
+        result.granule_href: (
+            as_json(result.item)
+            if result.item is not None
+            else type(result.error).__name__
+        )
+        for result in create_items(hrefs, **kwargs)
+    }
+
+
+def fast_json(hrefs: Iterable[str], **kwargs: Any) -> Dict[str, Outcome]:
+    """Creates the items one at a time and round trips them through the
+    compact JSON serializer."""
+    outcomes: Dict[str, Outcome] = {}
+    for href in hrefs:
+        try:
+            item = create_item(href, **kwargs)
+        except Exception as e:
+            outcomes[href] = type(e).__name__
+            continue
+        outcomes[href] = json.loads(item_to_json(item))
+    return outcomes
+
+
+def item_cache(hrefs: Iterable[str], **kwargs: Any) -> Dict[str, Outcome]:
+    """Creates the items with ``create_items`` and an item cache, then again,
+    reusing them from the cache."""
+    hrefs = list(hrefs)
+    cache = ItemCache()
+    batch(hrefs, item_cache=cache, **kwargs)
+    return batch(hrefs, item_cache=cache, **kwargs)
+
+
+PIPELINES: Dict[str, Pipeline] = {
+    "create_item": single,
+    "prefetch_headers": partial(single, prefetch_headers=True),
+    "threads": partial(batch, max_workers=4),
+    "batch_geometry": partial(batch, max_workers=4, batch_geometry=True),
+    "fast_json": fast_json,
+    "item_cache": item_cache,
+}
+
+
+@dataclass
+class Difference:
+    """A value of an item that differs from the reference."""
+
+    granule_href: str
+    path: str
+    expected: Any
+    actual: Any
+
+    def __str__(self) -> str:
+        def short(value: Any) -> str:
+            text = repr(value)
+            return text if len(text) <= 60 else text[:57] + "..."
+
+        return (
+            f"{Path(self.granule_href).name[:31]} {self.path or '(item)'}: "
+            f"{short(self.expected)} != {short(self.actual)}"
+        )
+
+
+def diff(expected: Any, actual: Any, path: str = "") -> Iterator[Tuple[str, Any, Any]]:
+    """Yields the path and values of every difference between two JSON-like
+    values. Ints and floats differ, as they serialize differently, but NaNs
+    are equal."""
+    if path in IGNORED:
+        return
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(expected.keys() | actual.keys(), key=str):
+            child = f"{path}.{key}" if path else str(key)
+            yield from diff(expected.get(key, MISSING), actual.get(key, MISSING), child)
+    elif isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            yield f"{path}.length", len(expected), len(actual)
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            yield from diff(e, a, f"{path}[{i}]")
+    elif type(expected) is not type(actual):
+        yield path, expected, actual
+    elif expected != actual and not (
+        isinstance(expected, float) and math.isnan(expected) and math.isnan(actual)
+    ):
+        yield path, expected, actual
+
+
+def compare(
+    hrefs: Iterable[str],
+    pipelines: Optional[Dict[str, Pipeline]] = None,
+    **kwargs: Any,
+) -> Dict[str, List[Difference]]:
+    """Runs the reference and each pipeline over the granules.
+
+    Args:
+        hrefs (Iterable[str]): The granules.
+        pipelines (Optional[Dict[str, Pipeline]]): The pipelines to check, by
+            name. Defaults to :data:`PIPELINES`.
+        **kwargs: Passed on to every pipeline, e.g. ``skip_nc``.
+
+    Returns:
+        Dict[str, List[Difference]]: The differences of each pipeline.
+    """
+    hrefs = list(hrefs)
+    expected = reference(hrefs, **kwargs)
+    report = {}
+    for name, pipeline in (pipelines or PIPELINES).items():
+        actual = pipeline(hrefs, **kwargs)
+        report[name] = [
+            Difference(href, *difference)
+            for href in hrefs
+            for difference in diff(expected[href], actual.get(href, MISSING))
+        ]
+    return report
+
+
+def format_report(report: Dict[str, List[Difference]], limit: int = 20) -> str:
+    """Returns the number of differences of each pipeline, followed by the
+    first ``limit`` of them."""
+    lines = []
+    for name, differences in report.items():
+        lines.append(f"{name}: {len(differences)} difference(s)")
+        lines.extend(f"  {difference}" for difference in differences[:limit])
+        if len(differences) > limit:
+            lines.append(f"  ... and {len(differences) - limit} more")
+    return "\n".join(lines)
+
+
+def granule_hrefs(directory: Path) -> List[str]:
+    return [str(path) for path in sorted(directory.glob("*.SEN3"))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("directories", nargs="*", type=Path)
+    parser.add_argument("--skip_nc", action="store_true")
+    parser.add_argument("--footprint_points", type=int, default=2000)
+    parser.add_argument("--data_objects", type=int, default=100)
+    parser.add_argument("--variables", type=int, default=20)
+    parser.add_argument("--write_golden", action="store_true")
+    args = parser.parse_args()
+
+    if args.write_golden:
+        hrefs = granule_hrefs(DATA_FILES)
+        for skip_nc in (False, True):
+            for href, outcome in single(hrefs, skip_nc=skip_nc).items():
+                save_golden(href, outcome, skip_nc)
+        raise SystemExit(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        directories = args.directories
+        if not directories:
+            make_granules(
+                Path(tmp_dir),
+                footprint_points=args.footprint_points,
+                data_objects=args.data_objects,
+                shape=(10, 20),
+                variables=args.variables,
+            )
+            directories = [DATA_FILES, Path(tmp_dir)]
+        failed = False
+        for directory in directories:
+            report = compare(granule_hrefs(directory), skip_nc=args.skip_nc)
+            print(f"{directory}:\n{format_report(report)}")
+            failed = failed or any(report.values())
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
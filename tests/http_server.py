@@ -0,0 +1,216 @@
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional, Tuple, Union
+
+# Bodies are written in chunks of this size, to cap the bandwidth smoothly
+WRITE_CHUNK_BYTES = 16 * 1024
+
+
+class RequestStats:
+    """Thread-safe counters of the requests served.
+
+    Attributes:
+        requests (int): Requests answered, including injected errors.
+        bytes_sent (int): Bytes of the response bodies.
+        errors (int): Injected errors.
+        paths (Counter): Requests by path.
+        ranges (List[Tuple[str, int, int]]): The path and the half-open byte
+            range of every body sent, in order.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.errors = 0
+        self.paths: Counter = Counter()
+        self.ranges: List[Tuple[str, int, int]] = []
+
+    def record(self, path: str, nbytes: int, start: int = 0) -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += nbytes
+            self.paths[path] += 1
+            if nbytes:
+                self.ranges.append((path, start, start + nbytes))
+
+    def record_error(self, path: str) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += 1
+            self.paths[path] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.errors = 0
+            self.paths.clear()
+            self.ranges.clear()
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files with support for single ``Range: bytes=`` requests."""
+
+    server: "LocalObjectStore"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool) -> None:
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.inject_error():
+            self.server.stats.record_error(self.path)
+            self.send_error(self.server.error_status)
+            return
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.server.stats.record(self.path, 0)
+            self.send_error(404)
+            return
+        size = os.path.getsize(path)
+        start, end = 0, size
+        status = 200
+        range_header = self.headers.get("Range")
+        if range_header:
+            match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+            if match is None:
+                self.send_error(400, "Unsupported range")
+                return
+            first, last = match.groups()
+            if first:
+                start = int(first)
+                end = min(int(last) + 1, size) if last else size
+            elif last:
+                start = max(size - int(last), 0)
+            if start >= size:
+                self.server.stats.record(self.path, 0)
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+        self.end_headers()
+        body = b""
+        if send_body:
+            with open(path, "rb") as f:
+                f.seek(start)
+                body = f.read(end - start)
+        # recorded before sending, so that the stats are complete once the
+        # client has the response
+        self.server.stats.record(self.path, len(body), start)
+        self._write(body)
+
+    def _write(self, body: bytes) -> None:
+        bandwidth = self.server.bandwidth
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        begin = time.perf_counter()
+        for offset in range(0, len(body), WRITE_CHUNK_BYTES):
+            chunk = body[offset : offset + WRITE_CHUNK_BYTES]
+            # a chunk is sent once it would have arrived at this bandwidth
+            delay = (offset + len(chunk)) / bandwidth - (time.perf_counter() - begin)
+            if delay > 0:
+                time.sleep(delay)
+            self.wfile.write(chunk)
+
+
+class LocalObjectStore(ThreadingHTTPServer):
+    """A local stand-in for an object store, serving a directory with
+    configurable latency, bandwidth and errors."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        directory: str,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            ("127.0.0.1", 0), partial(RangeRequestHandler, directory=directory)
+        )
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stats = RequestStats()
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def inject_error(self) -> bool:
+        """Decides whether to fail the current request."""
+        if not self.error_rate:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        assert isinstance(host, str)
+        return f"http://{host}:{port}"
+
+
+@contextmanager
+def serve_directory(
+    directory: Union[str, "os.PathLike[str]"],
+    latency: float = 0.0,
+    bandwidth: Optional[float] = None,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    seed: Optional[int] = None,
+) -> Iterator[Tuple[str, RequestStats]]:
+    """Serves ``directory`` over HTTP on a local port.
+
+    Args:
+        directory: The directory to serve.
+        latency (float): Seconds to wait before answering each request.
+        bandwidth (Optional[float]): Bytes per second each response body is
+            sent at. Defaults to None, which doesn't limit it.
+        error_rate (float): Probability of answering a request with
+            ``error_status`` instead of the file.
+        error_status (int): The HTTP status of injected errors.
+        seed (Optional[int]): Seed of the errors, to inject the same ones on
+            every run.
+
+    Yields:
+        Tuple[str, RequestStats]: The base URL and the request counters.
+    """
+    server = LocalObjectStore(
+        str(directory), latency, bandwidth, error_rate, error_status, seed
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.url, server.stats
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
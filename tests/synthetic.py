@@ -0,0 +1,251 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import netCDF4 as nc  # type: ignore
+import numpy as np
+from lxml import etree  # type: ignore
+from shapely.geometry import Polygon
+
+from stactools.sentinel3.metadata_links import MetadataLinks
+from stactools.sentinel3.product_metadata import ProductMetadata
+from stactools.sentinel3.winding import winding_order, wrap_longitudes
+
+DATA_FILES = Path(__file__).parent / "data-files"
+
+NAMESPACES = {
+    "xfdu": "urn:ccsds:schema:xfdu:1",
+    "gml": "http://www.opengis.net/gml",
+}
+NETCDF_MEDIA_TYPE = "application/x-netcdf"
+
+# Shape of the NetCDF files of a full resolution OLCI frame
+DEFAULT_SHAPE = (4091, 4865)
+
+
+def templates() -> Dict[str, Path]:
+    """Returns the fixture granule of each product type with a manifest, by
+    product type, e.g. ``OL_1_EFR``."""
+    return {
+        granule.name[4:12]: granule
+        for granule in sorted(DATA_FILES.glob("*.SEN3"))
+        if (granule / "xfdumanifest.xml").exists()
+    }
+
+
+def manifest_footprint(granule: Path) -> Polygon:
+    """Returns the footprint in the manifest of a granule, counter-clockwise,
+    before the antimeridian is fixed."""
+    metadata = ProductMetadata(str(granule), MetadataLinks(str(granule)).manifest)
+    coords = metadata.geometry["coordinates"][0]
+    if winding_order(coords, 120) == "CW":
+        coords = wrap_longitudes(coords)[::-1].tolist()
+    return Polygon(coords)
+
+
+def densify_ring(ring: np.ndarray, points: int) -> np.ndarray:
+    """Returns a closed ring of ``points`` vertices along the edges of ``ring``.
+
+    Args:
+        ring (np.ndarray): (latitude, longitude) vertices of a closed ring.
+        points (int): Vertices of the returned ring, including the closing one.
+
+    Returns:
+        np.ndarray: The (latitude, longitude) vertices, evenly spaced along
+        the ring. Longitudes are interpolated across the antimeridian.
+    """
+    latitude = ring[:, 0]
+    longitude = np.degrees(np.unwrap(np.radians(ring[:, 1])))
+    edges = np.hypot(np.diff(latitude), np.diff(longitude))
+    distance = np.concatenate([[0.0], np.cumsum(edges)])
+    samples = np.linspace(0.0, distance[-1], points)
+    longitude = np.interp(samples, distance, longitude)
+    longitude = (longitude + 180) % 360 - 180
+    dense = np.column_stack([np.interp(samples, distance, latitude), longitude])
+    dense[-1] = dense[0]
+    return dense
+
+
+def _densify_footprints(manifest: etree._Element, points: int) -> None:
+    for pos_list in manifest.iterfind(".//gml:posList", NAMESPACES):
+        values = np.array(pos_list.text.split(), dtype=float).reshape(-1, 2)
+        dense = densify_ring(values, points)
+        pos_list.text = " ".join(f"{value:.4f}" for value in dense.ravel())
+
+
+def _add_data_objects(manifest: etree._Element, count: int) -> None:
+    # Copies of the NetCDF dataObjects, with unique IDs and content units
+    section = manifest.find("dataObjectSection")
+    package_unit = manifest.find("informationPackageMap/xfdu:contentUnit", NAMESPACES)
+    netcdf_objects = [
+        data_object
+        for data_object in section.iterfind("dataObject")
+        if data_object.find("byteStream").get("mimeType") == NETCDF_MEDIA_TYPE
+    ]
+    for i in range(count):
+        data_object = etree.fromstring(
+            etree.tostring(netcdf_objects[i % len(netcdf_objects)])
+        )
+        data_object.set("ID", f"synthetic{i:05d}Data")
+        location = data_object.find("byteStream/fileLocation")
+        location.set("href", f"./synthetic{i:05d}.nc")
+        location.set("textInfo", f"Synthetic data object {i}")
+        section.append(data_object)
+
+        unit = etree.SubElement(
+            package_unit,
+            f"{{{NAMESPACES['xfdu']}}}contentUnit",
+            ID=f"synthetic{i:05d}Unit",
+            unitType="Measurement Data Unit",
+        )
+        etree.SubElement(unit, "dataObjectPointer", dataObjectID=data_object.get("ID"))
+
+
+def write_netcdf(
+    path: Path,
+    attributes: Dict[str, str],
+    shape: Tuple[int, int],
+    variables: int,
+    variable_attributes: int,
+) -> None:
+    """Writes a NetCDF-4 file with a realistic header and no data.
+
+    Args:
+        path (Path): The file to write.
+        attributes (Dict[str, str]): Global attributes.
+        shape (Tuple[int, int]): Sizes of the ``rows`` and ``columns``
+            dimensions.
+        variables (int): Compressed, chunked ``uint16`` variables to define
+            over the dimensions. Their chunks are never written, so the file
+            is mostly header.
+        variable_attributes (int): Attributes of each variable, besides the
+            usual CF ones.
+    """
+    with nc.Dataset(path, "w") as ds:
+        ds.setncatts(attributes)
+        ds.createDimension("rows", shape[0])
+        ds.createDimension("columns", shape[1])
+        chunks = (min(shape[0], 256), min(shape[1], 256))
+        for i in range(variables):
+            variable = ds.createVariable(
+                f"variable_{i:04d}",
+                "u2",
+                ("rows", "columns"),
+                zlib=True,
+                chunksizes=chunks,
+                fill_value=65535,
+            )
+            variable.setncatts(
+                {
+                    "long_name": f"Synthetic variable {i}",
+                    "units": "mW.m-2.sr-1.nm-1",
+                    "scale_factor": 0.01,
+                    "add_offset": 0.0,
+                    "valid_min": 0,
+                    "valid_max": 65534,
+                    **{
+                        f"attribute_{j:03d}": f"value {j}"
+                        for j in range(variable_attributes)
+                    },
+                }
+            )
+
+
+def _rewrite_netcdf_files(
+    granule: Path,
+    manifest: etree._Element,
+    shape: Tuple[int, int],
+    variables: int,
+    variable_attributes: int,
+) -> None:
+    for byte_stream in manifest.iterfind("dataObjectSection/dataObject/byteStream"):
+        if byte_stream.get("mimeType") != NETCDF_MEDIA_TYPE:
+            continue
+        path = granule / byte_stream.find("fileLocation").get("href")
+        if not path.exists():
+            continue
+        with nc.Dataset(path) as ds:
+            attributes = {name: ds.getncattr(name) for name in ds.ncattrs()}
+        write_netcdf(path, attributes, shape, variables, variable_attributes)
+
+        byte_stream.set("size", str(os.path.getsize(path)))
+        checksum = byte_stream.find("checksum")
+        if checksum is not None:
+            checksum.text = hashlib.md5(path.read_bytes()).hexdigest()
+
+
+def make_granule(
+    template: Path,
+    dest_dir: Path,
+    footprint_points: Optional[int] = None,
+    data_objects: int = 0,
+    shape: Tuple[int, int] = DEFAULT_SHAPE,
+    variables: int = 0,
+    variable_attributes: int = 0,
+    rewrite_netcdf: bool = True,
+) -> Path:
+    """Writes a synthetic granule, a copy of a fixture granule scaled up.
+
+    The manifest keeps the schema of the template: its footprints are
+    densified along their edges, and its NetCDF dataObjects are copied with
+    new IDs and content units. The NetCDF files are rewritten with
+    dimensions and variables, and their sizes and checksums updated in the
+    manifest.
+
+    Args:
+        template (Path): The fixture granule, see :func:`templates`.
+        dest_dir (Path): The directory to write the granule into, under the
+            name of the template.
+        footprint_points (Optional[int]): Vertices of each footprint.
+            Defaults to None, which keeps the footprints of the template.
+        data_objects (int): NetCDF dataObjects to add to the manifest. Their
+            files aren't written.
+        shape (Tuple[int, int]): Sizes of the dimensions of the NetCDF files.
+        variables (int): Variables of each NetCDF file.
+        variable_attributes (int): Extra attributes of each variable.
+        rewrite_netcdf (bool): Rewrite the NetCDF files. Defaults to True;
+            if False, they're copied from the template as they are.
+
+    Returns:
+        Path: The granule.
+    """
+    granule = Path(dest_dir) / template.name
+    shutil.copytree(template, granule)
+    manifest_path = granule / "xfdumanifest.xml"
+    tree = etree.parse(str(manifest_path))
+    manifest = tree.getroot()
+
+    if footprint_points is not None:
+        _densify_footprints(manifest, footprint_points)
+    if data_objects:
+        _add_data_objects(manifest, data_objects)
+    if rewrite_netcdf:
+        _rewrite_netcdf_files(granule, manifest, shape, variables, variable_attributes)
+
+    tree.write(str(manifest_path), xml_declaration=True, encoding="UTF-8")
+    return granule
+
+
+def make_granules(
+    dest_dir: Path, product_types: Optional[Iterable[str]] = None, **kwargs
+) -> Dict[str, Path]:
+    """Writes a synthetic granule of each product type.
+
+    Args:
+        dest_dir (Path): The directory to write the granules into.
+        product_types (Optional[Iterable[str]]): The product types, e.g.
+            ``OL_1_EFR``. Defaults to all those with a fixture granule.
+        **kwargs: Passed on to :func:`make_granule`.
+
+    Returns:
+        Dict[str, Path]: The granules, by product type.
+    """
+    available = templates()
+    if product_types is None:
+        product_types = list(available)
+    return {
+        product_type: make_granule(available[product_type], dest_dir, **kwargs)
+        for product_type in product_types
+    }
@@ -1,3 +1,4 @@
+import json
 import os
 from tempfile import TemporaryDirectory
 
@@ -664,3 +665,455 @@ class CreateItemTest(CliTestCase):
 
                 [self.assertTrue(band in band_list) for band in bands_seen]
                 os.remove(f"{tmp_dir}/{item_id}.json")
+
+    def test_create_items(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--data_type",
+                "RBT",
+                "--start",
+                "20210901",
+            ]
+            self.run_command(cmd)
+
+            jsons = sorted(p for p in os.listdir(tmp_dir) if p.endswith(".json"))
+            self.assertEqual(
+                jsons,
+                [
+                    "S3A_OL_1_EFR_20211021T073827_20211021T074112_0164_077_334_4320.json",
+                    "S3A_SL_1_RBT_20210930T220914_20210930T221214_0180_077_043_5400.json",
+                ],
+            )
+            for fname in jsons:
+                item = pystac.Item.from_file(os.path.join(tmp_dir, fname))
+                self.assertEqual(f"{item.id}.json", fname)
+
+    def test_create_items_ndjson(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--data_type",
+                "RBT",
+                "--start",
+                "20210901",
+                "--ndjson",
+                "items.ndjson",
+            ]
+            self.run_command(cmd)
+
+            self.assertEqual(os.listdir(tmp_dir), ["items.ndjson"])
+            with open(os.path.join(tmp_dir, "items.ndjson")) as f:
+                items = [pystac.Item.from_dict(json.loads(line)) for line in f]
+            self.assertEqual(
+                sorted(item.id for item in items),
+                [
+                    "S3A_OL_1_EFR_20211021T073827_20211021T074112_0164_077_334_4320",
+                    "S3A_SL_1_RBT_20210930T220914_20210930T221214_0180_077_043_5400",
+                ],
+            )
+
+    def test_create_items_tile_index(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--quadkey_zoom",
+                "6",
+                "--tile_index",
+                "tiles.json",
+            ]
+            self.run_command(cmd)
+
+            item_id = "S3A_OL_1_EFR_20211021T073827_20211021T074112_0164_077_334_4320"
+            item = pystac.Item.from_file(os.path.join(tmp_dir, f"{item_id}.json"))
+            quadkeys = item.properties["s3:quadkeys"]
+            self.assertTrue(quadkeys)
+            self.assertTrue(all(len(key) == 6 for key in quadkeys))
+            with open(os.path.join(tmp_dir, "tiles.json")) as f:
+                index = json.load(f)
+            self.assertEqual(sorted(index), quadkeys)
+            self.assertTrue(all(ids == [item_id] for ids in index.values()))
+
+    def test_query_orbits_index_in_subdirectory(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--ndjson",
+                "items.ndjson",
+                "--orbit_index",
+                os.path.join("indexes", "orbits.json"),
+                "--time_index",
+                os.path.join("indexes", "times.json"),
+            ]
+            self.run_command(cmd)
+
+            result = self.run_command(
+                [
+                    "sentinel3",
+                    "query-orbits",
+                    os.path.join(tmp_dir, "indexes", "orbits.json"),
+                    "--relative_orbit",
+                    "334",
+                    "--items",
+                    "True",
+                ]
+            )
+            item = pystac.Item.from_dict(json.loads(result.output))
+            self.assertEqual(item.properties["sat:relative_orbit"], 334)
+            result = self.run_command(
+                [
+                    "sentinel3",
+                    "query-times",
+                    os.path.join(tmp_dir, "indexes", "times.json"),
+                    "OL_1_EFR",
+                    "2021-10-21T07:00:00Z",
+                    "2021-10-21T08:00:00Z",
+                    "--items",
+                    "True",
+                ]
+            )
+            self.assertEqual(json.loads(result.output)["id"], item.id)
+
+    def test_query_orbits(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--data_type",
+                "RBT",
+                "--ndjson",
+                "items.ndjson",
+                "--orbit_index",
+                "orbits.json",
+            ]
+            self.run_command(cmd)
+
+            index = os.path.join(tmp_dir, "orbits.json")
+            result = self.run_command(
+                ["sentinel3", "query-orbits", index, "--relative_orbit", "43"]
+            )
+            self.assertEqual(
+                result.output.splitlines(),
+                ["S3A_SL_1_RBT_20210930T220914_20210930T221214_0180_077_043_5400"],
+            )
+            result = self.run_command(
+                [
+                    "sentinel3",
+                    "query-orbits",
+                    index,
+                    "--relative_orbit",
+                    "334",
+                    "--cycle",
+                    "76",
+                ]
+            )
+            self.assertEqual(result.output, "")
+            result = self.run_command(
+                [
+                    "sentinel3",
+                    "query-orbits",
+                    index,
+                    "--absolute_orbit",
+                    "29567",
+                    "--items",
+                    "True",
+                ]
+            )
+            item = pystac.Item.from_dict(json.loads(result.output))
+            self.assertEqual(item.properties["sat:relative_orbit"], 334)
+
+    def test_query_times(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--data_type",
+                "RBT",
+                "--ndjson",
+                "items.ndjson",
+                "--time_index",
+                "times.json",
+            ]
+            self.run_command(cmd)
+
+            index = os.path.join(tmp_dir, "times.json")
+            query = ["sentinel3", "query-times", index, "OL_1_EFR"]
+            result = self.run_command(
+                query + ["2021-10-21T07:40:00Z", "2021-10-21T08:00:00Z"]
+            )
+            self.assertEqual(
+                result.output.splitlines(),
+                ["S3A_OL_1_EFR_20211021T073827_20211021T074112_0164_077_334_4320"],
+            )
+            result = self.run_command(
+                query + ["2021-10-21T07:42:00Z", "2021-10-21T08:00:00Z"]
+            )
+            self.assertEqual(result.output, "")
+            result = self.run_command(
+                query
+                + ["2021-10-21T07:00:00Z", "2021-10-21T08:00:00Z", "--items", "True"]
+            )
+            item = pystac.Item.from_dict(json.loads(result.output))
+            self.assertEqual(item.properties["s3:product_type"], "OL_1_EFR___")
+
+    def test_create_items_stage_timings(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--skip_nc",
+                "True",
+                "--stage_timings",
+                "True",
+            ]
+            result = self.run_command(cmd)
+
+            lines = result.output.splitlines()
+            self.assertEqual(lines[0].split()[:2], ["stage", "count"])
+            self.assertEqual(lines[1].split()[:2], ["read_manifest", "1"])
+
+    def test_create_item_io_report(self):
+        granule_href = test_data.get_path(
+            "data-files/"
+            "S3A_OL_1_EFR____"
+            "20211021T073827_20211021T074112_20211021T091357_"
+            "0164_077_334_4320_LN1_O_NR_002.SEN3"
+        )
+
+        with TemporaryDirectory() as tmp_dir:
+            cmd = [
+                "sentinel3",
+                "create-item",
+                granule_href,
+                tmp_dir,
+                "--prefetch_headers",
+                "True",
+                "--io_report",
+                "True",
+            ]
+            result = self.run_command(cmd)
+
+            lines = result.output.splitlines()
+            self.assertEqual(lines[0].split()[:3], ["file", "opens", "bytes"])
+            self.assertEqual(lines[1].split()[0], os.path.basename(granule_href))
+            self.assertEqual(lines[2].split()[:2], ["xfdumanifest.xml", "1"])
+            self.assertEqual(
+                len([p for p in os.listdir(tmp_dir) if p.endswith(".json")]), 1
+            )
+
+    def test_create_item_memory_profile(self):
+        granule_href = test_data.get_path(
+            "data-files/"
+            "S3A_OL_1_EFR____"
+            "20211021T073827_20211021T074112_20211021T091357_"
+            "0164_077_334_4320_LN1_O_NR_002.SEN3"
+        )
+
+        with TemporaryDirectory() as tmp_dir:
+            profile_path = os.path.join(tmp_dir, "profile.json")
+            cmd = [
+                "sentinel3",
+                "create-item",
+                granule_href,
+                tmp_dir,
+                "--memory_profile",
+                profile_path,
+            ]
+            result = self.run_command(cmd)
+
+            with open(profile_path) as f:
+                profile = json.load(f)
+            self.assertEqual(list(profile["product_types"]), ["OL_1_EFR"])
+            self.assertEqual(profile["product_types"]["OL_1_EFR"]["items"], 1)
+            self.assertEqual(
+                result.output.splitlines()[1].split()[:3], ["OL_1_EFR", "(item)", "1"]
+            )
+
+    def test_create_items_memory_profile_workers(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--memory_profile",
+                os.path.join(tmp_dir, "profile.json"),
+            ]
+            result = self.run_command(cmd)
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn("--workers 1", result.output)
+
+    def test_create_items_trace(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            trace_path = os.path.join(tmp_dir, "trace.json")
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--skip_nc",
+                "True",
+                "--trace",
+                trace_path,
+            ]
+            self.run_command(cmd)
+
+            with open(trace_path) as f:
+                trace = json.load(f)
+            stages = {e["name"] for e in trace["traceEvents"] if e["ph"] == "X"}
+            self.assertIn("read_manifest", stages)
+            self.assertIn("serialize", stages)
+
+    def test_create_items_metrics_textfile(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            textfile = os.path.join(tmp_dir, "sentinel3.prom")
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--skip_nc",
+                "True",
+                "--metrics_textfile",
+                textfile,
+            ]
+            self.run_command(cmd)
+
+            with open(textfile) as f:
+                lines = f.read().splitlines()
+            self.assertIn(
+                'stac_sentinel3_items_created_total{product_type="OL_1_EFR"} 1', lines
+            )
+            self.assertIn("stac_sentinel3_items_in_flight 0", lines)
+
+    def test_create_items_item_cache(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            cache_path = os.path.join(tmp_dir, "cache.ndjson")
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--skip_nc",
+                "True",
+                "--item_cache",
+                cache_path,
+            ]
+            self.run_command(cmd)
+            jsons = [p for p in os.listdir(tmp_dir) if p.endswith(".json")]
+            self.assertEqual(len(jsons), 1)
+            os.remove(os.path.join(tmp_dir, jsons[0]))
+
+            # the item is reused, and not written again
+            self.run_command(cmd + ["--skip_cached", "True"])
+            jsons = [p for p in os.listdir(tmp_dir) if p.endswith(".json")]
+            self.assertEqual(jsons, [])
+            self.run_command(cmd)
+            jsons = [p for p in os.listdir(tmp_dir) if p.endswith(".json")]
+            self.assertEqual(len(jsons), 1)
+
+    def test_create_items_skip_cached_ndjson(self):
+        src = test_data.get_path("data-files")
+
+        with TemporaryDirectory() as tmp_dir:
+            cmd = [
+                "sentinel3",
+                "create-items",
+                src,
+                tmp_dir,
+                "--data_type",
+                "EFR",
+                "--data_type",
+                "RBT",
+                "--skip_nc",
+                "True",
+                "--ndjson",
+                "items.ndjson",
+                "--orbit_index",
+                "orbits.json",
+                "--item_cache",
+                os.path.join(tmp_dir, "cache.ndjson"),
+            ]
+            self.run_command(cmd)
+
+            # the NDJSON file and the index still have the items reused
+            self.run_command(cmd + ["--skip_cached", "True"])
+            with open(os.path.join(tmp_dir, "items.ndjson")) as f:
+                ids = [json.loads(line)["id"] for line in f]
+            self.assertEqual(len(ids), 2)
+            self.assertIn(
+                "S3A_SL_1_RBT_20210930T220914_20210930T221214_0180_077_043_5400", ids
+            )
+            result = self.run_command(
+                [
+                    "sentinel3",
+                    "query-orbits",
+                    os.path.join(tmp_dir, "orbits.json"),
+                    "--relative_orbit",
+                    "43",
+                ]
+            )
+            self.assertEqual(
+                result.output.splitlines(),
+                ["S3A_SL_1_RBT_20210930T220914_20210930T221214_0180_077_043_5400"],
+            )
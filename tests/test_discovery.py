@@ -0,0 +1,93 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from stactools.sentinel3.batch import create_items
+from stactools.sentinel3.discovery import GranuleFilter, find_granules
+
+DATA_FILES = Path(__file__).parent / "data-files"
+
+GRANULES = [
+    "S3A_OL_1_EFR____20211021T073827_20211021T074112_20211021T091357_"
+    "0164_077_334_4320_LN1_O_NR_002.SEN3",
+    "S3B_OL_1_ERR____20210831T200148_20210831T204600_20210902T011514_"
+    "2652_056_242______LN1_O_NT_002.SEN3",
+    "S3A_SL_2_LST____20210510T002955_20210510T003255_20210511T101010_"
+    "0179_071_301_5760_LN2_O_NT_004.SEN3",
+]
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> Path:
+    for i, granule in enumerate(GRANULES):
+        path = tmp_path / f"year={2021 + i}" / "nested" / granule
+        (path / "not-a-granule.SEN3").mkdir(parents=True)
+    (tmp_path / "S3A_too_short.SEN3").mkdir()
+    (tmp_path / ".hidden" / GRANULES[0]).mkdir(parents=True)
+    (tmp_path / "file.SEN3").touch()
+    return tmp_path
+
+
+def names(paths: List[str]) -> List[str]:
+    return sorted(Path(p).name for p in paths)
+
+
+def test_find_granules(archive: Path) -> None:
+    assert names(list(find_granules(str(archive), max_workers=2))) == sorted(GRANULES)
+
+
+@pytest.mark.parametrize(
+    "granule_filter,expected",
+    [
+        (GranuleFilter(missions=["S3B"]), [GRANULES[1]]),
+        (GranuleFilter(data_sources=["OL"]), GRANULES[:2]),
+        (GranuleFilter(processing_levels=[2]), [GRANULES[2]]),
+        (GranuleFilter(data_types=["EFR", "LST"]), [GRANULES[0], GRANULES[2]]),
+        (GranuleFilter(start="20210601", end="20210901"), [GRANULES[1]]),
+        (GranuleFilter(end="20210510T002955"), [GRANULES[2]]),
+    ],
+)
+def test_find_granules_filtered(
+    archive: Path, granule_filter: GranuleFilter, expected: List[str]
+) -> None:
+    assert names(list(find_granules(str(archive), granule_filter))) == sorted(expected)
+
+
+def test_find_granules_root_is_granule(ol_1_efr: Path) -> None:
+    assert list(find_granules(str(ol_1_efr))) == [str(ol_1_efr)]
+
+
+def test_create_items(ol_1_efr: Path) -> None:
+    hrefs = [str(ol_1_efr), str(ol_1_efr.parent / "missing.SEN3"), str(ol_1_efr)]
+    results = list(create_items(iter(hrefs), skip_nc=True, max_workers=2))
+    assert [r.granule_href for r in results] == hrefs
+    assert [r.ok for r in results] == [True, False, True]
+    assert results[0].item is not None
+    assert results[0].item.id == (
+        "S3A_OL_1_EFR_20211021T073827_20211021T074112_0164_077_334_4320"
+    )
+    assert results[1].item is None
+
+
+def test_create_items_batch_geometry() -> None:
+    hrefs = [str(p) for p in sorted(DATA_FILES.glob("*.SEN3"))]
+    hrefs.insert(1, str(DATA_FILES / "missing.SEN3"))
+    expected = list(create_items(hrefs, skip_nc=True, max_workers=3, quadkey_zoom=4))
+    results = list(
+        create_items(
+            hrefs, skip_nc=True, max_workers=3, quadkey_zoom=4, batch_geometry=True
+        )
+    )
+    assert [r.granule_href for r in results] == hrefs
+    assert [r.ok for r in results] == [r.ok for r in expected]
+    assert any(r.ok for r in results)
+    for result, reference in zip(results, expected):
+        if result.item is None:
+            continue
+        assert reference.item is not None
+        assert result.item.geometry == reference.item.geometry
+        assert result.item.bbox == reference.item.bbox
+        assert result.item.properties["s3:quadkeys"] == (
+            reference.item.properties["s3:quadkeys"]
+        )
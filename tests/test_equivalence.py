@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from stactools.sentinel3 import winding
+from tests.equivalence import (
+    MISSING,
+    compare,
+    diff,
+    format_report,
+    golden_path,
+    granule_hrefs,
+    load_golden,
+    reference,
+    slow_paths,
+)
+from tests.synthetic import DATA_FILES, make_granules
+
+
+def test_diff() -> None:
+    expected = {
+        "properties": {"created": "2021", "a": 1, "b": [1.0, 2.0]},
+        "assets": {"x": {}},
+    }
+    actual = {
+        "properties": {"created": "2022", "a": 1.0, "b": [1.0, 2.5, 3.0]},
+        "assets": {},
+    }
+    assert list(diff(expected, actual)) == [
+        ("assets.x", {}, MISSING),
+        ("properties.a", 1, 1.0),
+        ("properties.b.length", 2, 3),
+        ("properties.b[1]", 2.0, 2.5),
+    ]
+    assert list(diff({"a": [float("nan")]}, {"a": [float("nan")]})) == []
+
+
+def test_differences_are_reported(ol_1_efr: Path) -> None:
+    def without_an_asset(hrefs: Any, **kwargs: Any) -> Dict[str, Any]:
+        outcomes = reference(hrefs, **kwargs)
+        for outcome in outcomes.values():
+            outcome["assets"].pop("safe-manifest")
+        return outcomes
+
+    report = compare([str(ol_1_efr)], {"broken": without_an_asset}, skip_nc=True)
+    (difference,) = report["broken"]
+    assert difference.path == "assets.safe-manifest"
+    assert format_report(report).splitlines()[0] == "broken: 1 difference(s)"
+
+
+def test_reference_is_golden(ol_1_efr: Path) -> None:
+    for href in granule_hrefs(DATA_FILES):
+        assert golden_path(href).exists() and golden_path(href, True).exists()
+    outcome = reference([str(ol_1_efr)])[str(ol_1_efr)]
+    assert outcome == load_golden(str(ol_1_efr))
+    assert outcome["assets"]["safe-manifest"]["href"] == str(
+        ol_1_efr / "xfdumanifest.xml"
+    )
+    # other options have no golden items, so the item is created
+    created = reference([str(ol_1_efr)], prefetch_headers=True)[str(ol_1_efr)]
+    assert created["properties"]["created"] != outcome["properties"]["created"]
+
+
+def test_slow_paths() -> None:
+    min_points = winding.VECTORIZE_MIN_POINTS
+    with slow_paths():
+        assert winding.VECTORIZE_MIN_POINTS == sys.maxsize
+    assert winding.VECTORIZE_MIN_POINTS == min_points
+
+
+@pytest.mark.parametrize("skip_nc", [False, True])
+def test_fixtures_are_equivalent(skip_nc: bool) -> None:
+    report = compare(granule_hrefs(DATA_FILES), skip_nc=skip_nc)
+    assert not any(report.values()), format_report(report)
+
+
+def test_synthetic_granules_are_equivalent(tmp_path: Path) -> None:
+    make_granules(
+        tmp_path,
+        ["OL_1_EFR", "SL_1_RBT", "SR_2_WAT", "SY_2_VGP"],
+        footprint_points=2000,
+        data_objects=100,
+        shape=(10, 20),
+        variables=20,
+    )
+    report = compare(granule_hrefs(tmp_path))
+    assert not any(report.values()), format_report(report)
@@ -0,0 +1,150 @@
+import random
+from pathlib import Path
+
+import antimeridian
+import numpy as np
+import pytest
+import shapely
+import shapely.geometry
+from shapely.geometry import Polygon, box
+
+from stactools.sentinel3 import geometry, stac
+from stactools.sentinel3.metadata_links import MetadataLinks
+from stactools.sentinel3.product_metadata import ProductMetadata
+from tests.synthetic import manifest_footprint
+
+DATA_FILES = Path(__file__).parent / "data-files"
+
+
+@pytest.mark.parametrize(
+    "granule",
+    [p for p in sorted(DATA_FILES.glob("*.SEN3")) if (p / "xfdumanifest.xml").exists()],
+    ids=lambda p: p.name[4:12],
+)
+@pytest.mark.parametrize("force_north_pole", [False, True])
+def test_fix_footprint_matches_antimeridian(
+    granule: Path, force_north_pole: bool
+) -> None:
+    polygon = manifest_footprint(granule)
+    expected = antimeridian.fix_polygon(polygon, force_north_pole=force_north_pole)
+    actual, _ = geometry.fix_footprint(polygon, force_north_pole=force_north_pole)
+    assert shapely.equals_exact(actual, expected, tolerance=0)
+
+
+def test_fix_footprint_paths() -> None:
+    geometry.reset_geometry_path_counts()
+    rng = random.Random(0)
+    for _ in range(200):
+        lon = rng.uniform(-200, 200)
+        lat = rng.uniform(-85, 85)
+        polygon = box(lon, lat, lon + rng.uniform(0.1, 10), lat + rng.uniform(0.1, 5))
+        force_north_pole = rng.random() < 0.5
+        expected = antimeridian.fix_polygon(polygon, force_north_pole=force_north_pole)
+        actual, _ = geometry.fix_footprint(polygon, force_north_pole=force_north_pole)
+        assert shapely.equals_exact(actual, expected, tolerance=0)
+
+    counts = geometry.geometry_path_counts()
+    assert sum(counts.values()) == 200
+    assert counts[geometry.FAST_PATH] > 100
+    assert counts[geometry.ANTIMERIDIAN_PATH] > 0
+    assert counts[geometry.POLAR_PATH] > 0
+
+
+def test_fix_footprint_near_antimeridian() -> None:
+    polygon = Polygon([(179.5, 0), (-179.5, 0), (-179.5, 1), (179.5, 1), (179.5, 0)])
+    fixed, path = geometry.fix_footprint(polygon)
+    assert path == geometry.ANTIMERIDIAN_PATH
+    assert fixed.geom_type == "MultiPolygon"
+
+
+def test_round_array_matches_round() -> None:
+    rng = np.random.default_rng(0)
+    values = np.concatenate(
+        [
+            rng.uniform(-180, 180, 100_000),
+            # values on and next to rounding boundaries
+            np.arange(-1800000, 1800000, 7) / 1e4 + 0.00005,
+            np.nextafter(np.arange(-18000, 18000) / 1e2 + 0.00005, 0),
+            [0.03125, -0.03125, -0.00001, 1e300, -1e300],
+        ]
+    )
+    expected = [round(v, 4) for v in values.tolist()]
+    assert geometry.round_array(values, 4).tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "granule",
+    [p for p in sorted(DATA_FILES.glob("*.SEN3")) if (p / "xfdumanifest.xml").exists()],
+    ids=lambda p: p.name[4:12],
+)
+def test_rounded_mapping_matches_recursive_round(granule: Path) -> None:
+    fixed, _ = geometry.fix_footprint(manifest_footprint(granule))
+    expected = shapely.geometry.mapping(fixed)
+    expected["coordinates"] = geometry.recursive_round(list(expected["coordinates"]), 4)
+    assert geometry.rounded_mapping(fixed, 4) == expected
+    assert geometry.rounded_bounds(fixed, 4) == geometry.recursive_round(
+        list(fixed.bounds), 4
+    )
+
+
+@pytest.mark.parametrize(
+    "granule",
+    [p for p in sorted(DATA_FILES.glob("*.SEN3")) if (p / "xfdumanifest.xml").exists()],
+    ids=lambda p: p.name[4:12],
+)
+@pytest.mark.parametrize("tolerance,units", [(0.05, "degrees"), (1000, "meters")])
+def test_simplify_footprint_covers_original(
+    granule: Path, tolerance: float, units: str
+) -> None:
+    fixed, _ = geometry.fix_footprint(manifest_footprint(granule))
+    if not fixed.is_valid:
+        fixed = fixed.buffer(0)
+    result = geometry.simplify_footprint(fixed, tolerance, units)
+    assert result.vertices_before == shapely.get_num_coordinates(fixed)
+    assert result.vertices_after == shapely.get_num_coordinates(result.geometry)
+    assert result.vertices_after <= result.vertices_before
+    if not result.simplified:
+        assert result.geometry is fixed
+        return
+    # also after rounding for the item
+    rounded = shapely.geometry.shape(geometry.rounded_mapping(result.geometry, 4))
+    assert rounded.covers(fixed)
+    assert rounded.bounds[0] >= -180 and rounded.bounds[2] <= 180
+
+
+def test_simplify_footprint_unknown_units() -> None:
+    with pytest.raises(ValueError):
+        geometry.simplify_footprint(box(0, 0, 1, 1), 1, "furlongs")
+
+
+def test_create_item_simplified(tmp_path: Path) -> None:
+    granule = next(DATA_FILES.glob("S3A_SY_2_VGP_*.SEN3"))
+    item = stac.create_item(str(granule), skip_nc=True)
+    simplified = stac.create_item(str(granule), skip_nc=True, simplify_tolerance=0.05)
+    original = shapely.geometry.shape(item.geometry)
+    footprint = shapely.geometry.shape(simplified.geometry)
+    assert shapely.get_num_coordinates(footprint) < shapely.get_num_coordinates(
+        original
+    )
+    assert footprint.covers(original)
+
+
+def test_normalize_footprints_matches_one_at_a_time() -> None:
+    granules = [
+        p
+        for p in sorted(DATA_FILES.glob("*.SEN3"))
+        if (p / "xfdumanifest.xml").exists()
+    ]
+    footprints = []
+    for granule in granules:
+        metadata = ProductMetadata(str(granule), MetadataLinks(str(granule)).manifest)
+        coords = metadata.geometry["coordinates"][0]
+        footprints.append(geometry.Footprint(coords, name=granule.name))
+        footprints.append(geometry.Footprint(coords, force_north_pole=True))
+    together = geometry.normalize_footprints(footprints)
+    assert len(together) == len(footprints)
+    for footprint, normalized in zip(footprints, together):
+        (alone,) = geometry.normalize_footprints([footprint])
+        assert normalized.geometry == alone.geometry
+        assert normalized.bbox == alone.bbox
+        assert normalized.path == alone.path
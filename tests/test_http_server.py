@@ -0,0 +1,86 @@
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from stactools.sentinel3 import stac
+from tests.http_server import RequestStats, serve_directory
+
+
+def get(url: str, byte_range: str = "") -> bytes:
+    request = urllib.request.Request(url)
+    if byte_range:
+        request.add_header("Range", f"bytes={byte_range}")
+    with urllib.request.urlopen(request) as response:
+        return response.read()
+
+
+@pytest.fixture
+def data_file(tmp_path: Path) -> Path:
+    path = tmp_path / "data.bin"
+    path.write_bytes(bytes(range(256)) * 400)
+    return path
+
+
+def test_ranges_are_recorded(data_file: Path) -> None:
+    with serve_directory(data_file.parent) as (url, stats):
+        assert get(f"{url}/data.bin", "10-19") == data_file.read_bytes()[10:20]
+        assert len(get(f"{url}/data.bin")) == 102400
+    assert stats.requests == 2
+    assert stats.bytes_sent == 102410
+    assert stats.ranges == [("/data.bin", 10, 20), ("/data.bin", 0, 102400)]
+
+
+def test_latency(data_file: Path) -> None:
+    with serve_directory(data_file.parent, latency=0.05) as (url, _):
+        start = time.perf_counter()
+        get(f"{url}/data.bin", "0-9")
+        assert time.perf_counter() - start >= 0.05
+
+
+def test_bandwidth(data_file: Path) -> None:
+    with serve_directory(data_file.parent, bandwidth=1_000_000) as (url, _):
+        start = time.perf_counter()
+        get(f"{url}/data.bin")
+        assert time.perf_counter() - start >= 0.1
+
+
+def served_errors(directory: Path, seed: int) -> Tuple[List[bool], RequestStats]:
+    failed = []
+    with serve_directory(directory, error_rate=0.5, seed=seed) as (url, stats):
+        for _ in range(20):
+            try:
+                get(f"{url}/data.bin", "0-9")
+                failed.append(False)
+            except urllib.error.HTTPError as e:
+                assert e.code == 503
+                failed.append(True)
+    return failed, stats
+
+
+def test_error_injection(data_file: Path) -> None:
+    failed, stats = served_errors(data_file.parent, seed=1)
+    assert 0 < sum(failed) < 20
+    assert stats.errors == sum(failed)
+    assert stats.requests == 20
+    assert served_errors(data_file.parent, seed=1)[0] == failed
+
+
+def test_create_item_from_object_store(
+    ol_1_efr: Path, object_store: Tuple[str, RequestStats]
+) -> None:
+    url, stats = object_store
+    item = stac.create_item(f"{url}/{ol_1_efr.name}", skip_nc=True)
+    assert item.id.startswith("S3A_OL_1_EFR")
+    assert stats.paths[f"/{ol_1_efr.name}/xfdumanifest.xml"] >= 1
+    assert stats.errors == 0
+
+
+def test_create_item_with_errors(ol_1_efr: Path) -> None:
+    with serve_directory(ol_1_efr.parent, error_rate=1.0) as (url, stats):
+        with pytest.raises(Exception):
+            stac.create_item(f"{url}/{ol_1_efr.name}", skip_nc=True)
+    assert stats.errors == stats.requests > 0
@@ -0,0 +1,162 @@
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from stactools.sentinel3 import instrumentation
+from stactools.sentinel3.batch import create_items
+from stactools.sentinel3.instrumentation import (
+    Instrumentation,
+    IOReport,
+    MultiInstrumentation,
+    StageStats,
+    StageTimer,
+)
+from stactools.sentinel3.stac import create_item
+
+DATA_FILES = Path(__file__).parent / "data-files"
+
+
+class Recorder(Instrumentation):
+    def __init__(self) -> None:
+        self.events: List[Tuple] = []
+
+    def stage_started(self, granule_href: str, stage: str) -> None:
+        self.events.append(("start", granule_href, stage))
+
+    def stage_finished(
+        self, granule_href: str, stage: str, seconds: float, nbytes: int
+    ) -> None:
+        assert seconds >= 0
+        self.events.append(("stop", granule_href, stage, nbytes))
+
+
+def test_create_item_stages(ol_1_efr: Path) -> None:
+    recorder = Recorder()
+    create_item(str(ol_1_efr), prefetch_headers=True, instrumentation=recorder)
+
+    stages = [event[2] for event in recorder.events if event[0] == "start"]
+    assert stages == [
+        instrumentation.READ_MANIFEST,
+        instrumentation.PARSE_MANIFEST,
+        instrumentation.PREFETCH_HEADERS,
+        instrumentation.PRODUCT_METADATA,
+        instrumentation.MANIFEST_ASSET,
+        instrumentation.BAND_ASSETS,
+        instrumentation.FILE_PROPERTIES,
+        instrumentation.FOOTPRINT,
+        instrumentation.NORMALIZE_FOOTPRINT,
+    ]
+    # every stage is stopped before the next starts
+    for start, stop in zip(recorder.events[::2], recorder.events[1::2]):
+        assert start[0] == "start" and stop[0] == "stop"
+        assert start[1:3] == stop[1:3] == (str(ol_1_efr), start[2])
+    nbytes = {event[2]: event[3] for event in recorder.events if event[0] == "stop"}
+    manifest = ol_1_efr / "xfdumanifest.xml"
+    assert nbytes[instrumentation.READ_MANIFEST] == manifest.stat().st_size
+    assert nbytes[instrumentation.PREFETCH_HEADERS] > 0
+
+
+def test_stage_timer_without_instrumentation() -> None:
+    timer = StageTimer(None, "granule")
+    timer.begin("stage")
+    timer.add_bytes(10)
+    timer.end()
+
+
+def test_stage_stats() -> None:
+    stats = StageStats()
+    for i in range(1, 101):
+        stats.stage_started("granule", "read")
+        stats.stage_finished("granule", "read", i / 1000, 10)
+    stats.stage_finished("granule", "parse", 0.5, 0)
+
+    summary = stats.summary()
+    assert list(summary) == ["read", "parse"]
+    assert summary["read"].count == 100
+    assert summary["read"].total == pytest.approx(5.05)
+    assert summary["read"].p50 == pytest.approx(0.0505)
+    assert summary["read"].p99 == pytest.approx(0.09901)
+    assert summary["read"].max == pytest.approx(0.1)
+    assert summary["read"].bytes == 1000
+    lines = stats.format().splitlines()
+    assert len(lines) == 3
+    assert lines[1].split()[:2] == ["read", "100"]
+
+
+@pytest.mark.parametrize("batch_geometry", [False, True])
+def test_create_items_stage_stats(batch_geometry: bool) -> None:
+    hrefs = [str(p) for p in sorted(DATA_FILES.glob("*.SEN3"))]
+    stats = StageStats()
+    results = list(
+        create_items(
+            hrefs,
+            skip_nc=True,
+            max_workers=3,
+            instrumentation=stats,
+            batch_geometry=batch_geometry,
+        )
+    )
+    summary = stats.summary()
+    assert summary[instrumentation.READ_MANIFEST].count >= len(results) - 1
+    assert summary[instrumentation.NORMALIZE_FOOTPRINT].count == sum(
+        result.ok for result in results
+    )
+
+
+def test_create_items_instrumentation_with_processes(ol_1_efr: Path) -> None:
+    with pytest.raises(ValueError):
+        next(
+            create_items(
+                [str(ol_1_efr)], instrumentation=StageStats(), use_processes=True
+            )
+        )
+
+
+def test_io_report_direct(ol_1_efr: Path) -> None:
+    report = IOReport()
+    create_item(str(ol_1_efr), instrumentation=report)
+
+    files = report.files(str(ol_1_efr))
+    manifest = files.pop(str(ol_1_efr / "xfdumanifest.xml"))
+    assert manifest.opens == manifest.ranges == 1
+    assert manifest.bytes_read == (ol_1_efr / "xfdumanifest.xml").stat().st_size
+    assert files
+    for href, stats in files.items():
+        assert href.endswith(".nc")
+        assert stats.opens == stats.direct_opens == 1
+        assert stats.bytes_read == stats.ranges == 0
+
+    total = report.total()
+    assert total.opens == len(files) + 1
+    assert total.bytes_read == manifest.bytes_read
+    assert report.to_dict()[str(ol_1_efr)]["total"]["direct_opens"] == len(files)
+
+
+def test_io_report_prefetch(ol_1_efr: Path) -> None:
+    report = IOReport()
+    stats = StageStats()
+    create_item(
+        str(ol_1_efr),
+        prefetch_headers=True,
+        instrumentation=MultiInstrumentation([report, stats]),
+    )
+
+    total = report.total(str(ol_1_efr))
+    assert total.direct_opens == 0
+    assert total.bytes_read == sum(s.bytes for s in stats.summary().values())
+    lines = report.format().splitlines()
+    assert lines[1].startswith(ol_1_efr.name)
+    assert len(lines) == 2 + len(report.files(str(ol_1_efr)))
+
+
+def test_io_report_distinct_ranges() -> None:
+    report = IOReport()
+    timer = StageTimer(report, "granule")
+    timer.begin("stage")
+    timer.record_io("file", 0.5, [(0, 10), (20, 30)])
+    timer.record_io("file", 0.5, [(0, 10)])
+
+    stats = report.files("granule")["file"]
+    assert (stats.opens, stats.bytes_read, stats.ranges) == (3, 30, 2)
+    assert stats.seconds == pytest.approx(1.0)
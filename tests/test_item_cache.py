@@ -0,0 +1,100 @@
+import shutil
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from stactools.sentinel3.batch import BatchResult, create_items
+from stactools.sentinel3.instrumentation import StageStats
+from stactools.sentinel3.item_cache import ItemCache, item_options
+from stactools.sentinel3.stac import create_item
+
+DATA_FILES = Path(__file__).parent / "data-files"
+
+
+@pytest.fixture
+def granule(ol_1_efr: Path, tmp_path: Path) -> Path:
+    return Path(shutil.copytree(ol_1_efr, tmp_path / ol_1_efr.name))
+
+
+def run(hrefs: List[str], cache: ItemCache, **kwargs) -> List[BatchResult]:
+    return list(create_items(hrefs, skip_nc=True, item_cache=cache, **kwargs))
+
+
+@pytest.mark.parametrize("batch_geometry", [False, True])
+def test_items_are_reused(batch_geometry: bool) -> None:
+    hrefs = [str(p) for p in sorted(DATA_FILES.glob("*.SEN3"))]
+    cache = ItemCache()
+    first = run(hrefs, cache, batch_geometry=batch_geometry)
+    assert len(cache) == sum(result.ok for result in first)
+    assert not any(result.cached for result in first)
+
+    second = run(hrefs, cache, batch_geometry=batch_geometry)
+    assert [result.cached for result in second] == [result.ok for result in first]
+    for before, after in zip(first, second):
+        if before.item is not None:
+            assert after.item is not None
+            assert after.item.to_dict() == before.item.to_dict()
+    assert cache.hits == len(cache)
+
+
+def test_cached_items_skip_every_stage(ol_1_efr: Path) -> None:
+    cache = ItemCache()
+    run([str(ol_1_efr)], cache)
+    stats = StageStats()
+    (result,) = run([str(ol_1_efr)], cache, instrumentation=stats)
+    assert result.cached
+    assert stats.summary() == {}
+
+
+def test_changed_manifest_is_recreated(granule: Path) -> None:
+    cache = ItemCache()
+    run([str(granule)], cache)
+    manifest = granule / "xfdumanifest.xml"
+    manifest.write_text(manifest.read_text() + "\n<!-- reprocessed -->\n")
+
+    (result,) = run([str(granule)], cache)
+    assert not result.cached
+    assert result.item is not None
+    checksum = result.item.assets["safe-manifest"].extra_fields["file:checksum"]
+    (result,) = run([str(granule)], cache)
+    assert result.cached
+    assert result.item is not None
+    assert result.item.assets["safe-manifest"].extra_fields["file:checksum"] == checksum
+
+
+def test_options_and_version_are_part_of_the_key(ol_1_efr: Path) -> None:
+    cache = ItemCache(version="1.0")
+    run([str(ol_1_efr)], cache)
+    assert not run([str(ol_1_efr)], cache, quadkey_zoom=3)[0].cached
+    assert run([str(ol_1_efr)], cache, quadkey_zoom=3)[0].cached
+
+    cache.version = "1.1"
+    assert not run([str(ol_1_efr)], cache, quadkey_zoom=3)[0].cached
+
+
+def test_skip_cached(ol_1_efr: Path) -> None:
+    cache = ItemCache()
+    run([str(ol_1_efr)], cache)
+    assert run([str(ol_1_efr)], cache, skip_cached=True) == []
+
+
+def test_save_and_load(ol_1_efr: Path, tmp_path: Path) -> None:
+    cache = ItemCache()
+    item = create_item(str(ol_1_efr), skip_nc=True)
+    options = item_options(skip_nc=True)
+    cache.put(str(ol_1_efr), item, options)
+    cache.save(str(tmp_path / "cache.ndjson"))
+
+    loaded = ItemCache.load(str(tmp_path / "cache.ndjson"))
+    assert len(loaded) == 1
+    checksum = item.assets["safe-manifest"].extra_fields["file:checksum"]
+    cached = loaded.get(str(ol_1_efr), checksum, options)
+    assert cached is not None
+    assert cached.to_dict() == item.to_dict()
+    assert loaded.get(str(ol_1_efr), "0" * 32, options) is None
+
+
+def test_item_cache_with_processes(ol_1_efr: Path) -> None:
+    with pytest.raises(ValueError):
+        next(create_items([str(ol_1_efr)], item_cache=ItemCache(), use_processes=True))
@@ -0,0 +1,60 @@
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from stactools.sentinel3 import instrumentation
+from stactools.sentinel3.batch import create_items
+from stactools.sentinel3.memory_profile import MemoryProfile
+from stactools.sentinel3.stac import create_item
+
+DATA_FILES = Path(__file__).parent / "data-files"
+
+
+def test_memory_profile(ol_1_efr: Path) -> None:
+    with MemoryProfile(top=3) as profile:
+        create_item(str(ol_1_efr), instrumentation=profile)
+    assert not tracemalloc.is_tracing()
+
+    (product,) = profile.summary().values()
+    assert list(profile.summary()) == ["OL_1_EFR"]
+    assert product.items == 1
+    assert product.peak >= product.stages[instrumentation.READ_MANIFEST] > 0
+    assert list(product.stages)[-1] == instrumentation.NORMALIZE_FOOTPRINT
+    assert 0 < len(product.top) <= 3
+    assert product.top[0].size >= product.top[-1].size
+    assert all(":" in site.site for site in product.top)
+
+
+def test_memory_profile_without_tracing(ol_1_efr: Path) -> None:
+    profile = MemoryProfile()
+    create_item(str(ol_1_efr), instrumentation=profile)
+    assert profile.summary() == {}
+
+
+def test_memory_profile_batch(tmp_path: Path) -> None:
+    hrefs = [str(p) for p in sorted(DATA_FILES.glob("*SR_2*.SEN3"))]
+    with MemoryProfile() as profile:
+        results = list(create_items(hrefs, max_workers=1, instrumentation=profile))
+    assert all(result.ok for result in results)
+    summary = profile.summary()
+    assert list(summary) == ["SR_2_LAN", "SR_2_WAT"]
+    assert [product.items for product in summary.values()] == [1, 1]
+
+    profile.save(str(tmp_path / "profile.json"))
+    text = (tmp_path / "profile.json").read_text()
+    assert json.loads(text) == json.loads(json.dumps(profile.to_dict()))
+    assert text == json.dumps(json.loads(text), indent=2, sort_keys=True) + "\n"
+
+
+def test_memory_profile_refuses_workers(ol_1_efr: Path) -> None:
+    with MemoryProfile() as profile, pytest.raises(ValueError):
+        next(create_items([str(ol_1_efr)], max_workers=2, instrumentation=profile))
+
+
+def test_memory_profile_ignores_writing(ol_1_efr: Path) -> None:
+    with MemoryProfile() as profile:
+        profile.stage_started(str(ol_1_efr), instrumentation.SERIALIZE)
+        profile.stage_finished(str(ol_1_efr), instrumentation.SERIALIZE, 0.1, 0)
+    assert profile.summary() == {}
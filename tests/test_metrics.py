@@ -0,0 +1,128 @@
+import time
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from stactools.sentinel3 import batch
+from stactools.sentinel3.batch import create_items
+from stactools.sentinel3.geometry import normalize_footprints
+from stactools.sentinel3.item_cache import ItemCache
+from stactools.sentinel3.metrics import BatchMetrics, Histogram
+
+DATA_FILES = Path(__file__).parent / "data-files"
+
+
+def test_histogram() -> None:
+    histogram = Histogram([1.0, 2.0])
+    for value in (0.5, 1.0, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.samples("latency", {"stage": "read"}) == [
+        'latency_bucket{stage="read",le="1.0"} 2',
+        'latency_bucket{stage="read",le="2.0"} 3',
+        'latency_bucket{stage="read",le="+Inf"} 4',
+        'latency_sum{stage="read"} 6.0',
+        'latency_count{stage="read"} 4',
+    ]
+
+
+def test_batch_metrics(tmp_path: Path) -> None:
+    hrefs = [str(p) for p in sorted(DATA_FILES.glob("*.SEN3"))]
+    metrics = BatchMetrics(str(tmp_path / "sentinel3.prom"))
+    results = list(
+        create_items(hrefs, skip_nc=True, max_workers=2, instrumentation=metrics)
+    )
+    text = metrics.format()
+    samples = dict(
+        line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#")
+    )
+
+    created = [
+        value
+        for name, value in samples.items()
+        if name.startswith("stac_sentinel3_items_created_total")
+    ]
+    failed = [
+        value
+        for name, value in samples.items()
+        if name.startswith("stac_sentinel3_items_failed_total")
+    ]
+    assert sum(map(int, created)) == sum(result.ok for result in results)
+    assert sum(map(int, failed)) == sum(not result.ok for result in results)
+    assert samples['stac_sentinel3_items_created_total{product_type="OL_1_EFR"}']
+    assert samples["stac_sentinel3_items_in_flight"] == "0"
+    assert samples['stac_sentinel3_stages_in_flight{stage="read_manifest"}'] == "0"
+    assert int(
+        samples['stac_sentinel3_stage_duration_seconds_count{stage="read_manifest"}']
+    ) == int(samples['stac_sentinel3_stage_read_bytes_count{stage="read_manifest"}'])
+    assert "# TYPE stac_sentinel3_stage_duration_seconds histogram" in text
+
+
+def test_batch_metrics_skip_cached(ol_1_efr: Path) -> None:
+    cache = ItemCache()
+    list(create_items([str(ol_1_efr)], item_cache=cache))
+    metrics = BatchMetrics("unused.prom")
+    results = list(
+        create_items(
+            [str(ol_1_efr)],
+            instrumentation=metrics,
+            item_cache=cache,
+            skip_cached=True,
+        )
+    )
+    assert results == []
+    lines = metrics.format().splitlines()
+    assert "stac_sentinel3_items_in_flight 0" in lines
+    assert 'stac_sentinel3_items_reused_total{product_type="OL_1_EFR"} 1' in lines
+    assert not any(
+        line.startswith("stac_sentinel3_items_created_total{") for line in lines
+    )
+
+
+def test_batch_metrics_failures() -> None:
+    metrics = BatchMetrics("unused.prom")
+    metrics.item_submitted("a/S3A_SR_2_LAN____x.SEN3")
+    metrics.item_finished("a/S3A_SR_2_LAN____x.SEN3", KeyError("k"), False)
+    assert (
+        'stac_sentinel3_items_failed_total{product_type="SR_2_LAN",error="KeyError"} 1'
+        in metrics.format().splitlines()
+    )
+
+
+def test_batch_metrics_writes_periodically(tmp_path: Path) -> None:
+    textfile = tmp_path / "sentinel3.prom"
+    with BatchMetrics(str(textfile), interval=0.01) as metrics:
+        assert "stac_sentinel3_items_in_flight 0" in textfile.read_text()
+        metrics.item_submitted("granule")
+        time.sleep(0.1)
+        assert "stac_sentinel3_items_in_flight 1" in textfile.read_text()
+        metrics.item_finished("granule", None, False)
+    assert "stac_sentinel3_items_in_flight 0" in textfile.read_text()
+    assert [p.name for p in tmp_path.iterdir()] == ["sentinel3.prom"]
+
+
+def test_batch_metrics_normalize_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    def normalize_one_at_a_time(footprints: List[Any], **kwargs: Any) -> List[Any]:
+        if len(footprints) > 1:
+            raise ValueError("a group")
+        return normalize_footprints(footprints, **kwargs)
+
+    monkeypatch.setattr(batch, "normalize_footprints", normalize_one_at_a_time)
+    hrefs = [str(p) for p in sorted(DATA_FILES.glob("*SR_2*.SEN3"))]
+    metrics = BatchMetrics("unused.prom")
+    results = list(
+        batch.create_items(
+            hrefs,
+            skip_nc=True,
+            max_workers=2,
+            batch_geometry=True,
+            instrumentation=metrics,
+        )
+    )
+    assert [result.ok for result in results] == [True, True]
+    lines = metrics.format().splitlines()
+    assert 'stac_sentinel3_stages_in_flight{stage="normalize_footprint"} 0' in lines
+    assert (
+        'stac_sentinel3_stage_duration_seconds_count{stage="normalize_footprint"} 2'
+        in lines
+    )
@@ -0,0 +1,85 @@
+import random
+from pathlib import Path
+from typing import List
+
+import pystac
+import pytest
+
+from stactools.sentinel3.orbit_index import OrbitEntry, OrbitIndex
+from stactools.sentinel3.serialization import read_index_items, save_items_ndjson
+from stactools.sentinel3.stac import create_item
+
+
+@pytest.fixture
+def items(ol_1_efr: Path) -> List[pystac.Item]:
+    item = create_item(str(ol_1_efr), skip_nc=True)
+    items = []
+    rng = random.Random(0)
+    for i in range(200):
+        cycle = rng.randint(70, 75)
+        relative_orbit = rng.randint(1, 20)
+        clone = item.clone()
+        clone.id = f"S3A_OL_1_EFR_{i:04d}_0179_{cycle:03d}_{relative_orbit:03d}_1080"
+        clone.properties["sat:relative_orbit"] = relative_orbit
+        clone.properties["sat:absolute_orbit"] = 27000 + cycle * 385 + relative_orbit
+        items.append(clone)
+    return items
+
+
+def test_entry_from_item(ol_1_efr: Path) -> None:
+    entry = OrbitEntry.from_item(create_item(str(ol_1_efr), skip_nc=True))
+    assert entry.relative_orbit == 334
+    assert entry.cycle == 77
+    assert entry.absolute_orbit == 29567
+    assert entry.orbit_state == "descending"
+
+
+def test_find(items: List[pystac.Item]) -> None:
+    index = OrbitIndex()
+    assert list(index.add_items(items)) == items
+
+    for relative_orbit in range(0, 22):
+        expected = sorted(
+            item.id
+            for item in items
+            if item.properties["sat:relative_orbit"] == relative_orbit
+        )
+        assert sorted(e.item_id for e in index.find(relative_orbit)) == expected
+        found = index.find(relative_orbit, 72)
+        assert all(e.relative_orbit == relative_orbit for e in found)
+        assert all(e.cycle == 72 for e in found)
+        assert len(found) == sum(f"_072_{relative_orbit:03d}_" in i for i in expected)
+
+    absolute_orbit = items[0].properties["sat:absolute_orbit"]
+    found = index.find_absolute(absolute_orbit)
+    assert items[0].id in [e.item_id for e in found]
+    assert all(e.absolute_orbit == absolute_orbit for e in found)
+    assert index.find_absolute(1) == []
+
+
+def test_skips_items_without_orbits(items: List[pystac.Item]) -> None:
+    del items[0].properties["sat:absolute_orbit"]
+    index = OrbitIndex()
+    list(index.add_items(items[:2]))
+    assert [e.item_id for e in index.entries] == [items[1].id]
+
+
+def test_save_load_read_items(items: List[pystac.Item], tmp_path: Path) -> None:
+    index = OrbitIndex(items_href="items.ndjson")
+    save_items_ndjson(items, str(tmp_path / "items.ndjson"), on_write=index.add_item)
+    index.save(str(tmp_path / "orbits.json"))
+
+    loaded = OrbitIndex.load(str(tmp_path / "orbits.json"))
+    assert loaded.entries == index.entries
+    entry = OrbitEntry.from_item(items[50])
+    found = loaded.find(entry.relative_orbit, entry.cycle)
+    assert found == index.find(entry.relative_orbit, entry.cycle)
+    assert entry.item_id in [e.item_id for e in found]
+    offsets = [e.offset for e in found]
+    read = list(
+        read_index_items(str(tmp_path / "orbits.json"), loaded.items_href, offsets)
+    )
+    assert [item.id for item in read] == [e.item_id for e in found]
+    assert loaded.find_absolute(found[0].absolute_orbit) == index.find_absolute(
+        found[0].absolute_orbit
+    )
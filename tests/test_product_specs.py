@@ -0,0 +1,51 @@
+import pytest
+from pystac.extensions.eo import Band
+
+from stactools.sentinel3.product_specs import (
+    PRODUCT_SPECS,
+    AssetSpec,
+    ProductSpec,
+    get_product_spec,
+    register_product_spec,
+)
+
+
+def test_unknown_product_type() -> None:
+    with pytest.raises(RuntimeError):
+        get_product_spec("XX_9_FOO___")
+
+
+def test_product_type_suffix_is_ignored() -> None:
+    assert get_product_spec("OL_1_EFR___") is PRODUCT_SPECS["OL_1_EFR"]
+
+
+def test_band_objects_are_not_shared() -> None:
+    spec = get_product_spec("OL_1_EFR")
+    asset = spec.assets[0]
+    first = spec.bands(asset)
+    first[0]["name"] = "changed"
+    assert spec.bands(asset)[0]["name"] == spec.band_catalog[asset.bands[0]].name
+
+
+def test_register_product_spec() -> None:
+    band = Band.create(
+        name="Test", description="", center_wavelength=500, full_width_half_max=10
+    )
+    spec = ProductSpec(
+        product_type="XX_2_TST",
+        assets=(AssetSpec("testData", ("Test",)),),
+        band_catalog={"Test": band},
+    )
+    register_product_spec(spec)
+    try:
+        assert get_product_spec("XX_2_TST___") is spec
+        assert spec.bands(spec.assets[0]) == [
+            {
+                "name": "Test",
+                "description": "",
+                "center_wavelength": 0.5,
+                "full_width_half_max": 0.01,
+            }
+        ]
+    finally:
+        del PRODUCT_SPECS["XX_2_TST"]
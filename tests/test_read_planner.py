@@ -0,0 +1,130 @@
+import json
+from pathlib import Path
+
+import netCDF4 as nc  # type: ignore
+import numpy as np
+
+from stactools.sentinel3 import stac
+from stactools.sentinel3.metadata_links import MetadataLinks
+from stactools.sentinel3.product_specs import get_product_spec
+from stactools.sentinel3.read_planner import (
+    ByteRange,
+    coalesce_ranges,
+    hdf5_end_of_file,
+    plan_ranges,
+    prefetch_headers,
+)
+from tests.http_server import serve_directory
+
+
+def test_coalesce_ranges() -> None:
+    ranges = [
+        ByteRange("a", 100, 200),
+        ByteRange("a", 0, 50),
+        ByteRange("b", 0, 10),
+        ByteRange("a", 150, 300),
+        ByteRange("a", 1000, 1100),
+    ]
+    assert coalesce_ranges(ranges, max_gap=50) == [
+        ByteRange("a", 0, 300),
+        ByteRange("a", 1000, 1100),
+        ByteRange("b", 0, 10),
+    ]
+    assert len(coalesce_ranges(ranges, max_gap=0)) == 4
+
+
+def test_plan_ranges() -> None:
+    plan = plan_ranges(
+        {"small": 1000, "large": 10_000}, head_bytes=500, tail_bytes=100, max_gap=600
+    )
+    assert plan == [
+        ByteRange("small", 0, 1000),
+        ByteRange("large", 0, 500),
+        ByteRange("large", 9900, 10_000),
+    ]
+
+
+def test_hdf5_end_of_file(ol_1_efr: Path) -> None:
+    data = (ol_1_efr / "Oa01_radiance.nc").read_bytes()
+    assert hdf5_end_of_file(data) == len(data)
+    assert hdf5_end_of_file(b"CDF\x01") is None
+
+
+def test_prefetch_incomplete_header(tmp_path: Path) -> None:
+    path = tmp_path / "large.nc"
+    ds = nc.Dataset(path, "w")
+    ds.createDimension("rows", 500)
+    ds.createDimension("columns", 800)
+    ds.createVariable("x", "f4", ("rows", "columns"))[:] = np.ones((500, 800))
+    ds.resolution = "[ 300 300 ]"
+    ds.close()
+    size = path.stat().st_size
+
+    result = prefetch_headers(
+        {str(path): size}, head_bytes=4096, tail_bytes=4096, max_gap=0
+    )
+    assert result.requests == 2
+    assert result.bytes_read < size // 100
+    buffer = result.buffers[str(path)]
+    assert not buffer.complete
+
+    ds = nc.Dataset("large.nc", memory=buffer.getbuffer())
+    assert {k: v.size for k, v in ds.dimensions.items()} == {
+        "rows": 500,
+        "columns": 800,
+    }
+    assert ds.resolution == "[ 300 300 ]"
+    ds.close()
+
+
+def test_open_unchecksummed_header(ol_1_efr: Path, tmp_path: Path) -> None:
+    path = tmp_path / "classic.nc"
+    ds = nc.Dataset(path, "w", format="NETCDF3_CLASSIC")
+    ds.createDimension("rows", 500)
+    ds.createVariable("x", "f4", ("rows",))[:] = np.arange(500)
+    ds.close()
+    size = path.stat().st_size
+
+    result = prefetch_headers(
+        {str(path): size}, head_bytes=1024, tail_bytes=0, max_gap=0
+    )
+    buffer = result.buffers[str(path)]
+    assert not buffer.complete and not buffer.checksummed
+
+    metadata_links = MetadataLinks(str(ol_1_efr))
+    metadata_links._header_buffers.update(result.buffers)
+    ds = metadata_links._open_dataset(str(path))
+    # opened directly, not from the zero-filled buffer
+    assert ds.filepath() == str(path)
+    assert ds["x"][-1] == 499
+    ds.close()
+
+
+def test_prefetched_item_matches(ol_1_efr: Path) -> None:
+    expected = stac.create_item(str(ol_1_efr)).to_dict()
+    actual = stac.create_item(str(ol_1_efr), prefetch_headers=True).to_dict()
+    expected["properties"].pop("created")
+    actual["properties"].pop("created")
+    assert actual == expected
+
+
+def test_prefetch_over_http(ol_1_efr: Path) -> None:
+    expected = stac.create_item(str(ol_1_efr)).to_dict()
+    expected["properties"].pop("created")
+    metadata_links = MetadataLinks(str(ol_1_efr))
+    asset_keys = {
+        asset.key
+        for asset in get_product_spec("OL_1_EFR").select_assets(metadata_links.manifest)
+    }
+    netcdf_files = len(metadata_links.netcdf_sizes(asset_keys))
+
+    with serve_directory(ol_1_efr.parent) as (url, stats):
+        item = stac.create_item(f"{url}/{ol_1_efr.name}", prefetch_headers=True)
+        # a single request for each NetCDF header
+        netcdf_requests = [n for p, n in stats.paths.items() if p.endswith(".nc")]
+        assert netcdf_requests == [1] * netcdf_files
+
+    actual = item.to_dict()
+    actual["properties"].pop("created")
+    actual = json.loads(json.dumps(actual).replace(f"{url}/", f"{ol_1_efr.parent}/"))
+    assert actual == expected
@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import pystac
+import pytest
+
+from stactools.sentinel3 import serialization, stac
+
+
+@pytest.fixture
+def item(ol_1_efr: Path) -> pystac.Item:
+    return stac.create_item(str(ol_1_efr))
+
+
+def test_dumps_matches_save_object(item: pystac.Item, tmp_path: Path) -> None:
+    path = tmp_path / "item.json"
+    item.set_self_href(str(path))
+    item.save_object()
+    expected = json.loads(path.read_text())
+
+    serialization.save_item(item, str(path))
+    data = path.read_bytes()
+    assert b"\n" not in data
+    assert json.loads(data) == expected
+
+
+def test_json_fallback_is_identical(
+    item: pystac.Item, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # compares orjson, from requirements-dev.txt, with the standard library
+    pytest.importorskip("orjson")
+    assert serialization.orjson is not None
+    item_dict = item.to_dict()
+    item_dict["properties"]["title"] = "Sentinel-3 ÖLCI"
+    fast = serialization.dumps(item_dict)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.dumps(item_dict) == fast
+
+
+def test_save_items_ndjson(item: pystac.Item, tmp_path: Path) -> None:
+    path = tmp_path / "items.ndjson"
+    assert serialization.save_items_ndjson([item, item], str(path)) == 2
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == json.loads(serialization.item_to_json(item))
+
+
+def test_read_index_items(item: pystac.Item, tmp_path: Path) -> None:
+    items_href = str(tmp_path / "items.ndjson")
+    offsets = []
+    serialization.save_items_ndjson(
+        [item, item], items_href, on_write=lambda _, offset: offsets.append(offset)
+    )
+    (tmp_path / "indexes").mkdir()
+    index_href = str(tmp_path / "indexes" / "orbits.json")
+    relative = serialization.relative_items_href(index_href, items_href)
+    assert relative == "../items.ndjson"
+    read = list(serialization.read_index_items(index_href, relative, offsets[1:]))
+    assert [i.id for i in read] == [item.id]
+    with pytest.raises(ValueError):
+        serialization.read_index_items(index_href, None, offsets)
@@ -16,6 +16,7 @@ from stactools.sentinel3.constants import (
     SYNERGY_V10_VG1_ASSET_KEYS,
     SYNERGY_VGP_ASSET_KEYS,
 )
+from stactools.sentinel3.item_template import get_item_template
 
 ASSET_KEY_LISTS = [
     OLCI_L1_ASSET_KEYS[0],
@@ -59,3 +60,21 @@ def test_kebab_assets(key: str, expected: str) -> None:
 def test_id(ol_1_efr: Path) -> None:
     item = stac.create_item(str(ol_1_efr), skip_nc=True)
     assert item.id == "S3A_OL_1_EFR_20211021T073827_20211021T074112_0164_077_334_4320"
+
+
+def test_item_template_is_shared() -> None:
+    template = get_item_template("OL_1_EFR", "002")
+    assert get_item_template("OL_1_EFR", "002") is template
+    assert get_item_template("OL_1_EFR", "003") is not template
+    assert template.product_name == "olci-efr"
+    assert template.is_eo
+    assert template.asset_key("Oa01_radianceData") == "oa01-radiance"
+    assert template.property_key("s3:salineWaterPixelsPercentage") == "s3:saline_water"
+    assert not get_item_template("SR_2_WAT", "004").is_eo
+
+
+def test_items_do_not_share_template_lists(ol_1_efr: Path) -> None:
+    first = stac.create_item(str(ol_1_efr), skip_nc=True)
+    first.stac_extensions.append("https://example.com/schema.json")
+    second = stac.create_item(str(ol_1_efr), skip_nc=True)
+    assert "https://example.com/schema.json" not in second.stac_extensions
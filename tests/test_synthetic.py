@@ -0,0 +1,84 @@
+import os
+from pathlib import Path
+
+import netCDF4 as nc  # type: ignore
+import numpy as np
+import pytest
+
+from stactools.sentinel3 import stac
+from stactools.sentinel3.metadata_links import MetadataLinks
+from tests.synthetic import densify_ring, make_granule, make_granules, templates
+
+
+def test_densify_ring() -> None:
+    ring = np.array([[0.0, 0.0], [0.0, 4.0], [4.0, 4.0], [4.0, 0.0], [0.0, 0.0]])
+    dense = densify_ring(ring, 17)
+    assert dense.shape == (17, 2)
+    np.testing.assert_allclose(dense[:5], [[0, 0], [0, 1], [0, 2], [0, 3], [0, 4]])
+    np.testing.assert_array_equal(dense[-1], dense[0])
+
+
+def test_densify_ring_across_antimeridian() -> None:
+    ring = np.array([[0.0, 178.0], [0.0, -178.0], [2.0, -178.0], [0.0, 178.0]])
+    dense = densify_ring(ring, 50)
+    assert np.all(np.abs(dense[:, 1]) >= 177.9)
+
+
+@pytest.fixture
+def granule(ol_1_efr: Path, tmp_path: Path) -> Path:
+    return make_granule(
+        ol_1_efr,
+        tmp_path,
+        footprint_points=2000,
+        data_objects=100,
+        shape=(10, 20),
+        variables=40,
+        variable_attributes=20,
+    )
+
+
+def test_make_granule(ol_1_efr: Path, granule: Path) -> None:
+    metadata_links = MetadataLinks(str(granule))
+    sizes = metadata_links.netcdf_sizes()
+    assert len(sizes) == len(MetadataLinks(str(ol_1_efr)).netcdf_sizes()) + 100
+    for href, size in sizes.items():
+        if os.path.exists(href):
+            assert os.path.getsize(href) == size
+
+    with nc.Dataset(granule / "Oa03_radiance.nc") as ds:
+        assert len(ds.variables) == 40
+        assert {name: len(dim) for name, dim in ds.dimensions.items()} == {
+            "rows": 10,
+            "columns": 20,
+        }
+        assert ds.resolution == "[ 270 294 ]"
+
+    item = stac.create_item(str(granule))
+    assert item.geometry is not None
+    assert len(item.geometry["coordinates"][0]) == 2000
+    asset = item.assets["oa03-radiance"]
+    assert asset.extra_fields["file:size"] == os.path.getsize(
+        granule / "Oa03_radiance.nc"
+    )
+
+
+def test_prefetched_synthetic_item_matches(granule: Path) -> None:
+    # the headers are larger than the head and tail that are prefetched
+    assert os.path.getsize(granule / "Oa03_radiance.nc") > 128 * 1024
+    expected = stac.create_item(str(granule)).to_dict()
+    actual = stac.create_item(str(granule), prefetch_headers=True).to_dict()
+    expected["properties"].pop("created")
+    actual["properties"].pop("created")
+    assert actual == expected
+
+
+def test_make_granules(tmp_path: Path) -> None:
+    granules = make_granules(
+        tmp_path, ["SR_2_LAN", "SL_1_RBT"], footprint_points=100, variables=1
+    )
+    assert list(granules) == ["SR_2_LAN", "SL_1_RBT"]
+    for product_type, granule in granules.items():
+        assert granule.name == templates()[product_type].name
+        item = stac.create_item(str(granule), skip_nc=True)
+        assert item.geometry is not None
+        assert len(item.geometry["coordinates"][0]) == 100
@@ -0,0 +1,121 @@
+import shutil
+from pathlib import Path
+from typing import Any, List
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+import shapely.geometry
+
+from stactools.sentinel3 import stac, tie_points
+
+
+class RecordingArray:
+    """An array that records which parts of it are read."""
+
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+        self.shape = array.shape
+        self.keys: List[Any] = []
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        self.keys.append(key)
+        return self.array[key]
+
+
+def grid(rows: int = 200, columns: int = 20, lon0: float = 10.0) -> List[np.ndarray]:
+    row, column = np.mgrid[0:rows, 0:columns]
+    return [70.0 - row * 0.1, lon0 + column * 0.5 + row * 0.01]
+
+
+def expected_ring(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    points = np.stack([longitude, latitude], axis=-1)
+    return np.concatenate(
+        [
+            points[0, :],
+            points[1:, -1],
+            points[-1, -2::-1],
+            points[-2::-1, 0],
+        ]
+    )
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 1024])
+def test_boundary_ring(chunk_rows: int) -> None:
+    latitude, longitude = grid()
+    ring = tie_points.boundary_ring(
+        latitude, longitude, edge_points=1000, chunk_rows=chunk_rows
+    )
+    np.testing.assert_array_equal(ring, expected_ring(latitude, longitude))
+
+
+def test_boundary_ring_reads_only_the_edges() -> None:
+    latitude, longitude = (RecordingArray(a) for a in grid())
+    ring = tie_points.boundary_ring(latitude, longitude, edge_points=8, chunk_rows=64)
+    assert len(ring) == 4 * 7 + 1
+    assert shapely.geometry.Polygon(ring).is_valid
+    for array in (latitude, longitude):
+        assert len(array.keys) == 2 + 2 * 4
+        for rows, columns in array.keys:
+            if isinstance(rows, slice):
+                assert rows.stop - rows.start <= 64
+                assert columns in (0, 19)
+            else:
+                assert rows in (0, 199)
+
+
+def test_boundary_ring_skips_fill_values() -> None:
+    latitude, longitude = grid()
+    mask = np.zeros(latitude.shape, dtype=bool)
+    mask[:10, 0] = True
+    ring = tie_points.boundary_ring(
+        np.ma.masked_array(latitude, mask), longitude, edge_points=1000
+    )
+    assert len(ring) == len(expected_ring(latitude, longitude)) - 10
+
+
+def test_boundary_ring_shape_mismatch() -> None:
+    latitude, longitude = grid()
+    with pytest.raises(ValueError):
+        tie_points.boundary_ring(latitude, longitude[:-1])
+
+
+@pytest.fixture
+def granule(ol_1_efr: Path, tmp_path: Path) -> Path:
+    granule = tmp_path / ol_1_efr.name
+    shutil.copytree(ol_1_efr, granule)
+    return granule
+
+
+def write_grid(path: Path, latitude: np.ndarray, longitude: np.ndarray) -> None:
+    with nc.Dataset(path, "w") as ds:
+        ds.createDimension("tie_rows", latitude.shape[0])
+        ds.createDimension("tie_columns", latitude.shape[1])
+        for name, values in (("latitude", latitude), ("longitude", longitude)):
+            variable = ds.createVariable(
+                name, "i4", ("tie_rows", "tie_columns"), fill_value=-(2**31)
+            )
+            variable.scale_factor = 1e-6
+            variable[:] = values
+
+
+def test_create_item_tie_point_footprint(granule: Path) -> None:
+    latitude, longitude = grid(lon0=179.0)
+    longitude = (longitude + 180) % 360 - 180
+    write_grid(granule / "tie_geo_coordinates.nc", latitude, longitude)
+    item = stac.create_item(str(granule), skip_nc=True, tie_point_footprint=True)
+    assert item.geometry is not None
+    assert item.geometry["type"] == "MultiPolygon"
+    assert item.bbox == [-180.0, 50.1, 180.0, 70.0]
+
+    manifest = stac.create_item(str(granule), skip_nc=True)
+    assert item.geometry != manifest.geometry
+
+
+def test_create_item_tie_point_footprint_fallback(
+    granule: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    # the fixture's grid has no variables
+    item = stac.create_item(str(granule), skip_nc=True, tie_point_footprint=True)
+    assert item.geometry == stac.create_item(str(granule), skip_nc=True).geometry
+    assert "tie-point grid could not be read" in caplog.text
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pystac
+import pytest
+import shapely
+import shapely.geometry
+
+from stactools.sentinel3 import stac, tiles
+
+
+def brute_force(geometry: shapely.geometry.base.BaseGeometry, zoom: int) -> list:
+    n = 2**zoom
+    x, y = (a.ravel() for a in np.mgrid[0:n, 0:n])
+    boxes = shapely.box(*tiles.tile_bounds(x, y, zoom).T)
+    hits = shapely.intersects(geometry, boxes)
+    return sorted(tiles.quadkeys_of(x[hits], y[hits], zoom))
+
+
+def test_quadkeys_of() -> None:
+    # examples from the Bing Maps tile system documentation
+    assert tiles.quadkeys_of(np.array([3]), np.array([5]), 3) == ["213"]
+    assert tiles.quadkeys_of(np.array([0, 1]), np.array([0, 1]), 1) == ["0", "3"]
+    with pytest.raises(ValueError):
+        tiles.quadkeys_of(np.array([0]), np.array([0]), 0)
+
+
+def test_tile_bounds() -> None:
+    bounds = tiles.tile_bounds(np.array([0, 1]), np.array([0, 1]), 1)
+    np.testing.assert_allclose(
+        bounds,
+        [
+            [-180, 0, 0, tiles.MAX_LATITUDE],
+            [0, -tiles.MAX_LATITUDE, 180, 0],
+        ],
+        atol=1e-9,
+    )
+
+
+@pytest.mark.parametrize("zoom", [1, 4, 7])
+def test_covering_quadkeys_matches_brute_force(zoom: int) -> None:
+    geometry = shapely.geometry.MultiPolygon(
+        [
+            shapely.geometry.Polygon([(170, -10), (180, -10), (180, 30), (160, 20)]),
+            shapely.geometry.box(-180, -12, -170, 25),
+            shapely.geometry.box(10.2, 40.1, 10.3, 40.2),
+        ]
+    )
+    assert tiles.covering_quadkeys(geometry, zoom) == brute_force(geometry, zoom)
+
+
+def test_create_item_quadkeys(ol_1_efr: Path) -> None:
+    item = stac.create_item(str(ol_1_efr), skip_nc=True, quadkey_zoom=8)
+    footprint = shapely.geometry.shape(item.geometry)
+    assert item.properties[tiles.QUADKEYS_PROPERTY] == brute_force(footprint, 8)
+    assert tiles.QUADKEYS_PROPERTY not in stac.create_item(str(ol_1_efr)).properties
+
+
+def test_tile_index(ol_1_efr: Path, tmp_path: Path) -> None:
+    item = stac.create_item(str(ol_1_efr), skip_nc=True, quadkey_zoom=5)
+    other = item.clone()
+    other.id = "other"
+    other.properties[tiles.QUADKEYS_PROPERTY] = ["00000"]
+    unindexed = pystac.Item("none", None, None, item.datetime, {})
+
+    index = tiles.TileIndex()
+    assert list(index.add_items([item, other, unindexed])) == [item, other, unindexed]
+    index.save(str(tmp_path / "tiles.json"))
+    saved = json.loads((tmp_path / "tiles.json").read_text())
+    assert saved["00000"] == ["other"]
+    for key in item.properties[tiles.QUADKEYS_PROPERTY]:
+        assert item.id in saved[key]
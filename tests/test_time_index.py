@@ -0,0 +1,91 @@
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+import pystac
+import pytest
+
+from stactools.sentinel3.serialization import read_index_items, save_items_ndjson
+from stactools.sentinel3.stac import create_item
+from stactools.sentinel3.time_index import TimeIndex
+
+T0 = datetime(2021, 10, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def items(ol_1_efr: Path) -> List[pystac.Item]:
+    item = create_item(str(ol_1_efr), skip_nc=True)
+    rng = random.Random(0)
+    items = []
+    for i in range(300):
+        clone = item.clone()
+        clone.id = f"item-{i}"
+        start = T0 + timedelta(minutes=rng.uniform(0, 10000))
+        # mostly 3 minute frames, with a few long strips
+        duration = timedelta(minutes=rng.choice([3, 3, 3, 3, 100]))
+        clone.properties["start_datetime"] = pystac.utils.datetime_to_str(start)
+        clone.properties["end_datetime"] = pystac.utils.datetime_to_str(
+            start + duration
+        )
+        if i % 3 == 0:
+            clone.properties["s3:product_type"] = "SL_1_RBT___"
+        items.append(clone)
+    return items
+
+
+def brute_force(
+    items: List[pystac.Item], product_type: str, start: datetime, end: datetime
+) -> List[str]:
+    return sorted(
+        item.id
+        for item in items
+        if item.properties["s3:product_type"].rstrip("_") == product_type
+        and pystac.utils.str_to_datetime(item.properties["start_datetime"]) <= end
+        and pystac.utils.str_to_datetime(item.properties["end_datetime"]) >= start
+    )
+
+
+def test_find_matches_brute_force(items: List[pystac.Item]) -> None:
+    index = TimeIndex()
+    assert list(index.add_items(items)) == items
+    assert index.product_types == ["OL_1_EFR", "SL_1_RBT"]
+
+    rng = random.Random(1)
+    for _ in range(50):
+        start = T0 + timedelta(minutes=rng.uniform(-100, 10100))
+        end = start + timedelta(minutes=rng.uniform(0, 300))
+        for product_type in ("OL_1_EFR", "SL_1_RBT"):
+            found = index.find(product_type, start, end)
+            assert [e.start for e in found] == sorted(e.start for e in found)
+            assert sorted(e.item_id for e in found) == brute_force(
+                items, product_type, start, end
+            )
+
+
+def test_find_accepts_strings(items: List[pystac.Item]) -> None:
+    index = TimeIndex()
+    list(index.add_items(items))
+    start = items[0].properties["start_datetime"]
+    found = index.find("OL_1_EFR___", start, start)
+    assert items[0].id not in [e.item_id for e in found]
+    found = index.find("SL_1_RBT", start, start.replace("Z", ""))
+    assert items[0].id in [e.item_id for e in found]
+    assert index.find("SR_2_WAT", start, start) == []
+
+
+def test_save_load_read_items(items: List[pystac.Item], tmp_path: Path) -> None:
+    index = TimeIndex(items_href="items.ndjson")
+    save_items_ndjson(items, str(tmp_path / "items.ndjson"), on_write=index.add_item)
+    index.save(str(tmp_path / "times.json"))
+
+    loaded = TimeIndex.load(str(tmp_path / "times.json"))
+    start, end = T0 + timedelta(days=2), T0 + timedelta(days=2, hours=6)
+    found = loaded.find("OL_1_EFR", start, end)
+    assert found == index.find("OL_1_EFR", start, end)
+    assert found
+    offsets = [e.offset for e in found]
+    read = list(
+        read_index_items(str(tmp_path / "times.json"), loaded.items_href, offsets)
+    )
+    assert [item.id for item in read] == [e.item_id for e in found]
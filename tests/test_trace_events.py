@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+from stactools.sentinel3 import instrumentation
+from stactools.sentinel3.batch import create_items
+from stactools.sentinel3.stac import create_item
+from stactools.sentinel3.trace_events import TraceRecorder
+
+DATA_FILES = Path(__file__).parent / "data-files"
+
+
+def test_trace_recorder(ol_1_efr: Path, tmp_path: Path) -> None:
+    recorder = TraceRecorder()
+    create_item(str(ol_1_efr), prefetch_headers=True, instrumentation=recorder)
+    recorder.save(str(tmp_path / "trace.json"))
+
+    with open(tmp_path / "trace.json") as f:
+        trace = json.load(f)
+    events = trace["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [e["name"] for e in spans][0] == instrumentation.READ_MANIFEST
+    assert spans[-1]["name"] == instrumentation.NORMALIZE_FOOTPRINT
+    assert all(e["args"]["granule"] == str(ol_1_efr) for e in spans)
+    # stages of an item follow each other on its thread
+    assert len({e["tid"] for e in spans}) == 1
+    for previous, span in zip(spans, spans[1:]):
+        assert previous["ts"] + previous["dur"] <= span["ts"] + 1
+
+    names = {e["args"]["name"] for e in events if e["name"] == "thread_name"}
+    assert names == {"MainThread"}
+    io = [e for e in events if e["ph"] == "b" and e["cat"] == "io"]
+    assert io[0]["name"] == "xfdumanifest.xml"
+    assert io[0]["args"]["stage"] == instrumentation.READ_MANIFEST
+    assert any(e["args"]["stage"] == instrumentation.PREFETCH_HEADERS for e in io)
+    assert len([e for e in events if e["ph"] == "e"]) == len(io)
+
+
+def test_trace_recorder_workers() -> None:
+    hrefs = [str(p) for p in sorted(DATA_FILES.glob("*OL_1*.SEN3"))]
+    recorder = TraceRecorder()
+    results = list(
+        create_items(hrefs, skip_nc=True, max_workers=2, instrumentation=recorder)
+    )
+    events = recorder.to_dict()["traceEvents"]
+
+    queued = [e for e in events if e["name"] == "queued" and e["ph"] == "b"]
+    assert sorted(e["args"]["granule"] for e in queued) == sorted(hrefs)
+    spans = [e for e in events if e["ph"] == "X"]
+    assert {e["args"]["granule"] for e in spans} == set(hrefs)
+    assert len([e for e in spans if e["name"] == "normalize_footprint"]) == len(results)
+    workers = {e["args"]["name"] for e in events if e["name"] == "thread_name"}
+    assert workers and all(name.startswith("ThreadPoolExecutor") for name in workers)
+
+
+def test_trace_recorder_processes() -> None:
+    hrefs = [str(p) for p in sorted(DATA_FILES.glob("*OL_1*.SEN3"))]
+    recorder = TraceRecorder()
+    results = list(
+        create_items(
+            hrefs,
+            skip_nc=True,
+            max_workers=2,
+            instrumentation=recorder,
+            use_processes=True,
+        )
+    )
+    events = recorder.to_dict()["traceEvents"]
+
+    spans = [e for e in events if e["ph"] == "X"]
+    assert {e["args"]["granule"] for e in spans} == set(hrefs)
+    assert len([e for e in spans if e["name"] == "normalize_footprint"]) == len(results)
+    # every worker process is named once
+    processes = [e for e in events if e["name"] == "process_name"]
+    assert len({e["pid"] for e in processes}) == len(processes) > 1
+    assert {e["pid"] for e in spans} <= {e["pid"] for e in processes}
+    queued = [e for e in events if e["name"] == "queued" and e["ph"] == "b"]
+    assert sorted(e["args"]["granule"] for e in queued) == sorted(hrefs)
+    ids = [e["id"] for e in events if e["ph"] == "b"]
+    assert len(ids) == len(set(ids))
@@ -0,0 +1,124 @@
+import shutil
+from pathlib import Path
+from typing import Any, List, Tuple
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+import shapely
+import shapely.geometry
+
+from stactools.sentinel3 import geometry, stac, track
+
+
+class RecordingArray:
+    """An array that records which parts of it are read."""
+
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+        self.shape = array.shape
+        self.keys: List[Any] = []
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        self.keys.append(key)
+        return self.array[key]
+
+
+def synthetic_track(points: int = 3000) -> Tuple[np.ndarray, np.ndarray]:
+    # a descending pass crossing the antimeridian
+    t = np.linspace(0, 1, points)
+    latitude = 60 - 120 * t
+    longitude = (170 + 30 * t + 2 * np.sin(6 * t) + 180) % 360 - 180
+    return latitude, longitude
+
+
+def wrapped(points: np.ndarray) -> np.ndarray:
+    points = points.copy()
+    points[:, 0] = (points[:, 0] + 180) % 360 - 180
+    return points
+
+
+@pytest.mark.parametrize("chunk_points", [100, 999, 5000])
+def test_read_track(chunk_points: int) -> None:
+    latitude, longitude = synthetic_track()
+    points = track.read_track(
+        latitude, longitude, tolerance=0.01, chunk_points=chunk_points
+    )
+    assert len(points) < len(latitude) / 10
+    assert np.all(np.abs(np.diff(points[:, 0])) < 180)
+    np.testing.assert_allclose(points[0], [longitude[0], latitude[0]])
+    np.testing.assert_allclose(wrapped(points[-1:])[0], [longitude[-1], latitude[-1]])
+
+    line = shapely.geometry.LineString(points)
+    original = np.column_stack([np.unwrap(longitude, period=360), latitude])
+    assert line.hausdorff_distance(shapely.geometry.LineString(original)) <= 0.01
+
+
+def test_read_track_in_chunks() -> None:
+    latitude, longitude = (RecordingArray(a) for a in synthetic_track())
+    track.read_track(latitude, longitude, chunk_points=256)
+    for array in (latitude, longitude):
+        assert len(array.keys) == 12
+        assert all(key.stop - key.start <= 256 for key in array.keys)
+
+
+def test_read_track_skips_fill_values() -> None:
+    latitude, longitude = synthetic_track(10)
+    latitude = np.ma.masked_array(latitude, latitude < 0)
+    points = track.read_track(latitude, longitude, tolerance=0, chunk_points=3)
+    assert np.all(points[:, 1] >= 0)
+
+
+def test_track_footprint_splits_at_antimeridian() -> None:
+    latitude, longitude = synthetic_track()
+    points = track.read_track(latitude, longitude)
+    footprint = geometry.track_footprint(points, buffer=0.1, tolerance=0.01)
+    assert footprint.geom_type == "MultiPolygon"
+    assert footprint.is_valid
+    min_lon, _, max_lon, _ = footprint.bounds
+    assert min_lon >= -180 and max_lon <= 180
+    assert all(polygon.exterior.is_ccw for polygon in footprint.geoms)
+    original = shapely.points(np.column_stack([longitude, latitude]))
+    assert footprint.buffer(1e-6).covers(original).all()
+
+
+def test_track_footprint_near_pole() -> None:
+    points = np.array([[0.0, 89.95], [10.0, 89.95]])
+    footprint = geometry.track_footprint(points, buffer=0.1, tolerance=0.01)
+    assert footprint.bounds[3] <= 90
+
+
+@pytest.fixture
+def granule(tmp_path: Path) -> Path:
+    source = next(Path(__file__).parent.glob("data-files/*_SR_2_WAT_*.SEN3"))
+    granule = tmp_path / source.name
+    shutil.copytree(source, granule)
+    return granule
+
+
+def test_create_item_track_footprint(granule: Path) -> None:
+    latitude, longitude = synthetic_track()
+    with nc.Dataset(granule / "standard_measurement.nc", "w") as ds:
+        ds.createDimension("time_01", len(latitude))
+        for name, values in (("lat_01", latitude), ("lon_01", longitude)):
+            variable = ds.createVariable(name, "i4", ("time_01",))
+            variable.scale_factor = 1e-6
+            variable[:] = values
+
+    geometry.reset_geometry_path_counts()
+    item = stac.create_item(str(granule), skip_nc=True, track_footprint=True)
+    assert geometry.geometry_path_counts() == {geometry.TRACK_PATH: 1}
+    assert item.geometry is not None and item.bbox is not None
+    assert item.geometry["type"] == "MultiPolygon"
+    assert item.bbox[0] == -180 and item.bbox[2] == 180
+    assert item.bbox[1] == pytest.approx(-60.1, abs=0.01)
+    assert item.bbox[3] == pytest.approx(60.1, abs=0.01)
+
+
+def test_create_item_track_footprint_fallback(
+    granule: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    # the fixture's measurement file has no variables
+    item = stac.create_item(str(granule), skip_nc=True, track_footprint=True)
+    assert item.geometry == stac.create_item(str(granule), skip_nc=True).geometry
+    assert "track could not be read" in caplog.text
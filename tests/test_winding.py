@@ -0,0 +1,71 @@
+import copy
+import random
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import pytest
+
+from stactools.sentinel3.metadata_links import MetadataLinks
+from stactools.sentinel3.product_metadata import ProductMetadata
+from stactools.sentinel3.winding import (
+    get_winding,
+    get_winding_vectorized,
+    winding_order,
+)
+
+DATA_FILES = Path(__file__).parent / "data-files"
+
+Result = Union[Optional[str], Tuple[str, str]]
+
+
+def windings(coords: List[List[float]], max_delta_lon: float) -> Tuple[Result, ...]:
+    results: List[Result] = []
+    for function in (get_winding, get_winding_vectorized):
+        try:
+            results.append(function(copy.deepcopy(coords), max_delta_lon))
+        except ValueError as e:
+            results.append(("error", str(e)))
+    return tuple(results)
+
+
+@pytest.mark.parametrize(
+    "granule",
+    [p for p in sorted(DATA_FILES.glob("*.SEN3")) if (p / "xfdumanifest.xml").exists()],
+    ids=lambda p: p.name[4:12],
+)
+@pytest.mark.parametrize("max_delta_lon", [120, 300])
+def test_vectorized_matches_fixtures(granule: Path, max_delta_lon: float) -> None:
+    metadata = ProductMetadata(str(granule), MetadataLinks(str(granule)).manifest)
+    coords = [list(c) for c in metadata.geometry["coordinates"][0]]
+    expected, actual = windings(coords, max_delta_lon)
+    assert actual == expected
+    assert actual in ("CW", "CCW")
+
+
+def test_vectorized_matches_random_polygons() -> None:
+    rng = random.Random(0)
+    for _ in range(2000):
+        # favour points on the center latitude and near the antimeridian
+        coords = [
+            [
+                rng.choice([rng.uniform(-200, 200), -179.5, 179.5, 0.0]),
+                rng.choice([rng.uniform(-80, 80), -10.0, 0.0, 10.0]),
+            ]
+            for _ in range(rng.randint(3, 12))
+        ]
+        coords.append(list(coords[0]))
+        for max_delta_lon in (30, 120, 300):
+            expected, actual = windings(coords, max_delta_lon)
+            assert actual == expected, (coords, max_delta_lon)
+
+
+def test_vectorized_does_not_modify_coords() -> None:
+    coords = [[190.0, 0.0], [200.0, 10.0], [180.0, 10.0], [190.0, 0.0]]
+    get_winding_vectorized(coords, 120)
+    assert coords == [[190.0, 0.0], [200.0, 10.0], [180.0, 10.0], [190.0, 0.0]]
+
+
+def test_winding_order_does_not_modify_coords() -> None:
+    coords = [[190.0, 0.0], [200.0, 10.0], [180.0, 10.0], [190.0, 0.0]]
+    assert winding_order(coords, 120) == get_winding_vectorized(coords, 120)
+    assert coords == [[190.0, 0.0], [200.0, 10.0], [180.0, 10.0], [190.0, 0.0]]